@@ -1,7 +1,14 @@
 # agents/controller_agent.py
+import time
 from agents.scraper_agent import ScraperAgent
 from agents.verification_agent import VerificationAgent
 from agents.drift_agent import DriftAgent
+from monitoring.metrics import timed
+from storage import stats, provider_state, source_weights, review_queue
+
+# fields of a running ("partial") verification sent by stream()
+PARTIAL_KEYS = ("final_confidence", "flag_for_manual_review", "candidate", "field_scores")
+
 
 class ControllerAgent:
     def __init__(self):
@@ -9,18 +16,65 @@ class ControllerAgent:
         self.verifier = VerificationAgent()
         self.drift = DriftAgent()
 
+    @timed("controller")
     def run(self, provider_input):
+        for event, data in self.stream(provider_input, partial=False):
+            if event == "result":
+                return data
+
+    def stream(self, provider_input, partial=True):
+        """
+        Run the pipeline, yielding (event, data) as it progresses:
+          "source"      one per queried source: {source, outcome, candidate, elapsed_ms}
+          "confidence"  (partial=True) verification over the candidates so far,
+                        after each source that returned one
+          "drift"       the DriftAgent result
+          "result"      the final combined response (what run() returns)
+        Stage timings include time spent by the consumer between events.
+        """
         name = provider_input["name"]
+        started = time.perf_counter()
+
+        # pick up credibility learned from feedback (possibly in another worker)
+        source_weights.refresh()
 
         # 1. Scraper agent
-        scraped = self.scraper.run(name)
+        outcomes = {}
+        scraped = []
+        with timed("scrape"):
+            for source, outcome, candidate in self.scraper.iter_run(name, outcomes=outcomes,
+                                                                    listed=provider_input):
+                yield "source", {"source": source, "outcome": outcome, "candidate": candidate,
+                                 "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+                if candidate is not None:
+                    scraped.append(candidate)
+                    if partial:
+                        running = self.verifier.run(provider_input, list(scraped))
+                        running = {k: running.get(k) for k in PARTIAL_KEYS}
+                        running["sources"] = len(scraped)
+                        yield "confidence", running
 
         # 2. Verification agent
-        verification_result = self.verifier.run(provider_input, scraped)
+        with timed("verify"):
+            verification_result = self.verifier.run(provider_input, scraped)
 
         # 3. Drift agent
-        drift_result = self.drift.run(name, provider_input)
+        # snapshots carry coordinates (listed or consensus) only when the provider verified
+        verified = not verification_result["flag_for_manual_review"]
+        location = verification_result["chosen"].get("address") if verified else None
+        with timed("drift"):
+            drift_result = self.drift.run(name, provider_input, location=location, verified=verified)
+        yield "drift", drift_result
 
         # Final combined response
         verification_result["drift"] = drift_result
-        return verification_result
+
+        # 4. Incremental admin analytics
+        stats.record_verification(name, verification_result, outcomes)
+
+        # 5. Materialized latest-state view
+        provider_state.record_verification(name, verification_result)
+
+        # 6. Manual-review queue (flagged results; clears items that now verify)
+        review_queue.record_verification(name, verification_result, provider_input)
+        yield "result", verification_result
@@ -3,12 +3,24 @@ import time
 from verification.drift import record_snapshot
 
 class DriftAgent:
-    def run(self, provider_name, listed_input):
+    def run(self, provider_name, listed_input, location=None, verified=True):
+        """
+        location: geocode of the verified address (used when the input has none).
+        verified: False for results flagged for manual review; their snapshots
+        keep no coordinates, so the geo index only holds verified locations.
+        """
+        lat = lon = None
+        if verified:
+            lat, lon = listed_input.get("lat"), listed_input.get("lon")
+            if (lat is None or lon is None) and location:
+                lat, lon = location.get("lat"), location.get("lon")
         snapshot = {
             "name": listed_input["name"],
             "address": listed_input.get("listed_address"),
             "phone": listed_input.get("listed_phone"),
-            "website": None,
+            "website": listed_input.get("website"),
+            "lat": lat,
+            "lon": lon,
             "retrieved_at": int(time.time())
         }
         return record_snapshot(provider_name, snapshot)
@@ -1,55 +1,69 @@
 # agents/scraper_agent.py
 import time
-from scraper.registry_scraper import scrape_registry
-from scraper.hospital_scraper2 import scrape_hospital_2
-from scraper.real_scraper import scrape_apollo
-from verification.osm_lookup import search_osm
-from scraper.phone_sources import match_hospital_key
-from scraper.phone_scraper import scrape_phone_from_website
+from agents.source_planner import SourcePlanner
+from monitoring import metrics
+from verification.matcher import ensure_retrieved_at
+
+
+def _outcome(result):
+    """Classify a scraper return value as hit / empty / error / timeout."""
+    if not result:
+        return "empty"
+    if isinstance(result, dict) and "error" in result:
+        return "timeout" if "timed out" in str(result["error"]).lower() else "error"
+    return "hit"
+
 
 class ScraperAgent:
-    def run(self, provider_name: str):
+    def _call(self, source, fn, *args, outcomes=None):
+        """Run one scraper, record its latency + outcome, return result or None."""
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            result = {"error": str(e)}
+        outcome = _outcome(result)
+        metrics.observe_source(source, outcome, time.perf_counter() - start, started=start)
+        if outcomes is not None:
+            outcomes[source] = outcome
+        return result if outcome == "hit" else None
+
+    def __init__(self, planner=None):
+        self.planner = planner or SourcePlanner()
+
+    def run(self, provider_name: str, outcomes=None, listed=None):
+        """
+        Query the sources routed to this provider, in planner order. If `outcomes` (dict) is given it receives
+        source -> outcome. With `listed` (the provider being verified) the
+        remaining sources are skipped once they can no longer change the
+        manual-review verdict.
+        """
+        return [c for _, outcome, c in self.iter_run(provider_name, outcomes, listed) if outcome == "hit"]
+
+    def iter_run(self, provider_name: str, outcomes=None, listed=None):
+        """
+        Same as run(), one source at a time: yields (source, outcome,
+        candidate or None) as each queried source returns. Skipped
+        sources are not yielded.
+        """
+        outcomes = {} if outcomes is None else outcomes
         scraped = []
+        plan = self.planner.plan(provider_name, listed)
+
+        for i, spec in enumerate(plan):
+            remaining = plan[i:]
+            if self.planner.decided(listed, provider_name, scraped, remaining):
+                for skipped in remaining:
+                    metrics.SOURCE_OUTCOMES.inc(skipped.key, "skipped")
+                    outcomes[skipped.key] = "skipped"
+                break
 
-        # Registry
-        reg = scrape_registry(provider_name)
-        if reg:
-            scraped.append(reg)
-
-        # Hospital Source 2
-        h2 = scrape_hospital_2(provider_name)
-        if h2:
-            scraped.append(h2)
-
-        # OSM lookup
-        osm = search_osm(provider_name)
-        if osm:
-            scraped.append({
-                "source": osm["source"],
-                "name": provider_name,
-                "address": osm["address"],
-                "phone": None,
-                "website": None,
-                "retrieved_at": time.time()
-            })
-
-        # Apollo scraper
-        ap = scrape_apollo(provider_name)
-        if ap and "error" not in ap:
-            scraped.append(ap)
-
-        # Phone scraper
-        key = match_hospital_key(provider_name)
-        if key:
-            phone_data = scrape_phone_from_website(provider_name)
-            if phone_data:
-                scraped.append({
-                    "source": phone_data["source"],
-                    "name": provider_name,
-                    "address": None,
-                    "phone": phone_data["phone"],
-                    "website": phone_data["website"],
-                    "retrieved_at": phone_data["retrieved_at"]
-                })
-
-        return scraped
+            start = time.perf_counter()
+            raw = self._call(spec.key, spec.fn, provider_name, outcomes=outcomes)
+            self.planner.observe_latency(spec, time.perf_counter() - start)
+            candidate = None
+            if raw:
+                # dated now, so the early-stop bounds weigh it as verify_provider will
+                candidate = ensure_retrieved_at(spec.adapt(provider_name, raw))
+                scraped.append(candidate)
+            yield spec.key, outcomes[spec.key], candidate
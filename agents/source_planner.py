@@ -0,0 +1,142 @@
+# agents/source_planner.py
+import os
+import time
+import threading
+
+from verification.confidence import _source_weight, verdict_decided
+from scraper.registry_scraper import scrape_registry
+from scraper.hospital_scraper2 import scrape_hospital_2
+from scraper.real_scraper import scrape_apollo
+from verification.osm_lookup import search_osm
+from scraper.phone_sources import match_hospital_key, KNOWN_PHONE_NUMBERS
+from scraper.phone_scraper import scrape_phone_from_website
+from scraper.source_routes import RouteIndex
+from scraper import http_client
+
+# Stop querying once the manual-review verdict can no longer change
+EARLY_STOP = os.environ.get("HEALTHLENS_EARLY_STOP", "1") not in ("0", "false", "no")
+
+EWMA_ALPHA = 0.2   # weight of the newest latency sample
+
+
+# -----------------------------------------
+# Candidate adapters (raw scraper output -> candidate dict)
+# -----------------------------------------
+def _as_is(provider_name, raw):
+    return raw
+
+def _osm_candidate(provider_name, osm):
+    return {
+        "source": osm["source"],
+        "name": provider_name,
+        "address": osm["address"],
+        "phone": None,
+        "website": None,
+        "lat": osm.get("lat"),
+        "lon": osm.get("lon"),
+        "retrieved_at": time.time()
+    }
+
+def _phone_candidate(provider_name, phone_data):
+    return {
+        "source": phone_data["source"],
+        "name": provider_name,
+        "address": None,
+        "phone": phone_data["phone"],
+        "website": phone_data["website"],
+        "retrieved_at": phone_data["retrieved_at"]
+    }
+
+
+class SourceSpec:
+    """
+    One scraper/lookup as the planner sees it.
+      labels:  candidate "source" string(s) it may emit (credibility comes from SOURCE_CREDIBILITY)
+      fields:  candidate fields it can fill besides the (echoed) provider name
+      latency: expected seconds per call (updated from observations)
+      cost:    outbound requests per call
+    Which providers a source is queried for is decided by scraper.source_routes.
+    """
+
+    def __init__(self, key, fn, labels, fields, latency, cost=1.0, adapt=_as_is, cost_fn=None):
+        self.key = key
+        self.fn = fn
+        self.labels = (labels,) if isinstance(labels, str) else tuple(labels)
+        self.fields = tuple(fields)
+        self.latency = latency
+        self.cost = cost
+        self.adapt = adapt
+        self.cost_fn = cost_fn
+
+    @property
+    def credibility(self):
+        return max(_source_weight(label) for label in self.labels)
+
+    def call_cost(self, provider_name):
+        return self.cost_fn(provider_name) if self.cost_fn else self.cost
+
+
+def _phone_cost(provider_name):
+    # curated numbers are answered locally, no outbound request
+    key = match_hospital_key(provider_name)
+    return 0.0 if key and KNOWN_PHONE_NUMBERS.get(key) else 1.0
+
+
+def _geocoder_cost(provider_name):
+    # the offline gazetteer answers Nominatim searches locally
+    return 0.0 if http_client.GEOCODER == "gazetteer" else 1.0
+
+
+DEFAULT_SOURCES = [
+    SourceSpec("registry", scrape_registry, "Public Registry (via Nominatim placeholder)",
+               ("address",), latency=0.8, cost_fn=_geocoder_cost),
+    SourceSpec("hospital_2", scrape_hospital_2, "Hospital Site 2 (example placeholder)",
+               ("address", "phone", "website"), latency=1.0),
+    SourceSpec("osm", search_osm, "OpenStreetMap Nominatim API",
+               ("address",), latency=0.8, adapt=_osm_candidate, cost_fn=_geocoder_cost),
+    SourceSpec("apollo", scrape_apollo, "Apollo Hospitals Website",
+               ("address", "phone", "website"), latency=1.5),
+    SourceSpec("phone", scrape_phone_from_website,
+               ("Official Known Number", "Hospital Website Phone Extractor"),
+               ("phone", "website"), latency=0.5, adapt=_phone_candidate,
+               cost_fn=_phone_cost),
+]
+
+
+class SourcePlanner:
+    def __init__(self, sources=None, early_stop=EARLY_STOP, routes=None):
+        self.sources = list(sources or DEFAULT_SOURCES)
+        self.routes = routes or RouteIndex()
+        self.early_stop = early_stop
+        self._lock = threading.Lock()
+
+    def plan(self, provider_name, listed=None, sources=None):
+        """Sources routed to this provider, ordered by value per cost (highest first)."""
+        routed = self.routes.sources_for(provider_name, listed)
+        specs = [s for s in (sources or self.sources) if s.key in routed]
+
+        def priority(spec):
+            value = spec.credibility * (1 + len(spec.fields))
+            cost = spec.call_cost(provider_name)
+            # latency only matters for sources that actually go out
+            return value / (0.05 + cost * (1.0 + spec.latency))
+
+        return sorted(specs, key=priority, reverse=True)
+
+    def observe_latency(self, spec, seconds):
+        with self._lock:
+            spec.latency = (1 - EWMA_ALPHA) * spec.latency + EWMA_ALPHA * seconds
+
+    def decided(self, listed, provider_name, candidates, remaining_specs):
+        """True when no answer from remaining_specs can flip flag_for_manual_review."""
+        if not self.early_stop or not listed or not remaining_specs:
+            return False
+        free, name_w = {}, 0.0
+        for spec in remaining_specs:
+            w = spec.credibility
+            name_w += w
+            for f in spec.fields:
+                free[f] = free.get(f, 0.0) + w
+        # every scraper echoes the queried provider name
+        pinned = {"name": (provider_name, name_w)}
+        return verdict_decided(listed, candidates, free, pinned)
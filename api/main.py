@@ -1,37 +1,59 @@
 # api/main.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import os, json, time
-
-# Multi-Agent Controller
-from agents.controller_agent import ControllerAgent
+from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ValidationError
+from contextlib import asynccontextmanager
+import io
+import csv
+import time
+
+# Multi-Agent Controller (built on first use / by the warm-up)
+from api import warmup
 
 # Drift history loader
-from verification.drift import load_history, record_snapshot
+from verification.drift import load_history, history_version, record_snapshot, record_snapshots
+
+# Geohash index of verified providers (kept current via drift.on_snapshot)
+from verification import geo_index
 
-# Scraper imports for feedback logic
-from scraper.phone_sources import match_hospital_key
-from scraper.phone_scraper import scrape_phone_from_website
+# Response profiles + fast JSON serializer + ETag / 304 helpers
+from api.responses import (FastJSONResponse, shape_result, sse_event,
+                           etag, not_modified, cache_headers, IMMUTABLE)
 
-# Source credibility weight file
-SOURCE_WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), "../data/source_weights.json")
+# Prometheus-style metrics registry, opt-in tracing, slow-request profiler
+from monitoring import metrics, tracing, profiling
 
-def load_source_weights():
-    if not os.path.exists(SOURCE_WEIGHTS_FILE):
-        return {}
-    with open(SOURCE_WEIGHTS_FILE, "r") as f:
-        return json.load(f)
+# Search history + content-addressed verification results
+from storage.search_history import load_search_history, append_search_history, expand
+from storage import search_history
+from storage.result_store import get_result
+from storage import stats, provider_state, source_weights, review_queue, directory
 
-def save_source_weights(w):
-    with open(SOURCE_WEIGHTS_FILE, "w") as f:
-        json.dump(w, f, indent=2)
+# Per-host outbound rate limits with interactive / background / batch classes
+from scraper import scheduler
 
 
 # -----------------------------------------------------------
 # FASTAPI APP
+# Endpoints that touch the data/ stores or run scrapers are plain
+# `def` so FastAPI runs them in its threadpool instead of blocking the
+# event loop. Multi-process: python -m api.serve --workers N
+# Scrapers and search indexes load lazily; the lifespan hook warms them
+# up in the background (HEALTHLENS_WARMUP=0 to skip, see api/warmup.py).
+# GET views send an ETag built from their store's version and answer a
+# matching If-None-Match with 304 before loading anything.
 # -----------------------------------------------------------
-app = FastAPI()
-controller = ControllerAgent()
+@asynccontextmanager
+async def lifespan(app):
+    if warmup.ENABLED:
+        warmup.start()
+    yield
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # -----------------------------------------------------------
@@ -41,6 +63,10 @@ class ProviderIn(BaseModel):
     name: str
     listed_phone: str = None
     listed_address: str = None
+    website: str = None      # routes domain-specific sources (scraper/source_routes.py)
+    lat: float = None        # optional geocode of the listed address
+    lon: float = None
+    username: str = None     # if set, the search is recorded to that user's history
 
 
 class FeedbackIn(BaseModel):
@@ -56,20 +82,171 @@ class FeedbackIn(BaseModel):
 # -----------------------------------------------------------
 # VERIFY ENDPOINT (MULTI-AGENT)
 # -----------------------------------------------------------
+def _priority(value):
+    """Traffic class from X-HealthLens-Priority (default interactive)."""
+    try:
+        return scheduler.check_priority((value or "interactive").strip().lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/verify")
-async def verify(p: ProviderIn):
+def verify(p: ProviderIn, background_tasks: BackgroundTasks,
+                 view: str = "full", fields: str = None,
+                 x_healthlens_trace: str = Header(None),
+                 x_healthlens_priority: str = Header(None)):
     """
     Main entry for provider verification.
     Goes through ScraperAgent → VerificationAgent → DriftAgent.
+    Send `X-HealthLens-Trace: 1` to get a per-stage timing breakdown in "trace".
+    Re-verification / batch clients send `X-HealthLens-Priority: background`
+    or `batch` so their outbound requests queue behind interactive ones.
+    If `username` is given the search is appended to search history after
+    the response is sent (no separate /history/record round trip).
+    - view=summary → final_confidence, flag_for_manual_review, candidate
+    - fields=a,b   → only those top-level keys
+    """
+    if not fields and view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be summary or full")
+
+    listed = p.dict(exclude={"username"})
+    with profiling.profile_if_slow(p.name), scheduler.priority(_priority(x_healthlens_priority)), \
+            tracing.maybe_trace(tracing.header_enabled(x_healthlens_trace)) as trace:
+        result = warmup.controller().run(listed)
+
+    if p.username:
+        background_tasks.add_task(append_search_history, {
+            "username": p.username,
+            "provider": p.name,
+            "listed_phone": p.listed_phone,
+            "listed_address": p.listed_address,
+            "result": dict(result),
+            "timestamp": int(time.time())
+        })
+
+    if trace is not None:
+        result["trace"] = trace.summary()
+    # returned as a Response so FastAPI skips jsonable_encoder;
+    # a fresh verification every time (stored results: /history/result/{id})
+    return FastJSONResponse(shape_result(result, view, fields), headers={"Cache-Control": "no-store"})
+
+
+# -----------------------------------------------------------
+# STREAMING VERIFY (SERVER-SENT EVENTS)
+# -----------------------------------------------------------
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _verify_events(p: ProviderIn, view, fields):
+    listed = p.dict(exclude={"username"})
+    try:
+        for event, data in warmup.controller().stream(listed):
+            if event == "result":
+                if p.username:
+                    append_search_history({
+                        "username": p.username,
+                        "provider": p.name,
+                        "listed_phone": p.listed_phone,
+                        "listed_address": p.listed_address,
+                        "result": dict(data),
+                        "timestamp": int(time.time())
+                    })
+                data = shape_result(data, view, fields)
+            yield sse_event(event, data)
+    except Exception as e:
+        # headers are already sent; report the failure in-band
+        yield sse_event("error", {"detail": str(e)})
+
+
+def _verify_stream(p: ProviderIn, view, fields, priority):
+    if not fields and view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be summary or full")
+    # each step of the stream runs in its own context: set the class per step
+    events = scheduler.prioritized(_verify_events(p, view, fields), _priority(priority))
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/verify/stream")
+def verify_stream(p: ProviderIn, view: str = "full", fields: str = None,
+                  x_healthlens_priority: str = Header(None)):
+    """
+    /verify as Server-Sent Events: a "source" event as each source returns,
+    a running "confidence" after each candidate, then "drift" and the
+    final "result" (shaped by view/fields like /verify). Failures after
+    the stream started arrive as an "error" event.
+    """
+    return _verify_stream(p, view, fields, x_healthlens_priority)
+
+
+@app.get("/verify/stream")
+def verify_stream_get(name: str, listed_phone: str = None, listed_address: str = None,
+                      website: str = None, lat: float = None, lon: float = None, username: str = None,
+                      view: str = "full", fields: str = None,
+                      x_healthlens_priority: str = Header(None)):
+    """Same as POST /verify/stream, for EventSource clients (GET only)."""
+    given = {"listed_phone": listed_phone, "listed_address": listed_address, "website": website,
+             "lat": lat, "lon": lon, "username": username}
+    p = ProviderIn(name=name, **{k: v for k, v in given.items() if v is not None})
+    return _verify_stream(p, view, fields, x_healthlens_priority)
+
+
+@app.get("/admin/scheduler")
+def get_scheduler():
+    """Outbound rate limits per host: rate, burst, tokens left and queued requests by class."""
+    return {"enabled": scheduler.ENABLED, "hosts": scheduler.snapshot()}
+
+
+# -----------------------------------------------------------
+# WARM-UP
+# -----------------------------------------------------------
+@app.get("/warmup")
+def get_warmup(wait: bool = False):
+    """
+    Load scrapers, caches and indexes now instead of on the first real
+    request (safe to call repeatedly, e.g. from an uptime pinger).
+    wait=true blocks until the warm-up has finished.
+    """
+    warmup.start()
+    if wait:
+        warmup.wait(timeout=60)
+    return warmup.status()
+
+
+# -----------------------------------------------------------
+# METRICS (PROMETHEUS TEXT FORMAT)
+# -----------------------------------------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Stage/source latency histograms, source outcomes, cache ratios, storage size."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+class ProfilingIn(BaseModel):
+    slow_request_seconds: float = 0
+
+
+@app.get("/admin/profiling")
+async def get_profiling():
+    """Current slow-request profiling config and dumps written so far."""
+    cfg = profiling.get_config()
+    cfg["dumps"] = profiling.list_dumps()[:50]
+    return cfg
+
+
+@app.post("/admin/profiling")
+async def set_profiling(cfg: ProfilingIn):
     """
-    return controller.run(p.dict())
+    Set the slow-request threshold at runtime (0 disables).
+    Requests slower than this dump a cProfile + tracemalloc report to disk.
+    """
+    return profiling.set_slow_threshold(cfg.slow_request_seconds)
 
 
 # -----------------------------------------------------------
 # FEEDBACK (ADMIN CORRECTION)
 # -----------------------------------------------------------
 @app.post("/feedback")
-async def feedback(f: FeedbackIn):
+def feedback(f: FeedbackIn):
     """
     Admin approves or rejects a candidate.
     Updates source-credibility and stores correction snapshot.
@@ -78,26 +255,27 @@ async def feedback(f: FeedbackIn):
     if f.decision not in ("approve", "reject"):
         raise HTTPException(status_code=400, detail="decision must be approve/reject")
 
-    weights = load_source_weights()
-    lr = 0.05  # learning rate
+    # APPROVE → increase credibility, REJECT → decrease (shared by all workers)
+    snapshot = _correction_snapshot(f)
+    changes = source_weights.record_decisions([(f.accepted_candidate_source, f.decision)])
 
-    if f.accepted_candidate_source:
-        src = f.accepted_candidate_source
+    try:
+        rec = record_snapshot(f.provider_name, snapshot)
+    except Exception as e:
+        source_weights.revert(changes)
+        raise HTTPException(status_code=500, detail=f"snapshot error: {e}")
 
-        # APPROVE → increase credibility
-        if f.decision == "approve":
-            weights[src] = weights.get(src, 0.5) * (1 + lr)
+    stats.record_feedback(f.decision, f.accepted_candidate_source)
 
-        # REJECT → decrease credibility
-        else:
-            weights[src] = weights.get(src, 0.5) * (1 - lr)
+    return {
+        "status": "ok",
+        "weights_updated": True,
+        "new_snapshot": rec
+    }
 
-        # Clamp values
-        weights[src] = max(0.05, min(0.99, weights[src]))
-        save_source_weights(weights)
 
-    # Store correction snapshot
-    snapshot = {
+def _correction_snapshot(f):
+    return {
         "name": f.corrected_name or f.provider_name,
         "address": f.corrected_address,
         "phone": f.corrected_phone,
@@ -105,78 +283,422 @@ async def feedback(f: FeedbackIn):
         "retrieved_at": int(time.time())
     }
 
+
+# -----------------------------------------------------------
+# BULK FEEDBACK
+# Body: JSON list of FeedbackIn objects (or {"items": [...]}), or a CSV
+# with FeedbackIn column names (Content-Type: text/csv, or a multipart
+# upload in field "file"). Rows are validated first; nothing is applied
+# unless every row is valid.
+# -----------------------------------------------------------
+MAX_FEEDBACK_BATCH = 5000
+
+
+def _parse_feedback_rows(rows):
+    items, errors = [], []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"row": i, "error": "expected an object"})
+            continue
+        row = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        row = {k: v for k, v in row.items() if v not in ("", None)}
+        try:
+            f = FeedbackIn(**row)
+        except ValidationError as e:
+            errors.append({"row": i, "error": "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())})
+            continue
+        if f.decision not in ("approve", "reject"):
+            errors.append({"row": i, "error": "decision must be approve/reject"})
+            continue
+        items.append(f)
+    return items, errors
+
+
+def _apply_feedback_batch(items):
+    """One weights write, one history write (all or nothing); per-provider summary."""
+    snapshots = [(f.provider_name, _correction_snapshot(f)) for f in items]
+    weights = source_weights.record_decisions(
+        [(f.accepted_candidate_source, f.decision) for f in items])
+
     try:
-        rec = record_snapshot(f.provider_name, snapshot)
+        recs = record_snapshots(snapshots)
     except Exception as e:
+        source_weights.revert(weights)
         raise HTTPException(status_code=500, detail=f"snapshot error: {e}")
 
+    for f in items:
+        stats.record_feedback(f.decision, f.accepted_candidate_source)
+
+    providers = {}
+    for f, rec in zip(items, recs):
+        key = provider_state.slug(f.provider_name)
+        p = providers.get(key)
+        if p is None:
+            p = providers[key] = {
+                "slug": key,
+                "provider_name": f.provider_name,
+                "approve": 0,
+                "reject": 0,
+                "snapshots_added": 0,
+                "changed_fields": [],
+                "sources": [],
+            }
+        p[f.decision] += 1
+        p["snapshots_added"] += 1
+        p["changed_fields"] = sorted(set(p["changed_fields"]) | set(rec["drift_info"]["changed_fields"]))
+        if f.accepted_candidate_source and f.accepted_candidate_source not in p["sources"]:
+            p["sources"].append(f.accepted_candidate_source)
+        p["drift_score"] = rec["drift_info"]["drift_score"]
+        p["history_count"] = rec["history_count"]
+        p["latest_snapshot"] = rec["latest_snapshot"]
+
     return {
         "status": "ok",
-        "weights_updated": True,
-        "new_snapshot": rec
+        "applied": len(items),
+        "weights": weights,
+        "providers": list(providers.values()),
+    }
+
+
+@app.post("/feedback/batch")
+async def feedback_batch(request: Request):
+    """
+    Apply many approve/reject decisions at once: credibility updates are
+    folded in memory and written once, correction snapshots are appended
+    to history.json in a single write.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            upload = (await request.form()).get("file")
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=400, detail="multipart upload must include a 'file' field")
+            text = (await upload.read()).decode("utf-8-sig")
+            rows = list(csv.DictReader(io.StringIO(text)))
+        elif "csv" in content_type:
+            text = (await request.body()).decode("utf-8-sig")
+            rows = list(csv.DictReader(io.StringIO(text)))
+        else:
+            body = await request.json()
+            rows = body.get("items") if isinstance(body, dict) else body
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"could not parse body: {e}")
+
+    if not isinstance(rows, list) or not rows:
+        raise HTTPException(status_code=400, detail="expected a non-empty list of feedback rows")
+    if len(rows) > MAX_FEEDBACK_BATCH:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_FEEDBACK_BATCH} rows per batch")
+
+    items, errors = _parse_feedback_rows(rows)
+    if errors:
+        raise HTTPException(status_code=400, detail={"invalid_rows": errors[:50], "invalid_count": len(errors)})
+
+    return await run_in_threadpool(_apply_feedback_batch, items)
+
+
+# -----------------------------------------------------------
+# MANUAL REVIEW QUEUE
+# Flagged verifications are queued by ControllerAgent
+# (storage/review_queue.py). Admins page through the queue with a
+# cursor, claim items and resolve them; resolving applies /feedback.
+# -----------------------------------------------------------
+class ReviewClaimIn(BaseModel):
+    admin_user: str = "admin"
+
+
+class ReviewClaimNextIn(BaseModel):
+    admin_user: str = "admin"
+    sort: str = "confidence"
+    provider: str = None
+
+
+class ReviewResolveIn(BaseModel):
+    decision: str        # "approve" or "reject"
+    corrected_name: str = None
+    corrected_address: str = None
+    corrected_phone: str = None
+    accepted_candidate_source: str = None
+    admin_user: str = "admin"
+
+
+def _review_call(fn, *args):
+    try:
+        item = fn(*args)
+    except review_queue.ReviewConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if item is None:
+        raise HTTPException(status_code=404, detail="review item not found")
+    return item
+
+
+@app.get("/admin/review")
+def get_review_queue(request: Request, status: str = "open", sort: str = "confidence",
+                     provider: str = None, claimed_by: str = None, limit: int = 50, cursor: str = None):
+    """
+    One page of the review queue, lowest confidence first (sort=age:
+    oldest first, sort=newest). Pass next_cursor back as `cursor` (same
+    filters) for the next page; "counts" has the items per status.
+    """
+    tag = etag("review_queue", review_queue.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    try:
+        result = review_queue.page(status, sort, provider, claimed_by, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result["counts"] = review_queue.counts()
+    return FastJSONResponse(result, headers=cache_headers(tag))
+
+
+@app.post("/admin/review/claim-next")
+def claim_next_review_item(c: ReviewClaimNextIn):
+    """Claim the first open item in `sort` order (404 when the queue is empty)."""
+    return _review_call(review_queue.claim_next, c.admin_user, c.sort, c.provider)
+
+
+@app.get("/admin/review/{item_id}")
+def get_review_item(request: Request, item_id: int):
+    """One queue item with the full verification result inlined."""
+    tag = etag("review_queue", review_queue.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    item = _review_call(review_queue.get_item, item_id)
+    item["result"] = review_queue.get_result_for(item)
+    return FastJSONResponse(item, headers=cache_headers(tag))
+
+
+@app.post("/admin/review/{item_id}/claim")
+def claim_review_item(item_id: int, c: ReviewClaimIn):
+    """Claim an item (409 if another admin holds it); claims lapse after 30 minutes."""
+    return _review_call(review_queue.claim, item_id, c.admin_user)
+
+
+@app.post("/admin/review/{item_id}/release")
+def release_review_item(item_id: int, c: ReviewClaimIn):
+    return _review_call(review_queue.release, item_id, c.admin_user)
+
+
+@app.post("/admin/review/{item_id}/resolve")
+def resolve_review_item(item_id: int, r: ReviewResolveIn):
+    """
+    Approve or reject an item through /feedback (claiming it first if it
+    is open). Approving without corrections accepts the consensus values
+    the verification chose.
+    """
+    if r.decision not in ("approve", "reject"):
+        raise HTTPException(status_code=400, detail="decision must be approve/reject")
+    item = _review_call(review_queue.claim, item_id, r.admin_user)
+
+    corrections = {
+        "corrected_name": r.corrected_name,
+        "corrected_address": r.corrected_address,
+        "corrected_phone": r.corrected_phone,
     }
+    if r.decision == "approve":
+        candidate = item["candidate"] or {}
+        for field in ("name", "address", "phone"):
+            corrections["corrected_" + field] = corrections["corrected_" + field] or candidate.get(field)
+    given = dict(corrections, accepted_candidate_source=r.accepted_candidate_source)
+    f = FeedbackIn(provider_name=item["provider_name"], decision=r.decision, admin_user=r.admin_user,
+                   **{k: v for k, v in given.items() if v is not None})
+    applied = feedback(f)
+
+    resolution = {"decision": r.decision, "accepted_candidate_source": r.accepted_candidate_source,
+                  "corrections": {k: v for k, v in corrections.items() if v is not None},
+                  "drift_info": applied["new_snapshot"].get("drift_info")}
+    item = _review_call(review_queue.resolve, item_id, r.admin_user, resolution)
+    return {"status": "ok", "item": item, "feedback": applied}
 
 
 # -----------------------------------------------------------
 # ADMIN HISTORY (ONE NAME ONLY!)
 # -----------------------------------------------------------
 @app.get("/admin/history")
-async def get_admin_history():
+def get_admin_history(request: Request):
     """Return full drift history for admin."""
-    return load_history()
+    tag = etag("history", history_version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    return FastJSONResponse(load_history(), headers=cache_headers(tag))
 
 
 # -----------------------------------------------------------
-# USER SEARCH HISTORY
+# ADMIN STATS (INCREMENTAL AGGREGATES)
+# -----------------------------------------------------------
+@app.get("/admin/stats")
+def get_admin_stats(request: Request, days: int = 30, top: int = 10):
+    """
+    Confidence distribution, manual-review flag rate, drift counts by field,
+    source hit/error rates and top searched providers, bucketed by day.
+    Served from pre-aggregated counters (storage/stats.py).
+    """
+    tag = etag("stats", stats.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    result = stats.get_stats(days=max(1, min(days, 3650)), top=max(1, min(top, 100)))
+    return FastJSONResponse(result, headers=cache_headers(tag))
+
+
 # -----------------------------------------------------------
-SEARCH_HISTORY_FILE = os.path.join(os.path.dirname(__file__), "../data/search_history.json")
+# NEARBY PROVIDERS (LOCAL GEO INDEX, NO OUTBOUND CALLS)
+# -----------------------------------------------------------
+@app.get("/providers/nearby")
+def get_nearby_providers(lat: float, lon: float, radius_m: float = 2000, limit: int = 20):
+    """Verified providers within radius_m metres of (lat, lon), nearest first."""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="lat/lon out of range")
+    radius_m = max(1.0, min(radius_m, 100000.0))
+    results = geo_index.nearby(lat, lon, radius_m, max(1, min(limit, 200)))
+    return {"count": len(results), "radius_m": radius_m, "results": results}
+
+
+@app.get("/providers/search")
+def search_providers(q: str = "", limit: int = 10):
+    """Typeahead: known providers and chains whose name best matches q (may be partial / misspelled)."""
+    from verification import name_index      # numpy; usually preloaded by the warm-up
+    results = name_index.search(q, max(1, min(limit, 50))) if q.strip() else []
+    for r in results:
+        if r["kind"] == "provider":
+            state = provider_state.get_provider(r["slug"]) or {}
+            consensus = state.get("consensus") or {}
+            latest = state.get("latest_snapshot") or {}
+            r["address"] = consensus.get("address") or latest.get("address")
+            r["final_confidence"] = state.get("final_confidence")
+    return {"query": q, "count": len(results), "results": results}
+
 
-def _ensure_search_history_file():
-    folder = os.path.dirname(SEARCH_HISTORY_FILE)
-    if not os.path.exists(folder):
-        os.makedirs(folder, exist_ok=True)
-    if not os.path.exists(SEARCH_HISTORY_FILE):
-        with open(SEARCH_HISTORY_FILE, "w") as f:
-            json.dump([], f)
+# -----------------------------------------------------------
+# DIRECTORY EXPORT (STREAMED CSV / NDJSON)
+# -----------------------------------------------------------
+@app.get("/export")
+def export_directory(request: Request, format: str = "csv", min_confidence: float = None,
+                     changed_since: str = None, region: str = None, exclude_flagged: bool = False):
+    """
+    The provider directory (consensus values, confidence, drift) streamed
+    as chunked CSV or NDJSON, built row by row from the provider state.
+    - min_confidence  only providers at or above this final_confidence
+    - changed_since   only providers updated since (epoch seconds or ISO-8601)
+    - region          city / state names or PIN prefixes, comma separated
+    """
+    if format not in directory.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(directory.FORMATS)}")
+    since = None
+    if changed_since:
+        try:
+            since = provider_state.parse_ts(changed_since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="changed_since must be epoch seconds or ISO-8601")
+    tag = etag("provider_state", provider_state.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    content_type, chunks = directory.export(format, min_confidence=min_confidence, changed_since=since,
+                                            region=region, exclude_flagged=exclude_flagged)
+    headers = {**cache_headers(tag), "Content-Disposition": f'attachment; filename="providers.{format}"'}
+    return StreamingResponse(chunks, media_type=content_type, headers=headers)
 
-def load_search_history():
-    _ensure_search_history_file()
-    with open(SEARCH_HISTORY_FILE, "r") as f:
-        return json.load(f)
 
-def save_search_history(arr):
-    _ensure_search_history_file()
-    with open(SEARCH_HISTORY_FILE, "w") as f:
-        json.dump(arr, f, indent=2, ensure_ascii=False)
+# -----------------------------------------------------------
+# PROVIDER STATE (MATERIALIZED VIEW + POINT-IN-TIME)
+# -----------------------------------------------------------
+@app.get("/providers/{slug}")
+def get_provider_state(request: Request, slug: str):
+    """Latest snapshot, consensus values, confidence and drift for a provider."""
+    tag = etag("provider_state", provider_state.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    entry = provider_state.get_provider(slug)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="provider not found")
+    return FastJSONResponse(entry, headers=cache_headers(tag))
+
+
+@app.get("/providers/{slug}/as-of")
+def get_provider_as_of(request: Request, slug: str, ts: str):
+    """Snapshot in effect at `ts` (epoch seconds or ISO-8601, UTC by default)."""
+    try:
+        when = provider_state.parse_ts(ts)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ts must be epoch seconds or ISO-8601")
+    # only changes when snapshots are added
+    tag = etag("history", history_version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    state = provider_state.state_as_of(slug, when)
+    if state is None:
+        raise HTTPException(status_code=404, detail="provider not found")
+    return FastJSONResponse(state, headers=cache_headers(tag))
 
 
+# -----------------------------------------------------------
+# USER SEARCH HISTORY
+# -----------------------------------------------------------
+# Entries point at content-addressed results (storage/result_store.py)
 @app.post("/history/record")
-async def record_user_search(payload: dict):
+def record_user_search(payload: dict):
     """
     Record a user's search query and verification summary.
     """
     try:
-        data = load_search_history()
-        payload.setdefault("timestamp", int(time.time()))
-        data.append(payload)
-        save_search_history(data)
+        append_search_history(payload)
         return {"ok": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/history")
-async def get_user_history(username: str = None, admin: bool = False):
+def get_user_history(request: Request, username: str = None, admin: bool = False,
+                           limit: int = None, offset: int = 0, newest_first: bool = False,
+                           expand_results: bool = False):
     """
-    - If admin=True → return all searches  
-    - If username provided → return that user's searches  
+    - If admin=True → return all searches
+    - If username provided → return that user's searches
+    - limit/offset page through the result (X-Total-Count header carries the total)
+    - entries carry "result_id" + "summary"; fetch the full result from
+      /history/result/{result_id}, or pass expand_results=true to inline it
+    - the ETag changes with every recorded search (If-None-Match → 304)
     """
+    tag = etag("search_history", search_history.version())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
     data = load_search_history()
 
     if admin:
-        return data
-
-    if username:
-        return [x for x in data if x.get("username") == username]
-
-    return []
+        rows = data
+    elif username:
+        rows = [x for x in data if x.get("username") == username]
+    else:
+        rows = []
+
+    total = len(rows)
+    if newest_first:
+        rows = rows[::-1]
+    if limit is not None:
+        offset = max(0, offset)
+        rows = rows[offset:offset + max(0, limit)]
+    if expand_results:
+        rows = [expand(x) for x in rows]
+    return FastJSONResponse(rows, headers={**cache_headers(tag), "X-Total-Count": str(total)})
+
+
+@app.get("/history/result/{result_id}")
+def get_history_result(request: Request, result_id: str):
+    """Full verification result for a history entry (content-addressed, immutable)."""
+    tag = etag(result_id)
+    cached = not_modified(request, tag, IMMUTABLE)
+    if cached:
+        return cached
+    result = get_result(result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="result not found")
+    return FastJSONResponse(result, headers=cache_headers(tag, IMMUTABLE))
@@ -0,0 +1,104 @@
+# api/responses.py
+import json
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from monitoring import metrics
+
+# orjson is ~5-10x faster than the stdlib encoder; fall back if missing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    class FastJSONResponse(JSONResponse):
+        """JSONResponse rendered with orjson."""
+
+        def render(self, content):
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+else:
+    FastJSONResponse = JSONResponse
+
+
+def sse_event(event, data):
+    """One Server-Sent Events message (bytes) with a JSON payload."""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+    return b"event: " + event.encode("ascii") + b"\ndata: " + payload + b"\n\n"
+
+# -----------------------------------------------------------
+# CONDITIONAL REQUESTS (ETag / If-None-Match -> 304)
+# ETags come from store versions (generation counters, content hashes),
+# so a matching request is answered before anything is loaded or
+# serialized. They are weak: the same for gzip and identity bodies.
+# -----------------------------------------------------------
+REVALIDATE = "private, no-cache"                      # may be stored, revalidate on every use
+IMMUTABLE = "private, max-age=31536000, immutable"    # content-addressed
+
+
+def etag(*parts):
+    return 'W/"' + "-".join(str(p) for p in parts) + '"'
+
+
+def _opaque(tag):
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match, tag):
+    """Weak comparison of an If-None-Match header against tag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(t) == _opaque(tag) for t in if_none_match.split(","))
+
+
+def cache_headers(tag, cache_control=REVALIDATE):
+    return {"ETag": tag, "Cache-Control": cache_control}
+
+
+def not_modified(request, tag, cache_control=REVALIDATE):
+    """A 304 response when the request already has this version, else None."""
+    hit = etag_matches(request.headers.get("if-none-match"), tag)
+    metrics.record_cache("http_etag", hit)
+    if hit:
+        return Response(status_code=304, headers=cache_headers(tag, cache_control))
+    return None
+
+
+# -----------------------------------------------------------
+# /verify RESPONSE PROFILES
+# -----------------------------------------------------------
+VIEWS = {
+    # what most API consumers need
+    "summary": ("final_confidence", "flag_for_manual_review", "candidate"),
+    # everything compute_confidence + DriftAgent produce
+    "full": None,
+}
+
+# keys always kept when present (opt-in debugging output)
+_ALWAYS = ("trace",)
+
+
+def shape_result(result, view="full", fields=None):
+    """
+    Trim a verification result to a response profile.
+    `fields` (comma separated top-level keys) overrides `view`.
+    Raises ValueError on an unknown view.
+    """
+    if fields:
+        keep = [f.strip() for f in fields.split(",") if f.strip()]
+    else:
+        if view not in VIEWS:
+            raise ValueError(f"view must be one of: {', '.join(VIEWS)}")
+        keep = VIEWS[view]
+    if keep is None:
+        return result
+    return {k: result[k] for k in list(keep) + list(_ALWAYS) if k in result}
@@ -0,0 +1,35 @@
+# api/serve.py
+"""
+Multi-process API launcher.
+
+    python -m api.serve --workers 4 --port 8000
+
+Workers share state only through data/: JSON stores are updated under
+file locks with atomic replaces, and generation counters
+(data/generations/) tell each worker when its in-memory copies
+(source weights, geo index, provider state, stats) must be reloaded.
+Per-process runtime settings such as POST /admin/profiling apply to one
+worker only; use the HEALTHLENS_* environment variables instead.
+Outbound per-host rate limits (scraper.scheduler) are divided evenly
+between the workers.
+"""
+import os
+import argparse
+
+import uvicorn
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the HealthLens API with several worker processes.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    # outbound rate limits (scraper.scheduler) are split between the workers
+    os.environ["HEALTHLENS_WORKERS"] = str(max(1, args.workers))
+    uvicorn.run("api.main:app", host=args.host, port=args.port, workers=max(1, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# api/warmup.py
+"""
+Cold start: the API module imports only what every request needs; the
+agent graph (scrapers -> requests, bs4) and the search indexes (numpy)
+load on first use. warm-up does that first use ahead of time, in a
+background thread started by the app's lifespan hook (unless
+HEALTHLENS_WARMUP=0) or on demand via GET /warmup.
+"""
+import os
+import time
+import threading
+
+from monitoring.metrics import timed
+
+ENABLED = os.environ.get("HEALTHLENS_WARMUP", "1") != "0"
+
+_controller = None
+_controller_lock = threading.Lock()
+
+_lock = threading.Lock()
+_status = {"state": "idle", "started_at": None, "finished_at": None, "steps": {}}
+_done = threading.Event()
+
+
+def controller():
+    """The shared ControllerAgent, built (and the agent graph imported) on first use."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                from agents.controller_agent import ControllerAgent
+                _controller = ControllerAgent()
+    return _controller
+
+
+# -----------------------------------------
+# Steps, in order: name -> fn
+# -----------------------------------------
+def _source_weights():
+    from storage import source_weights
+    source_weights.refresh()
+
+
+def _provider_state():
+    from storage import provider_state
+    next(provider_state.iter_providers(), None)
+
+
+def _geo_index():
+    from verification import geo_index
+    geo_index.get_index()
+
+
+def _name_index():
+    from verification import name_index
+    name_index.get_index()
+
+
+STEPS = (
+    ("controller", controller),
+    ("source_weights", _source_weights),
+    ("provider_state", _provider_state),
+    ("geo_index", _geo_index),
+    ("name_index", _name_index),
+)
+
+
+def run():
+    """Run every step (each failure is recorded, not raised); returns status()."""
+    with _lock:
+        if _status["state"] == "running":
+            running = True
+        else:
+            running = False
+            _done.clear()
+            _status.update(state="running", started_at=time.time(), finished_at=None, steps={})
+    if running:
+        _done.wait()
+        return status()
+
+    for name, fn in STEPS:
+        start = time.perf_counter()
+        step = {"seconds": None, "error": None}
+        try:
+            with timed(f"warmup_{name}"):
+                fn()
+        except Exception as e:
+            step["error"] = str(e)
+        step["seconds"] = round(time.perf_counter() - start, 4)
+        with _lock:
+            _status["steps"][name] = step
+
+    with _lock:
+        failed = any(s["error"] for s in _status["steps"].values())
+        _status.update(state="failed" if failed else "done", finished_at=time.time())
+    _done.set()
+    return status()
+
+
+def start():
+    """Run the warm-up in a daemon thread unless it is running or has run."""
+    with _lock:
+        if _status["state"] != "idle":
+            return False
+        _status["state"] = "starting"
+    threading.Thread(target=run, name="healthlens-warmup", daemon=True).start()
+    return True
+
+
+def wait(timeout=None):
+    return _done.wait(timeout)
+
+
+def status():
+    with _lock:
+        out = dict(_status)
+        out["steps"] = dict(_status["steps"])
+    if out["started_at"] and out["finished_at"]:
+        out["seconds"] = round(out["finished_at"] - out["started_at"], 4)
+    return out
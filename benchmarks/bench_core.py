@@ -0,0 +1,272 @@
+# benchmarks/bench_core.py
+"""
+Micro-benchmarks for the hot functions of the verification pipeline.
+
+    python -m benchmarks.bench_core                       # sizes 1k,10k
+    python -m benchmarks.bench_core --sizes 1000,100000,1000000
+    python -m benchmarks.bench_core --only compute_confidence,resolve_entity
+    python -m benchmarks.bench_core --compare benchmarks/results/<commit>.json
+
+Results are written as JSON (default benchmarks/results/<commit>.json)
+so runs from different commits can be diffed; --compare exits non-zero
+when any benchmark's median per-op time regresses past --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# record_snapshot rewrites the whole history file per call, so it is
+# measured with a fixed number of calls against a history of `size` snapshots.
+RECORD_SNAPSHOT_CALLS = 20
+
+# name_search builds an index of `size` names (not timed), then times this many queries.
+NAME_SEARCH_QUERIES = 2000
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def _summarize(durations_ns):
+    durations_ns.sort()
+    n = len(durations_ns)
+    total = sum(durations_ns)
+
+    def pct(p):
+        return durations_ns[min(n - 1, int(p * n))] / 1000.0
+
+    return {
+        "n": n,
+        "total_s": round(total / 1e9, 4),
+        "ops_per_s": round(n / (total / 1e9), 1) if total else None,
+        "mean_us": round(total / n / 1000.0, 3),
+        "p50_us": round(pct(0.50), 3),
+        "p95_us": round(pct(0.95), 3),
+        "p99_us": round(pct(0.99), 3),
+        "stdev_us": round(statistics.pstdev(durations_ns) / 1000.0, 3) if n > 1 else 0.0,
+    }
+
+
+def _time_calls(fn, args_iter):
+    clock = time.perf_counter_ns
+    out = []
+    for args in args_iter:
+        t0 = clock()
+        fn(*args)
+        out.append(clock() - t0)
+    return out
+
+
+# -----------------------------------------
+# Benchmarks: each takes a size, returns list of per-op durations (ns)
+# -----------------------------------------
+def bench_compute_confidence(size):
+    from verification.confidence import compute_confidence
+    return _time_calls(compute_confidence, synthetic.verification_cases(size))
+
+
+def bench_compute_drift_score(size):
+    from verification.drift import compute_drift_score
+    return _time_calls(compute_drift_score, synthetic.snapshot_pairs(size))
+
+
+def bench_resolve_entity(size):
+    from verification.entity_resolution import resolve_entity
+    return _time_calls(resolve_entity, synthetic.verification_cases(size))
+
+
+def bench_extract_phone_from_html(size):
+    from scraper.phone_scraper import extract_phone_from_html
+    return _time_calls(extract_phone_from_html, ((html,) for html in synthetic.contact_pages(size)))
+
+
+def bench_phone_canonical(size):
+    from verification import phone
+    phone._parse.cache_clear()
+    return _time_calls(phone.canonical, ((p["listed_phone"],) for p in synthetic.providers(size)))
+
+
+def bench_match_hospital_key(size):
+    from scraper.phone_sources import match_hospital_key
+    return _time_calls(match_hospital_key, ((p["name"],) for p in synthetic.providers(size)))
+
+
+def bench_name_search(size):
+    from verification.name_index import NameIndex, _curated_rows
+    idx = NameIndex()
+    idx.add_many(_curated_rows())
+    idx.add_many((p["name"], "provider", p["name"].lower()) for p in synthetic.providers(size))
+    return _time_calls(idx.search, ((q,) for q in synthetic.typeahead_queries(NAME_SEARCH_QUERIES, size)))
+
+
+def bench_feed_diff(size):
+    from storage import feeds
+
+    tmp = tempfile.mkdtemp(prefix="hl-bench-")
+    orig = feeds.FEEDS_DIR
+    try:
+        feeds.FEEDS_DIR = tmp
+        day0 = feeds.FeedDiff("bench", "id")
+        for row in synthetic.partner_feed(size, day=0):
+            day0.add(row)
+        day0.commit()
+        diff = feeds.FeedDiff("bench", "id")
+        return _time_calls(diff.add, ((row,) for row in synthetic.partner_feed(size, day=1)))
+    finally:
+        feeds.FEEDS_DIR = orig
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_directory_export(size):
+    from storage import directory, generations, provider_state
+
+    tmp = tempfile.mkdtemp(prefix="hl-bench-")
+    orig = provider_state.PROVIDER_STATE_DB, provider_state.PROVIDER_STATE_FILE, generations.GENERATIONS_DIR
+    try:
+        provider_state.PROVIDER_STATE_DB = os.path.join(tmp, "provider_state.db")
+        provider_state.PROVIDER_STATE_FILE = os.path.join(tmp, "provider_state.json")
+        generations.GENERATIONS_DIR = os.path.join(tmp, "generations")
+        view = synthetic.provider_state(size)
+        with open(provider_state.PROVIDER_STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(view, f, ensure_ascii=False)
+        next(provider_state.iter_providers(), None)     # import into the database untimed
+
+        # one op = one provider built and encoded as a CSV row
+        chunks = directory.iter_csv(directory.iter_rows(), chunk_rows=1)
+        next(chunks)                                     # header
+        return _time_calls(next, ((chunks,) for _ in range(len(view))))
+    finally:
+        provider_state.PROVIDER_STATE_DB, provider_state.PROVIDER_STATE_FILE, generations.GENERATIONS_DIR = orig
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_record_snapshot(size):
+    from verification import drift
+    from storage import generations
+
+    tmp = tempfile.mkdtemp(prefix="hl-bench-")
+    orig = drift.HISTORY_PATH, generations.GENERATIONS_DIR
+    # listeners registered by modules other benchmarks imported (provider
+    # state, name / geo index) would write these snapshots into live stores
+    listeners = list(drift._snapshot_listeners)
+    try:
+        drift.HISTORY_PATH = os.path.join(tmp, "history.json")
+        generations.GENERATIONS_DIR = os.path.join(tmp, "generations")
+        drift._snapshot_listeners.clear()
+        with open(drift.HISTORY_PATH, "w", encoding="utf-8") as f:
+            json.dump(synthetic.snapshot_history(size), f, ensure_ascii=False)
+
+        listed = synthetic.providers(RECORD_SNAPSHOT_CALLS, seed=7)
+        args = ((p["name"], {"name": p["name"], "address": p["listed_address"],
+                             "phone": p["listed_phone"], "website": None}) for p in listed)
+        return _time_calls(drift.record_snapshot, args)
+    finally:
+        drift.HISTORY_PATH, generations.GENERATIONS_DIR = orig
+        drift._snapshot_listeners[:] = listeners
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "compute_confidence": bench_compute_confidence,
+    "compute_drift_score": bench_compute_drift_score,
+    "resolve_entity": bench_resolve_entity,
+    "extract_phone_from_html": bench_extract_phone_from_html,
+    "phone_canonical": bench_phone_canonical,
+    "match_hospital_key": bench_match_hospital_key,
+    "name_search": bench_name_search,
+    "feed_diff": bench_feed_diff,
+    "directory_export": bench_directory_export,
+    "record_snapshot": bench_record_snapshot,
+}
+
+
+def run(sizes, only=None):
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = {}
+        for size in sizes:
+            summary = _summarize(fn(size))
+            results[name][str(size)] = summary
+            print(f"{name:<26} size={size:<8} p50={summary['p50_us']:>10.2f}us "
+                  f"p99={summary['p99_us']:>10.2f}us ops/s={summary['ops_per_s']}", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return list of (bench, size, baseline_p50, current_p50, pct_change) regressions."""
+    regressions = []
+    for name, by_size in current["results"].items():
+        for size, cur in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base or not base.get("p50_us"):
+                continue
+            change = (cur["p50_us"] - base["p50_us"]) / base["p50_us"] * 100.0
+            flag = "REGRESSION" if change > threshold else ""
+            print(f"{name:<26} size={size:<8} {base['p50_us']:>10.2f}us -> {cur['p50_us']:>10.2f}us "
+                  f"({change:+.1f}%) {flag}", file=sys.stderr)
+            if change > threshold:
+                regressions.append((name, size, base["p50_us"], cur["p50_us"], round(change, 1)))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HealthLens micro-benchmarks")
+    ap.add_argument("--sizes", default="1000,10000", help="comma separated sizes (1k..1M)")
+    ap.add_argument("--only", default="", help="comma separated benchmark names")
+    ap.add_argument("--out", default=None, help="result JSON path (default benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=15.0, help="allowed p50 regression in percent")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = {s.strip() for s in args.only.split(",") if s.strip()} or None
+    unknown = (only or set()) - set(BENCHMARKS)
+    if unknown:
+        ap.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    current = run(sizes, only)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{current['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start benchmark: import time of the API per module, and the time
+each warm-up step takes, each measured in fresh interpreters.
+
+    python -m benchmarks.bench_startup                    # 5 runs, best of
+    python -m benchmarks.bench_startup --runs 10 --min-ms 2
+    python -m benchmarks.bench_startup --compare benchmarks/results/startup-<commit>.json
+
+Import times come from `python -X importtime` (cumulative per module);
+our own modules and top-level third-party packages above --min-ms are
+reported. Results are written as JSON (default
+benchmarks/results/startup-<commit>.json); --compare exits non-zero when
+the total import time or a warm-up step regresses past --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_core import ROOT, RESULTS_DIR, _git_commit
+
+TARGET = "api.main"
+OWN_PACKAGES = ("api", "agents", "scraper", "verification", "storage", "monitoring")
+
+# changes smaller than this are noise, whatever the percentage
+MIN_REGRESSION_MS = 5.0
+
+# warm-up in a child process; writes go to a temp dir, not data/
+_WARMUP_SCRIPT = """
+import json, os, shutil, tempfile, time
+t = time.perf_counter()
+import api.main
+imported = time.perf_counter() - t
+from api import warmup
+from storage import generations, provider_state
+tmp = tempfile.mkdtemp(prefix="hl-startup-")
+generations.GENERATIONS_DIR = os.path.join(tmp, "generations")
+provider_state.PROVIDER_STATE_DB = os.path.join(tmp, "provider_state.db")
+try:
+    status = warmup.run()
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+print(json.dumps({"import_s": imported, "steps": status["steps"]}))
+"""
+
+
+def _child_env():
+    env = dict(os.environ)
+    env["HEALTHLENS_WARMUP"] = "0"
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _importtime(module):
+    """module -> cumulative import time (us) for one fresh `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=_child_env(), capture_output=True, text=True, check=True)
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue            # header
+        out[parts[2].strip()] = int(parts[1])
+    return out
+
+
+def _reported(name):
+    return name.split(".")[0] in OWN_PACKAGES or "." not in name
+
+
+def _summary(values_ms):
+    return {
+        "best_ms": round(min(values_ms), 3),
+        "median_ms": round(statistics.median(values_ms), 3),
+        "runs": len(values_ms),
+    }
+
+
+def measure_imports(runs, min_ms):
+    samples = {}
+    for _ in range(runs):
+        for name, us in _importtime(TARGET).items():
+            samples.setdefault(name, []).append(us / 1000.0)
+    results = {}
+    for name, values in samples.items():
+        if name == TARGET or (_reported(name) and min(values) >= min_ms):
+            results[name] = _summary(values)
+    return results
+
+
+def measure_warmup(runs):
+    samples = {}
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", _WARMUP_SCRIPT], cwd=ROOT, env=_child_env(),
+                              capture_output=True, text=True, check=True)
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.setdefault("import", []).append(data["import_s"] * 1000.0)
+        for step, info in data["steps"].items():
+            if info["error"]:
+                print(f"warm-up step {step} failed: {info['error']}", file=sys.stderr)
+            samples.setdefault(step, []).append(info["seconds"] * 1000.0)
+    return {name: _summary(values) for name, values in samples.items()}
+
+
+def run(runs=5, min_ms=5.0):
+    imports = measure_imports(runs, min_ms)
+    for name, s in sorted(imports.items(), key=lambda kv: -kv[1]["best_ms"]):
+        print(f"import  {name:<40} best={s['best_ms']:>9.2f}ms median={s['median_ms']:>9.2f}ms",
+              file=sys.stderr)
+    warm = measure_warmup(runs)
+    for name, s in warm.items():
+        print(f"warmup  {name:<40} best={s['best_ms']:>9.2f}ms median={s['median_ms']:>9.2f}ms",
+              file=sys.stderr)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+        },
+        "results": {"import": imports, "warmup": warm},
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return list of (kind, name, baseline_best, current_best, pct_change) regressions."""
+    regressions = []
+    checked = [("import", TARGET)] + [("warmup", name) for name in current["results"]["warmup"]]
+    for kind, name in checked:
+        cur = current["results"][kind].get(name)
+        base = baseline.get("results", {}).get(kind, {}).get(name)
+        if not cur or not base or not base.get("best_ms"):
+            continue
+        change = (cur["best_ms"] - base["best_ms"]) / base["best_ms"] * 100.0
+        regressed = change > threshold and cur["best_ms"] - base["best_ms"] > MIN_REGRESSION_MS
+        print(f"{kind:<7} {name:<40} {base['best_ms']:>9.2f}ms -> {cur['best_ms']:>9.2f}ms "
+              f"({change:+.1f}%) {'REGRESSION' if regressed else ''}", file=sys.stderr)
+        if regressed:
+            regressions.append((kind, name, base["best_ms"], cur["best_ms"], round(change, 1)))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HealthLens cold-start benchmark")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    ap.add_argument("--min-ms", type=float, default=5.0, help="hide modules faster than this")
+    ap.add_argument("--out", default=None,
+                    help="result JSON path (default benchmarks/results/startup-<commit>.json)")
+    ap.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=15.0, help="allowed regression in percent")
+    args = ap.parse_args(argv)
+
+    current = run(max(1, args.runs), args.min_ms)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"startup-{current['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# benchmarks/loadtest.py
+"""
+Closed-loop load generator for the HealthLens API.
+
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 16 --duration 30
+    python -m benchmarks.loadtest --requests 500 --providers data/providers_input.csv --json out.json
+
+Each of --concurrency workers sends POST /verify back-to-back with
+payloads from a CSV (name,listed_phone,listed_address) or from the
+synthetic generator. Reports throughput and p50/p95/p99 latency.
+Run the API against benchmarks.replay_server so no real site is hit.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks import synthetic
+
+
+def _payloads(path, n_synthetic):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [
+                {"name": r["name"], "listed_phone": r.get("listed_phone"), "listed_address": r.get("listed_address")}
+                for r in csv.DictReader(f)
+            ]
+    else:
+        rows = [
+            {"name": p["name"], "listed_phone": p["listed_phone"], "listed_address": p["listed_address"]}
+            for p in synthetic.providers(n_synthetic)
+        ]
+    if not rows:
+        raise SystemExit("no payloads")
+    return itertools.cycle(rows)
+
+
+def _pct(sorted_vals, p):
+    if not sorted_vals:
+        return None
+    return sorted_vals[min(len(sorted_vals) - 1, int(p * len(sorted_vals)))]
+
+
+async def _worker(client, endpoint, payloads, deadline, budget, latencies, statuses):
+    while time.perf_counter() < deadline:
+        if budget is not None:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+        payload = next(payloads)
+        start = time.perf_counter()
+        try:
+            r = await client.post(endpoint, json=payload)
+            statuses[r.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url, endpoint, concurrency, duration, total, payloads, timeout):
+    latencies, statuses = [], Counter()
+    budget = [total] if total else None
+    deadline = time.perf_counter() + (duration if not total else 10 ** 9)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, endpoint, payloads, deadline, budget, latencies, statuses)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    lat = sorted(latencies)
+    ok = sum(v for k, v in statuses.items() if isinstance(k, int) and k < 400)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "url": url + endpoint,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(lat),
+        "ok": ok,
+        "errors": len(lat) - ok,
+        "throughput_rps": round(len(lat) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": ms(_pct(lat, 0.50)),
+            "p95": ms(_pct(lat, 0.95)),
+            "p99": ms(_pct(lat, 0.99)),
+            "max": ms(lat[-1] if lat else None),
+        },
+        "statuses": {str(k): v for k, v in statuses.items()},
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HealthLens /verify load generator")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--endpoint", default="/verify")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds (ignored with --requests)")
+    ap.add_argument("--requests", type=int, default=0, help="total requests instead of a duration")
+    ap.add_argument("--providers", default=None, help="CSV of providers (default: synthetic)")
+    ap.add_argument("--synthetic", type=int, default=1000, help="number of synthetic providers to cycle")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--json", default=None, help="also write the report to this path")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(run(
+        args.url.rstrip("/"), args.endpoint, args.concurrency, args.duration, args.requests,
+        _payloads(args.providers, args.synthetic), args.timeout,
+    ))
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
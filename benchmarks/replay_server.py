@@ -0,0 +1,171 @@
+# benchmarks/replay_server.py
+"""
+Local stand-in for Nominatim and hospital contact pages.
+
+Point the API at it with HEALTHLENS_REPLAY_BASE; every outbound request
+https://<host>/<path>?<query> then arrives here as /<host>/<path>?<query>.
+
+    python -m benchmarks.replay_server --port 8765 --latency-ms 150 --jitter-ms 100 \\
+        --error-rate 0.02 --timeout-rate 0.01
+    HEALTHLENS_REPLAY_BASE=http://127.0.0.1:8765 uvicorn api.main:app --port 8000
+
+Responses come from a recordings file (JSON list of entries, see
+benchmarks/recordings/sample.json). Unrecorded requests are synthesized
+deterministically unless --strict is given (then 404).
+With --record, misses are fetched from the real upstream and appended
+to the recordings file.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks import synthetic
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(__file__), "recordings", "sample.json")
+NOMINATIM_PATH = "/search"
+
+
+def _key(host, path, q=None):
+    return f"{host}{path}" + (f"?q={q.lower()}" if q else "")
+
+
+class Recordings:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for e in json.load(f):
+                    self.entries[_key(e["host"], e["path"], e.get("q"))] = e
+
+    def find(self, host, path, q=None):
+        return self.entries.get(_key(host, path, q)) or self.entries.get(_key(host, path))
+
+    def add(self, entry):
+        with self._lock:
+            self.entries[_key(entry["host"], entry["path"], entry.get("q"))] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(list(self.entries.values()), f, indent=2, ensure_ascii=False)
+
+
+def _rng_for(text):
+    return random.Random(int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], 16))
+
+
+def synthesize(host, path, q):
+    """Deterministic fake response for an unrecorded request."""
+    if path.rstrip("/") == NOMINATIM_PATH:
+        rng = _rng_for(q or "")
+        city = rng.choice(list(synthetic.CITIES))
+        lat = 17.0 + rng.random() * 2 if city == "Hyderabad" else 8.0 + rng.random() * 20
+        lon = 78.0 + rng.random() * 2 if city == "Hyderabad" else 72.0 + rng.random() * 16
+        body = [{
+            "display_name": f"{q}, {synthetic.address(rng, city)}",
+            "lat": f"{lat:.6f}",
+            "lon": f"{lon:.6f}",
+        }]
+        return 200, "application/json", json.dumps(body)
+    html = next(synthetic.contact_pages(1, seed=int(hashlib.sha1(host.encode()).hexdigest()[:8], 16)))
+    return 200, "text/html; charset=utf-8", html
+
+
+def make_handler(opts, recordings):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            if opts.verbose:
+                sys.stderr.write("replay: " + (fmt % args) + "\n")
+
+        def _send(self, status, ctype, body):
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            segs = parts.path.lstrip("/").split("/", 1)
+            host = segs[0]
+            path = "/" + (segs[1] if len(segs) > 1 else "")
+            q = (parse_qs(parts.query).get("q") or [None])[0]
+
+            # ---- injected latency / failures ----
+            delay = opts.latency_ms + (random.random() * opts.jitter_ms if opts.jitter_ms else 0)
+            if delay:
+                time.sleep(delay / 1000.0)
+            roll = random.random()
+            if roll < opts.timeout_rate:
+                time.sleep(opts.hang_seconds)
+                return self._send(504, "text/plain", "injected timeout")
+            if roll < opts.timeout_rate + opts.error_rate:
+                return self._send(500, "text/plain", "injected error")
+
+            entry = recordings.find(host, path, q)
+            if entry:
+                return self._send(entry.get("status", 200), entry.get("content_type", "text/html"), entry["body"])
+
+            if opts.record:
+                import requests
+                upstream = f"https://{host}{path}" + (f"?{parts.query}" if parts.query else "")
+                try:
+                    r = requests.get(upstream, headers={"User-Agent": self.headers.get("User-Agent", "HealthLens")},
+                                     timeout=15)
+                    entry = {"host": host, "path": path, "q": q, "status": r.status_code,
+                             "content_type": r.headers.get("Content-Type", "text/html"), "body": r.text}
+                    recordings.add(entry)
+                    return self._send(entry["status"], entry["content_type"], entry["body"])
+                except Exception as e:
+                    return self._send(502, "text/plain", f"record failed: {e}")
+
+            if opts.strict:
+                return self._send(404, "text/plain", "no recording")
+            return self._send(*synthesize(host, path, q))
+
+    return ReplayHandler
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HealthLens record/replay source stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--recordings", default=DEFAULT_RECORDINGS)
+    ap.add_argument("--record", action="store_true", help="fetch + save misses from the real upstream")
+    ap.add_argument("--strict", action="store_true", help="404 on unrecorded requests instead of synthesizing")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+    ap.add_argument("--timeout-rate", type=float, default=0.0, help="fraction that hang for --hang-seconds")
+    ap.add_argument("--hang-seconds", type=float, default=12.0)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--verbose", action="store_true")
+    opts = ap.parse_args(argv)
+
+    if opts.seed is not None:
+        random.seed(opts.seed)
+
+    recordings = Recordings(opts.recordings)
+    server = ThreadingHTTPServer((opts.host, opts.port), make_handler(opts, recordings))
+    server.daemon_threads = True
+    print(f"replay server on http://{opts.host}:{opts.port} ({len(recordings.entries)} recordings)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic data for benchmarks and load tests.
+
+Generates realistic-looking Indian provider records, addresses, phone
+numbers in the formats we see on hospital sites, scraped candidates and
+snapshot histories. Everything is a generator, so sizes up to 1M rows
+stream without being held in memory.
+
+    python -m benchmarks.synthetic providers 1000 > providers.csv
+    python -m benchmarks.synthetic history 10000 > history.json
+    python -m benchmarks.synthetic state 10000 > provider_state.json
+    python -m benchmarks.synthetic gazetteer 1000 > gazetteer.csv
+"""
+import csv
+import json
+import random
+import sys
+import time
+
+# -----------------------------------------
+# Vocabulary
+# -----------------------------------------
+CHAINS = [
+    "Apollo", "Yashoda", "Continental", "AIG", "Rainbow", "Basavatarakam",
+    "KIMS", "Care", "Medicover", "Sunshine", "Star", "Manipal", "Fortis",
+    "Narayana", "Max", "Aster", "Omega", "Citizens", "Gleneagles", "Sai",
+]
+KINDS = [
+    "Hospital", "Hospitals", "Multispeciality Hospital", "Clinic", "Diagnostics",
+    "Cancer Hospital", "Children's Hospital", "Heart Institute", "Eye Hospital",
+    "Nursing Home", "Medical Centre",
+]
+DOCTOR_NAMES = [
+    "Dr. Reddy's", "Dr. Rao's", "Dr. Sharma's", "Dr. Iyer's", "Dr. Gupta's",
+    "Dr. Naidu's", "Dr. Patel's", "Dr. Khan's", "Dr. Menon's", "Dr. Das's",
+]
+
+# city -> (state, STD code, pincode prefix, localities)
+CITIES = {
+    "Hyderabad": ("Telangana", "040", "500", [
+        "Banjara Hills", "Jubilee Hills", "Gachibowli", "Madhapur", "Kondapur",
+        "Secunderabad", "Somajiguda", "Ameerpet", "Kukatpally", "LB Nagar",
+    ]),
+    "Chennai": ("Tamil Nadu", "044", "600", [
+        "T Nagar", "Adyar", "Anna Nagar", "Velachery", "Guindy", "Mylapore",
+    ]),
+    "Mumbai": ("Maharashtra", "022", "400", [
+        "Andheri East", "Bandra West", "Powai", "Dadar", "Chembur", "Malad",
+    ]),
+    "Bengaluru": ("Karnataka", "080", "560", [
+        "Koramangala", "Indiranagar", "Whitefield", "Jayanagar", "HSR Layout",
+    ]),
+    "Delhi": ("Delhi", "011", "110", [
+        "Saket", "Dwarka", "Rohini", "Lajpat Nagar", "Karol Bagh",
+    ]),
+    "Pune": ("Maharashtra", "020", "411", [
+        "Kothrud", "Hadapsar", "Aundh", "Baner", "Viman Nagar",
+    ]),
+    "Kolkata": ("West Bengal", "033", "700", [
+        "Salt Lake", "Park Street", "Ballygunge", "Howrah", "New Town",
+    ]),
+}
+# approximate city centres, for synthetic geocodes
+CITY_CENTRES = {
+    "Hyderabad": (17.385, 78.4867), "Chennai": (13.0827, 80.2707), "Mumbai": (19.076, 72.8777),
+    "Bengaluru": (12.9716, 77.5946), "Delhi": (28.6139, 77.209), "Pune": (18.5204, 73.8567),
+    "Kolkata": (22.5726, 88.3639),
+}
+ROADS = ["Road No. {n}", "MG Road", "Main Road", "{n}th Cross", "Ring Road", "Station Road"]
+
+SOURCES = [
+    "Public Registry (via Nominatim placeholder)",
+    "Apollo Hospitals Website",
+    "Hospital Site 2 (example placeholder)",
+    "OpenStreetMap Nominatim API",
+    "Official Known Number",
+    "Hospital Website Phone Extractor",
+]
+
+
+# -----------------------------------------
+# Field generators
+# -----------------------------------------
+def provider_name(rng):
+    if rng.random() < 0.2:
+        return f"{rng.choice(DOCTOR_NAMES)} {rng.choice(KINDS)}"
+    return f"{rng.choice(CHAINS)} {rng.choice(KINDS)}"
+
+
+def address(rng, city=None):
+    city = city or rng.choice(list(CITIES))
+    state, _, pin_prefix, localities = CITIES[city]
+    road = rng.choice(ROADS).format(n=rng.randint(1, 45))
+    return (f"{rng.randint(1, 999)}-{rng.randint(1, 99)}, {road}, {rng.choice(localities)}, "
+            f"{city}, {state}, {pin_prefix}{rng.randint(1, 99):03d}, India")
+
+
+def phone_digits(rng, kind=None, city=None):
+    """Return (kind, canonical national digits)."""
+    kind = kind or rng.choices(["mobile", "landline", "tollfree"], weights=[5, 4, 1])[0]
+    if kind == "mobile":
+        return kind, rng.choice("6789") + "".join(rng.choice("0123456789") for _ in range(9))
+    if kind == "tollfree":
+        return kind, "1800" + "".join(rng.choice("0123456789") for _ in range(7))
+    std = CITIES[city or rng.choice(list(CITIES))][1]
+    return kind, std + "".join(rng.choice("0123456789") for _ in range(8))
+
+
+def format_phone(rng, kind, digits):
+    """Render canonical digits in one of the formats seen in the wild."""
+    if kind == "mobile":
+        return rng.choice([
+            digits,
+            f"+91{digits}",
+            f"+91-{digits}",
+            f"+91 {digits[:5]} {digits[5:]}",
+            f"0{digits}",
+            f"{digits[:5]}-{digits[5:]}",
+        ])
+    if kind == "tollfree":
+        return rng.choice([digits, f"{digits[:4]}-{digits[4:7]}-{digits[7:]}", f"{digits[:4]} {digits[4:]}"])
+    std, rest = digits[:3], digits[3:]
+    return rng.choice([
+        digits,
+        f"{std}-{rest}",
+        f"({std}) {rest[:4]} {rest[4:]}",
+        f"+91 {std[1:]} {rest[:4]} {rest[4:]}",
+        f"{std} {rest}",
+    ])
+
+
+def phone(rng, kind=None, city=None):
+    kind, digits = phone_digits(rng, kind, city)
+    return format_phone(rng, kind, digits)
+
+
+# -----------------------------------------
+# Record generators (all lazy)
+# -----------------------------------------
+def providers(n, seed=42):
+    """Listed provider inputs as the API receives them."""
+    rng = random.Random(seed)
+    for i in range(n):
+        city = rng.choice(list(CITIES))
+        yield {
+            "name": provider_name(rng) + f" {city}" + (f" {i}" if rng.random() < 0.5 else ""),
+            "listed_phone": phone(rng, city=city),
+            "listed_address": address(rng, city),
+            "source": rng.choice(["our_directory", "partner_feed"]),
+        }
+
+
+def gazetteer_rows(n, seed=42):
+    """Geocodes for providers(n, seed), as a CSV gazetteer (see verification/gazetteer.py)."""
+    rng = random.Random(seed + 1)
+    for p in providers(n, seed):
+        city = p["listed_address"].split(", ")[-4]
+        lat, lon = CITY_CENTRES[city]
+        yield {
+            "name": p["name"],
+            "display_name": f"{p['name']}, {p['listed_address']}",
+            "lat": round(lat + rng.gauss(0, 0.04), 6),
+            "lon": round(lon + rng.gauss(0, 0.04), 6),
+        }
+
+
+def _perturb(rng, text):
+    """Small typo / abbreviation noise as seen across sources."""
+    if not text or rng.random() < 0.5:
+        return text
+    repl = [("Road", "Rd"), ("Hospital", "Hosp."), ("Number", "No."), (",", ""), ("Hills", "Hls")]
+    a, b = rng.choice(repl)
+    return text.replace(a, b, 1)
+
+
+def candidates_for(rng, listed, k=None):
+    """Scraped candidates for one listed provider (agreeing with noise)."""
+    k = k or rng.randint(2, 5)
+    now = time.time()
+    out = []
+    for _ in range(k):
+        agree = rng.random() < 0.7
+        out.append({
+            "source": rng.choice(SOURCES),
+            "name": listed["name"] if agree else _perturb(rng, listed["name"]),
+            "address": _perturb(rng, listed["listed_address"]) if agree else address(rng),
+            "phone": listed["listed_phone"] if agree else phone(rng),
+            "website": None,
+            "retrieved_at": now - rng.randint(0, 30 * 86400),
+        })
+    return out
+
+
+def _typo(rng, text):
+    """One dropped, doubled or swapped character."""
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    op = rng.choice(["drop", "double", "swap"])
+    if op == "drop":
+        return text[:i] + text[i + 1:]
+    if op == "double":
+        return text[:i] + text[i] + text[i:]
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def typeahead_queries(n, pool, seed=42):
+    """Partial (and sometimes misspelled) names of providers(pool, seed), as typed into the verify form."""
+    rng = random.Random(seed + 5)
+    names = [p["name"] for p in providers(min(pool, 10000), seed)]
+    for _ in range(n):
+        name = rng.choice(names)
+        q = name[:rng.randint(min(4, len(name)), len(name))]
+        yield _typo(rng, q) if rng.random() < 0.3 else q
+
+
+def partner_feed(n, day=0, change_rate=0.003, seed=42):
+    """
+    A partner's full daily re-send of n providers (with an id column):
+    each day ~change_rate of the rows get a new phone or address, and
+    a few providers are dropped or added.
+    """
+    rows = {}
+    for i, p in enumerate(providers(n, seed)):
+        rows[f"P{i:07d}"] = dict(p, id=f"P{i:07d}", source="partner_feed")
+    next_id = n
+    for d in range(1, day + 1):
+        rng = random.Random(seed * 1000 + d)
+        for pid in [k for k in rows if rng.random() < change_rate]:
+            r = rng.random()
+            if r < 0.7:
+                row = rows[pid] = dict(rows[pid])
+                city = row["listed_address"].split(", ")[-4]
+                if rng.random() < 0.5:
+                    row["listed_phone"] = phone(rng, city=city)
+                else:
+                    row["listed_address"] = address(rng, city)
+            elif r < 0.85:
+                del rows[pid]
+            else:
+                new = next(providers(1, seed=seed * 1000 + next_id))
+                rows[f"P{next_id:07d}"] = dict(new, id=f"P{next_id:07d}", source="partner_feed")
+                next_id += 1
+    return list(rows.values())
+
+
+def verification_cases(n, seed=42):
+    """(listed, candidates) pairs for scoring / resolution benchmarks."""
+    rng = random.Random(seed + 1)
+    for listed in providers(n, seed):
+        yield listed, candidates_for(rng, listed)
+
+
+def snapshot_pairs(n, seed=42):
+    """(old, new) snapshot candidates for drift benchmarks."""
+    rng = random.Random(seed + 2)
+    for listed in providers(n, seed):
+        old = {"name": listed["name"], "address": listed["listed_address"], "phone": listed["listed_phone"]}
+        new = dict(old)
+        r = rng.random()
+        if r < 0.3:
+            new["address"] = address(rng)
+        elif r < 0.5:
+            new["phone"] = phone(rng)
+        elif r < 0.6:
+            new["name"] = _perturb(rng, new["name"])
+        yield old, new
+
+
+def contact_pages(n, seed=42):
+    """Synthetic hospital contact-page HTML with tel: links and inline numbers."""
+    rng = random.Random(seed + 3)
+    filler = "<p>" + " ".join(["Our specialists are available round the clock."] * 8) + "</p>"
+    for _ in range(n):
+        tel_kind, tel = phone_digits(rng)
+        txt = phone(rng)
+        yield (
+            "<html><head><title>Contact Us</title></head><body>"
+            f"<nav><a href='/'>Home</a><a href='/doctors'>Doctors</a></nav>{filler}"
+            f"<div class='contact'><a href='tel:{format_phone(rng, tel_kind, tel)}'>Call us</a>"
+            f"<address>{address(rng)}</address><p>Emergency: {txt}</p></div>"
+            f"{filler}<footer>© Hospital</footer></body></html>"
+        )
+
+
+def snapshot_history(n_snapshots, providers_count=None, seed=42):
+    """
+    history.json-shaped dict with n_snapshots snapshots spread across
+    providers (default ~10 snapshots per provider).
+    """
+    rng = random.Random(seed + 4)
+    providers_count = providers_count or max(1, n_snapshots // 10)
+    base = list(providers(providers_count, seed))
+    hist = {}
+    ts0 = int(time.time()) - 365 * 86400
+    for i in range(n_snapshots):
+        listed = base[i % providers_count]
+        key = "".join(ch.lower() if ch.isalnum() else "-" for ch in listed["name"])
+        key = "-".join(p for p in key.split("-") if p)[:200]
+        entry = hist.setdefault(key, {"name": listed["name"], "snapshots": []})
+        ts = ts0 + (i // providers_count) * 86400 + rng.randint(0, 3600)
+        entry["snapshots"].append({
+            "ts": ts,
+            "candidate": {
+                "name": listed["name"],
+                "address": listed["listed_address"] if rng.random() < 0.9 else address(rng),
+                "phone": listed["listed_phone"] if rng.random() < 0.9 else phone(rng),
+                "website": None,
+                "retrieved_at": ts,
+            },
+        })
+    return hist
+
+
+def provider_state(n, seed=42):
+    """provider_state.json-shaped dict (view entries by slug, as provider_state imports) for n providers."""
+    rng = random.Random(seed + 5)
+    ts0 = int(time.time()) - 30 * 86400
+    view = {}
+    for i, listed in enumerate(providers(n, seed)):
+        key = "".join(ch.lower() if ch.isalnum() else "-" for ch in listed["name"])
+        key = "-".join(p for p in key.split("-") if p)[:200]
+        ts = ts0 + rng.randint(0, 30 * 86400)
+        conf = round(rng.uniform(20, 100), 2)
+        snapshot = {"name": listed["name"], "address": listed["listed_address"],
+                    "phone": listed["listed_phone"], "website": None, "retrieved_at": ts}
+        view[key] = {
+            "slug": key,
+            "name": listed["name"],
+            "snapshot_count": rng.randint(1, 20),
+            "latest_snapshot": snapshot,
+            "latest_snapshot_ts": ts,
+            "consensus": dict(snapshot, lat=round(rng.uniform(8, 30), 5), lon=round(rng.uniform(70, 90), 5)),
+            "final_confidence": conf,
+            "flag_for_manual_review": conf < 70,
+            "drift": {"drift_score": round(rng.random() * 0.3, 3)},
+            "verified_at": ts,
+            "updated_at": ts,
+        }
+    return view
+
+
+if __name__ == "__main__":
+    what = sys.argv[1] if len(sys.argv) > 1 else "providers"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    if what == "providers":
+        w = csv.DictWriter(sys.stdout, fieldnames=["name", "listed_phone", "listed_address", "source"])
+        w.writeheader()
+        for row in providers(n):
+            w.writerow(row)
+    elif what == "gazetteer":
+        w = csv.DictWriter(sys.stdout, fieldnames=["name", "display_name", "lat", "lon"])
+        w.writeheader()
+        for row in gazetteer_rows(n):
+            w.writerow(row)
+    elif what == "feed":
+        # python -m benchmarks.synthetic feed N [DAY]
+        day = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        w = csv.DictWriter(sys.stdout, fieldnames=["id", "name", "listed_phone", "listed_address", "source"])
+        w.writeheader()
+        for row in partner_feed(n, day):
+            w.writerow(row)
+    elif what == "history":
+        json.dump(snapshot_history(n), sys.stdout, indent=2, ensure_ascii=False)
+    elif what == "state":
+        json.dump(provider_state(n), sys.stdout, ensure_ascii=False)
+    else:
+        raise SystemExit("usage: python -m benchmarks.synthetic [providers|history|gazetteer|feed|state] N")
@@ -31,6 +31,48 @@ if st.button("Submit Correction"):
         st.error(str(e))
 
 
+st.header("Review Queue")
+
+# one page at a time; "Next page" follows the API's cursor
+if "review_cursor" not in st.session_state:
+    st.session_state.review_cursor = None
+sort = st.selectbox("Sort by", ["confidence", "age", "newest"])
+params = {"sort": sort, "limit": 20}
+if st.session_state.review_cursor:
+    params["cursor"] = st.session_state.review_cursor
+
+try:
+    queue = requests.get("http://localhost:8000/admin/review", params=params).json()
+    st.caption(f"{queue['counts']['open']} open, {queue['counts']['claimed']} claimed")
+    for item in queue["items"]:
+        with st.expander(f"{item['provider_name']} — confidence {item['confidence']}"):
+            st.json({"listed": item["listed"], "consensus": item["candidate"]})
+            cols = st.columns(2)
+            for col, decision in zip(cols, ("approve", "reject")):
+                if col.button(decision.capitalize(), key=f"{decision}-{item['id']}"):
+                    r = requests.post(f"http://localhost:8000/admin/review/{item['id']}/resolve",
+                                      json={"decision": decision, "admin_user": "admin"})
+                    st.write(r.json())
+    cols = st.columns(2)
+    if st.session_state.review_cursor and cols[0].button("First page"):
+        st.session_state.review_cursor = None
+        st.rerun()
+    if queue.get("next_cursor") and cols[1].button("Next page"):
+        st.session_state.review_cursor = queue["next_cursor"]
+        st.rerun()
+except Exception as e:
+    st.error(str(e))
+
+
+st.header("Dashboard Stats")
+if st.button("Show stats (last 30 days)"):
+    try:
+        r = requests.get("http://localhost:8000/admin/stats", params={"days": 30})
+        st.json(r.json())
+    except Exception as e:
+        st.error(str(e))
+
+
 st.header("View History File")
 if st.button("Show history.json"):
     try:
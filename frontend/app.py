@@ -60,6 +60,18 @@ def call_verify(provider: str, phone: str, address: str, timeout=15):
     r.raise_for_status()
     return r.json()
 
+def stream_verify(provider: str, phone: str, address: str, timeout=15):
+    """(event, data) pairs from /verify/stream as the backend produces them."""
+    payload = {"name": provider, "listed_phone": phone, "listed_address": address}
+    with requests.post(f"{API_BASE}/verify/stream", json=payload, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        event = None
+        for line in r.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[5:])
+
 def save_search_history_local(username: str, provider: str, phone: str, address: str, result: dict):
     payload = {
         "username": username,
@@ -78,11 +90,29 @@ def fetch_user_history(username: str):
     r.raise_for_status()
     return r.json()
 
+def fetch_result(result_id: str):
+    r = requests.get(f"{API_BASE}/history/result/{result_id}", timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+def _entry_result(r: dict):
+    """History entries reference results by hash; older ones inline them."""
+    if r.get("result") is not None:
+        return r["result"]
+    if r.get("result_id"):
+        return fetch_result(r["result_id"])
+    return None
+
 def fetch_all_history():
     r = requests.get(f"{API_BASE}/history", params={"admin": True})
     r.raise_for_status()
     return r.json()
 
+def fetch_admin_stats(days: int = 30):
+    r = requests.get(f"{API_BASE}/admin/stats", params={"days": days}, timeout=10)
+    r.raise_for_status()
+    return r.json()
+
 def submit_feedback(payload):
     r = requests.post(f"{API_BASE}/feedback", json=payload, timeout=12)
     r.raise_for_status()
@@ -227,8 +257,25 @@ def page_verify():
         submitted = st.form_submit_button("Verify Provider")
     if submitted:
         try:
-            with st.spinner("Verifying provider..."):
-                result = call_verify(provider.strip(), phone.strip(), address.strip())
+            # partial results while the slower sources are still running
+            status = st.empty()
+            sources = st.empty()
+            seen, result = [], None
+            status.info("Checking sources...")
+            for event, data in stream_verify(provider.strip(), phone.strip(), address.strip()):
+                if event == "source":
+                    seen.append(f"{data['source']}: {data['outcome']} ({data['elapsed_ms']} ms)")
+                    sources.caption(" · ".join(seen))
+                elif event == "confidence":
+                    status.info(f"Confidence so far: {data['final_confidence']} "
+                                f"({data['sources']} source(s))")
+                elif event == "result":
+                    result = data
+                elif event == "error":
+                    raise RuntimeError(data.get("detail"))
+            if result is None:
+                raise RuntimeError("stream ended without a result")
+            status.empty()
             st.success("Verification complete")
             st.markdown('<div class="result-box">', unsafe_allow_html=True)
             col1, col2 = st.columns([1,2])
@@ -280,7 +327,9 @@ def page_history():
             for r in reversed(all_hist[-200:]):
                 with st.expander(f"{r.get('provider')} — {time.ctime(r.get('timestamp'))}"):
                     st.write("User:", r.get("username"))
-                    st.json(r.get("result"))
+                    st.write("Result summary:", (r.get("summary") or {}).get("final_confidence"))
+                    if st.button("Open result", key=f"admin_open{r.get('result_id')}{r.get('timestamp')}"):
+                        st.json(_entry_result(r))
         except Exception as e:
             st.error("Failed to load history: " + str(e))
     else:
@@ -297,9 +346,10 @@ def page_history():
                     st.write("Provider:", r.get("provider"))
                     st.write("Phone:", r.get("listed_phone"))
                     st.write("Address:", r.get("listed_address"))
-                    st.write("Result summary:", r.get("result", {}).get("final_confidence") or r.get("result", {}).get("confidence"))
+                    summary = r.get("summary") or r.get("result") or {}
+                    st.write("Result summary:", summary.get("final_confidence") or summary.get("confidence"))
                     if st.button(f"Open result {r.get('timestamp')}", key=f"open{r.get('timestamp')}"):
-                        st.json(r.get("result"))
+                        st.json(_entry_result(r))
         except Exception as e:
             st.error("Failed to load user history: " + str(e))
 
@@ -307,12 +357,26 @@ def page_admin():
     st.header("🛠 Admin Panel")
     st.markdown("Approve corrections or view / export history.")
     try:
-        all_hist = fetch_all_history()
-        st.write("Total searches:", len(all_hist))
+        stats = fetch_admin_stats()
     except Exception as e:
-        st.error("Failed to load history: " + str(e))
+        st.error("Failed to load stats: " + str(e))
         return
 
+    totals = stats.get("totals", {})
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Verifications (30d)", totals.get("verifications", 0))
+    c2.metric("Avg confidence", totals.get("avg_confidence") or "–")
+    c3.metric("Flag rate", f"{round((totals.get('flag_rate') or 0) * 100, 1)}%")
+    c4.metric("Drift events", totals.get("drift_events", 0))
+    st.bar_chart({s["day"]: s["verifications"] for s in stats.get("series", [])})
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("Confidence distribution", totals.get("confidence_buckets", {}))
+        st.write("Drift by field", totals.get("drift_fields", {}))
+    with col2:
+        st.write("Sources", stats.get("sources", {}))
+        st.write("Top providers", stats.get("top_providers", []))
+
     st.markdown("### Quick Approve / Correct")
     with st.form("admin_approve"):
         provider = st.text_input("Provider name")
@@ -1,9 +1,19 @@
-from flask import Flask, render_template, request, redirect, session, jsonify
-import requests, json, time, hashlib, os
+from flask import Flask, render_template, request, redirect, session, jsonify, Response
+import requests, json, time, hashlib, os, threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_BASE = "https://healthlens-1.onrender.com"
 ADMIN_PASSWORD = "RANK"
 
+# (connect, read) timeouts for backend calls; /verify scrapes several sites
+API_TIMEOUT = (3.05, 20)
+VERIFY_TIMEOUT = (3.05, 60)
+
+HISTORY_PAGE_SIZE = 20
+REVIEW_PAGE_SIZE = 20
+HISTORY_CACHE_TTL = 15   # seconds
+
 app = Flask(__name__)
 from datetime import datetime
 @app.template_filter('datetimeformat')
@@ -36,6 +46,76 @@ def hash_pw(pw):
     return hashlib.sha256(pw.encode()).hexdigest()
 
 
+# ----------------------------
+# Backend API client (pooled keep-alive session)
+# ----------------------------
+def _make_api_session():
+    s = requests.Session()
+    # retry idempotent GETs on connection hiccups (render.com cold starts)
+    retry = Retry(total=2, connect=2, backoff_factor=0.3,
+                  status_forcelist=(502, 503, 504), allowed_methods=frozenset(["GET"]))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+api = _make_api_session()
+
+def api_get(path, timeout=API_TIMEOUT, headers=None, **params):
+    r = api.get(f"{API_BASE}{path}", params=params, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r
+
+def api_post(path, payload, timeout=API_TIMEOUT):
+    r = api.post(f"{API_BASE}{path}", json=payload, timeout=timeout)
+    r.raise_for_status()
+    return r
+
+
+# short-lived cache of history pages: (user, page) -> (expires_at, rows, total, etag);
+# once expired, a page is revalidated with If-None-Match (304: no body sent)
+_history_cache = {}
+_history_lock = threading.Lock()
+
+def _history_key(user):
+    return "__admin__" if user["admin"] else user["email"]
+
+def fetch_history_page(user, page):
+    key = (_history_key(user), page)
+    now = time.time()
+    with _history_lock:
+        hit = _history_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1], hit[2]
+
+    params = {"limit": HISTORY_PAGE_SIZE, "offset": page * HISTORY_PAGE_SIZE, "newest_first": True}
+    if user["admin"]:
+        params["admin"] = True
+    else:
+        params["username"] = user["email"]
+    headers = {"If-None-Match": hit[3]} if hit and hit[3] else None
+    r = api_get("/history", headers=headers, **params)
+    if r.status_code == 304:
+        rows, total = hit[1], hit[2]
+    else:
+        rows = r.json()
+        total = int(r.headers.get("X-Total-Count", len(rows)))
+
+    with _history_lock:
+        if len(_history_cache) > 512:
+            for k in [k for k, v in _history_cache.items() if v[0] <= now]:
+                del _history_cache[k]
+        _history_cache[key] = (now + HISTORY_CACHE_TTL, rows, total, r.headers.get("ETag"))
+    return rows, total
+
+def invalidate_history(user):
+    # a new search changes the user's pages and the admin (all users) pages
+    owners = {_history_key(user), "__admin__"}
+    with _history_lock:
+        for k in [k for k in _history_cache if k[0] in owners]:
+            del _history_cache[k]
+
+
 # ----------------------------
 # ROUTES
 # ----------------------------
@@ -118,48 +198,129 @@ def verify():
         phone = request.form.get("phone")
         address = request.form.get("address")
 
+        # the API records the search in history itself (username below)
         payload = {
             "name": provider,
             "listed_phone": phone,
-            "listed_address": address
-        }
-        r = requests.post(f"{API_BASE}/verify", json=payload)
-        result = r.json()
-
-        # save history
-        history_payload = {
-            "username": session["user"]["email"],
-            "provider": provider,
-            "listed_phone": phone,
             "listed_address": address,
-            "result": result,
-            "timestamp": int(time.time())
+            "username": session["user"]["email"]
         }
-        requests.post(f"{API_BASE}/history/record", json=history_payload)
+        try:
+            result = api_post("/verify", payload, timeout=VERIFY_TIMEOUT).json()
+        except requests.RequestException as e:
+            return render_template("verify.html", result=None, user=session["user"],
+                                   error=f"Verification service unavailable: {e}")
+        invalidate_history(session["user"])
 
     return render_template("verify.html", result=result, user=session["user"])
 
 
+# progressive results: relays the API's /verify/stream (Server-Sent Events)
+# to the EventSource in verify.html
+@app.route("/verify/stream")
+def verify_stream():
+    if "user" not in session:
+        return jsonify({"error": "login required"}), 401
+
+    user = session["user"]
+    params = {
+        "name": request.args.get("provider"),
+        "listed_phone": request.args.get("phone"),
+        "listed_address": request.args.get("address"),
+        "username": user["email"]
+    }
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    try:
+        r = api.get(f"{API_BASE}/verify/stream", params=params, stream=True, timeout=VERIFY_TIMEOUT)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        body = "event: error\ndata: " + json.dumps({"detail": f"Verification service unavailable: {e}"}) + "\n\n"
+        return Response(body, mimetype="text/event-stream", headers=headers)
+
+    def relay():
+        try:
+            for chunk in r.iter_content(chunk_size=None):
+                yield chunk
+        finally:
+            r.close()
+            invalidate_history(user)
+
+    return Response(relay(), mimetype="text/event-stream", headers=headers)
+
+
 # USER HISTORY ----------------------
 @app.route("/history")
 def history():
     if "user" not in session:
         return redirect("/login")
 
-    email = session["user"]["email"]
-    if session["user"]["admin"]:
-        r = requests.get(f"{API_BASE}/history", params={"admin": True})
-    else:
-        r = requests.get(f"{API_BASE}/history", params={"username": email})
+    page = max(0, request.args.get("page", 0, type=int))
+    try:
+        data, total = fetch_history_page(session["user"], page)
+    except requests.RequestException as e:
+        return render_template("history.html", history=[], user=session["user"],
+                               page=page, pages=0, error=f"Could not load history: {e}")
 
-    data = r.json()
-    return render_template("history.html", history=data, user=session["user"])
+    pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    return render_template("history.html", history=data, user=session["user"],
+                           page=page, pages=pages, total=total)
+
+
+# full result for one history entry, fetched lazily by history.html
+@app.route("/history/result/<result_id>")
+def history_result(result_id):
+    if "user" not in session:
+        return jsonify({"error": "login required"}), 401
+    try:
+        r = api_get(f"/history/result/{result_id}")
+    except requests.RequestException as e:
+        return jsonify({"error": str(e)}), 502
+    # results are immutable: let the browser keep them
+    resp = jsonify(r.json())
+    for h in ("ETag", "Cache-Control"):
+        if h in r.headers:
+            resp.headers[h] = r.headers[h]
+    return resp
 
 
 # ADMIN PANEL ------------------------
+def _is_admin():
+    return "user" in session and session["user"]["admin"]
+
+def _api_error(e):
+    try:
+        return e.response.json().get("detail") or str(e)
+    except Exception:
+        return str(e)
+
+def render_admin(response=None, error=None):
+    # pre-aggregated server side; one small call regardless of history size
+    try:
+        stats = api_get("/admin/stats", days=request.args.get("days", 30, type=int)).json()
+    except requests.RequestException:
+        stats = None
+
+    # one page of the review queue (cursor from the previous page's "next")
+    sort = request.args.get("sort", "confidence")
+    cursor = request.args.get("cursor")
+    params = {"sort": sort, "limit": REVIEW_PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
+    try:
+        queue = api_get("/admin/review", **params).json()
+        # claimed items leave the open list; keep this admin's own in view
+        mine = api_get("/admin/review", status="claimed", claimed_by=session["user"]["email"],
+                       sort=sort, limit=REVIEW_PAGE_SIZE).json()["items"]
+    except requests.RequestException as e:
+        queue, mine = None, []
+        error = error or f"Could not load review queue: {_api_error(e)}"
+
+    return render_template("admin.html", response=response, stats=stats, queue=queue, mine=mine,
+                           sort=sort, cursor=cursor, error=error, user=session["user"])
+
 @app.route("/admin", methods=["GET","POST"])
 def admin_page():
-    if "user" not in session or not session["user"]["admin"]:
+    if not _is_admin():
         return redirect("/login")
 
     response = None
@@ -173,11 +334,69 @@ def admin_page():
             "decision": "approve",
             "admin_user": "admin"
         }
-        r = requests.post(f"{API_BASE}/feedback", json=payload)
-        response = r.json()
+        try:
+            response = api_post("/feedback", payload).json()
+        except requests.RequestException as e:
+            response = {"error": str(e)}
+
+    return render_admin(response)
+
+
+# claim / release / approve / reject one review-queue item
+@app.route("/admin/review/<int:item_id>", methods=["POST"])
+def admin_review(item_id):
+    if not _is_admin():
+        return redirect("/login")
+
+    action = request.form.get("action")
+    admin_user = session["user"]["email"]
+    try:
+        if action in ("claim", "release"):
+            api_post(f"/admin/review/{item_id}/{action}", {"admin_user": admin_user})
+            return render_admin()
+        if action not in ("approve", "reject"):
+            return render_admin(error=f"Unknown action: {action}")
+        payload = {
+            "decision": action,
+            "corrected_name": request.form.get("name") or None,
+            "corrected_address": request.form.get("address") or None,
+            "corrected_phone": request.form.get("phone") or None,
+            "accepted_candidate_source": request.form.get("source") or None,
+            "admin_user": admin_user
+        }
+        payload = {k: v for k, v in payload.items() if v is not None}
+        response = api_post(f"/admin/review/{item_id}/resolve", payload).json()
+    except requests.RequestException as e:
+        return render_admin(error=f"Review item {item_id}: {_api_error(e)}")
+    return render_admin(response)
+
 
-    return render_template("admin.html", response=response, user=session["user"])
 
+# directory download: relays the API's streamed /export without buffering it
+@app.route("/admin/export")
+def admin_export():
+    if not _is_admin():
+        return redirect("/login")
+
+    params = {k: request.args.get(k) for k in ("format", "min_confidence", "changed_since", "region")}
+    params = {k: v for k, v in params.items() if v}
+    if request.args.get("exclude_flagged"):
+        params["exclude_flagged"] = "true"
+    try:
+        r = api.get(f"{API_BASE}/export", params=params, stream=True, timeout=API_TIMEOUT)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        return render_admin(error=f"Export failed: {_api_error(e)}")
+
+    def relay():
+        try:
+            for chunk in r.iter_content(chunk_size=None):
+                yield chunk
+        finally:
+            r.close()
+
+    headers = {h: r.headers[h] for h in ("Content-Disposition",) if h in r.headers}
+    return Response(relay(), content_type=r.headers.get("Content-Type"), headers=headers)
 
 # LOGOUT -----------------------------
 @app.route("/logout")
@@ -0,0 +1,293 @@
+# monitoring/metrics.py
+import os
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+
+from monitoring import tracing
+
+# -----------------------------------------
+# Lightweight in-process metrics registry
+# rendered in Prometheus text exposition format.
+# Hot path cost per observation is one lock + one bisect.
+# -----------------------------------------
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+
+# Files whose size is reported as healthlens_storage_bytes{file=...}
+STORAGE_FILES = {
+    "history": os.path.join(DATA_DIR, "history.json"),
+    "search_history": os.path.join(DATA_DIR, "search_history.json"),
+    "source_weights": os.path.join(DATA_DIR, "source_weights.json"),
+    "stats": os.path.join(DATA_DIR, "stats.json"),
+    "provider_state": os.path.join(DATA_DIR, "provider_state.db"),
+    "review_queue": os.path.join(DATA_DIR, "review_queue.db"),
+}
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{n}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _fmt(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, doc, labels=()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def get(self, *label_values):
+        return self._values.get(label_values, 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for lv, v in items:
+            yield self.name, _label_str(self.labels, lv), v
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, doc, labels=(), fn=None):
+        """fn (optional) is called at render time and returns {label_values: value}."""
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values = {}
+        self._fn = fn
+        self._lock = threading.Lock()
+
+    def set(self, *label_values, value):
+        with self._lock:
+            self._values[label_values] = float(value)
+
+    def inc(self, *label_values, amount=1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = dict(self._values)
+        if self._fn:
+            items.update(self._fn())
+        for lv, v in items.items():
+            yield self.name, _label_str(self.labels, lv), v
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label_values -> [bucket_counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            s[idx] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(lv, list(s)) for lv, s in self._series.items()]
+        names = self.labels + ("le",)
+        for lv, s in items:
+            running = 0
+            for i, upper in enumerate(self.buckets + (float("inf"),)):
+                running += s[i]
+                yield self.name + "_bucket", _label_str(names, lv + (_fmt(float(upper)),)), running
+            yield self.name + "_sum", _label_str(self.labels, lv), s[-2]
+            yield self.name + "_count", _label_str(self.labels, lv), s[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for m in self._metrics:
+            lines.append(f"# HELP {m.name} {m.doc}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for name, labels, value in m.samples():
+                lines.append(f"{name}{labels} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# -----------------------------------------
+# HealthLens metrics
+# -----------------------------------------
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "healthlens_stage_seconds",
+    "Latency of pipeline stages (controller, scrape, verify, confidence, drift).",
+    labels=("stage",),
+))
+
+SOURCE_SECONDS = REGISTRY.register(Histogram(
+    "healthlens_source_seconds",
+    "Latency of individual scraper/source calls.",
+    labels=("source",),
+))
+
+SOURCE_OUTCOMES = REGISTRY.register(Counter(
+    "healthlens_source_outcomes_total",
+    "Source call outcomes (hit, empty, error, timeout; skipped = not queried after early stop).",
+    labels=("source", "outcome"),
+))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "healthlens_cache_requests_total",
+    "Cache lookups by result (hit or miss).",
+    labels=("cache", "result"),
+))
+
+OUTBOUND_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "healthlens_outbound_wait_seconds",
+    "Time outbound requests waited for a per-host rate-limit slot.",
+    labels=("host", "priority"),
+))
+
+OUTBOUND_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "healthlens_outbound_queue_depth",
+    "Outbound requests currently waiting for a per-host slot.",
+    labels=("host", "priority"),
+))
+
+OUTBOUND_REQUESTS = REGISTRY.register(Counter(
+    "healthlens_outbound_requests_total",
+    "Outbound requests by scheduler result (sent, timeout = gave up waiting for a slot).",
+    labels=("host", "priority", "result"),
+))
+
+
+def _cache_ratios():
+    out = {}
+    caches = {lv[0] for lv in list(CACHE_REQUESTS._values)}
+    for c in caches:
+        hits = CACHE_REQUESTS.get(c, "hit")
+        total = hits + CACHE_REQUESTS.get(c, "miss")
+        out[(c,)] = hits / total if total else 0.0
+    return out
+
+
+def _storage_sizes():
+    out = {}
+    for label, path in STORAGE_FILES.items():
+        try:
+            out[(label,)] = os.path.getsize(path)
+        except OSError:
+            out[(label,)] = 0
+    return out
+
+
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "healthlens_cache_hit_ratio",
+    "Hit ratio per cache since process start.",
+    labels=("cache",),
+    fn=_cache_ratios,
+))
+
+STORAGE_BYTES = REGISTRY.register(Gauge(
+    "healthlens_storage_bytes",
+    "Size of on-disk storage files in bytes.",
+    labels=("file",),
+    fn=_storage_sizes,
+))
+
+
+# -----------------------------------------
+# Instrumentation helpers
+# -----------------------------------------
+class timed:
+    """
+    Context manager / decorator that records a stage latency.
+
+        with timed("scrape"):
+            ...
+
+        @timed("compute_confidence")
+        def compute_confidence(...): ...
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        STAGE_SECONDS.observe(self.stage, value=seconds)
+        trace = tracing.current()
+        if trace is not None:
+            trace.add(self.stage, self._start, seconds)
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                STAGE_SECONDS.observe(stage, value=seconds)
+                trace = tracing.current()
+                if trace is not None:
+                    trace.add(stage, start, seconds)
+        return wrapper
+
+
+def observe_source(source, outcome, seconds, started=None):
+    SOURCE_SECONDS.observe(source, value=seconds)
+    SOURCE_OUTCOMES.inc(source, outcome)
+    trace = tracing.current()
+    if trace is not None:
+        if started is None:
+            started = time.perf_counter() - seconds
+        trace.add("source:" + source, started, seconds, outcome=outcome)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def render():
+    return REGISTRY.render()
@@ -0,0 +1,108 @@
+# monitoring/profiling.py
+import os
+import io
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+# -----------------------------------------
+# Slow-request profiler.
+# When a threshold is set, every request runs under cProfile (and
+# tracemalloc is tracing); requests slower than the threshold get their
+# profile + top allocations dumped to PROFILE_DIR. 0 disables.
+# Threshold can be changed at runtime via set_slow_threshold().
+# -----------------------------------------
+PROFILE_DIR = os.environ.get(
+    "HEALTHLENS_PROFILE_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/profiles"),
+)
+
+_state = {
+    "slow_seconds": float(os.environ.get("HEALTHLENS_SLOW_REQUEST_SECONDS", "0") or 0),
+    "dumps": 0,
+}
+
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 40
+
+
+def get_config():
+    return {
+        "slow_request_seconds": _state["slow_seconds"],
+        "profile_dir": os.path.abspath(PROFILE_DIR),
+        "dumps_written": _state["dumps"],
+        "tracemalloc_active": tracemalloc.is_tracing(),
+    }
+
+
+def set_slow_threshold(seconds):
+    seconds = max(0.0, float(seconds or 0))
+    _state["slow_seconds"] = seconds
+    if not seconds and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return get_config()
+
+
+def list_dumps():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(os.listdir(PROFILE_DIR), reverse=True)
+
+
+def _safe_label(label):
+    s = "".join(ch.lower() if ch.isalnum() else "-" for ch in str(label or "request"))
+    return "-".join(p for p in s.split("-") if p)[:60] or "request"
+
+
+def _dump(profiler, elapsed, label):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{_safe_label(label)}")
+
+    profiler.dump_stats(base + ".prof")
+
+    out = io.StringIO()
+    out.write(f"request: {label}\nelapsed_seconds: {elapsed:.3f}\n\n")
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    if tracemalloc.is_tracing():
+        out.write("\n--- top allocations (tracemalloc) ---\n")
+        for stat in tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]:
+            out.write(f"{stat}\n")
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(out.getvalue())
+
+    _state["dumps"] += 1
+    return base
+
+
+@contextmanager
+def profile_if_slow(label=None):
+    """Profile the enclosed block; dump to disk only if it exceeds the threshold."""
+    threshold = _state["slow_seconds"]
+    if not threshold:
+        yield
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler is already active on this thread
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        if elapsed >= threshold:
+            try:
+                _dump(profiler, elapsed, label)
+            except Exception:
+                pass
@@ -0,0 +1,57 @@
+# monitoring/tracing.py
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+# -----------------------------------------
+# Opt-in per-request tracing.
+# metrics.timed / metrics.observe_source append spans to the active
+# trace (if any), so instrumented code needs no extra calls.
+# -----------------------------------------
+TRACE_HEADER = "X-HealthLens-Trace"
+
+_current = ContextVar("healthlens_trace", default=None)
+
+
+class Trace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = []
+
+    def add(self, stage, started, seconds, **extra):
+        span = {
+            "stage": stage,
+            "start_ms": round((started - self.start) * 1000, 3),
+            "duration_ms": round(seconds * 1000, 3),
+        }
+        span.update(extra)
+        self.spans.append(span)
+
+    def summary(self):
+        spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return {
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": spans,
+        }
+
+
+def current():
+    return _current.get()
+
+
+def header_enabled(value):
+    return str(value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@contextmanager
+def maybe_trace(enabled):
+    """Yield an active Trace when enabled, else None (zero cost)."""
+    if not enabled:
+        yield None
+        return
+    trace = Trace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
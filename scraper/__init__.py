@@ -1,6 +1,22 @@
 # scraper/__init__.py
-# Expose scrapers
-from .fetch_provider import fetch as fetch_stub
-from .real_scraper import scrape_apollo
-from .hospital_scraper2 import scrape_hospital_2
-from .registry_scraper import scrape_registry
+# Expose scrapers (imported on first access: they pull in requests + bs4,
+# which lightweight users such as scraper.phone_sources do not need)
+import importlib
+
+_EXPORTS = {
+    "fetch_stub": (".fetch_provider", "fetch"),
+    "scrape_apollo": (".real_scraper", "scrape_apollo"),
+    "scrape_hospital_2": (".hospital_scraper2", "scrape_hospital_2"),
+    "scrape_registry": (".registry_scraper", "scrape_registry"),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
@@ -1,6 +1,7 @@
 # scraper/hospital_scraper2.py
-import requests
+from scraper import http_client
 from bs4 import BeautifulSoup
+from monitoring.metrics import timed
 import time
 
 def scrape_hospital_2(query):
@@ -12,9 +13,10 @@ def scrape_hospital_2(query):
         # Example public contact page (placeholder) — replace with a stable URL you want to target
         url = "https://www.example-hospital.org/contact-us/"  # <-- replace with real site if you have
         headers = {"User-Agent": "HealthLens-RealScraper2"}
-        resp = requests.get(url, headers=headers, timeout=5)
+        resp = http_client.get(url, headers=headers, timeout=5)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        with timed("parse"):
+            soup = BeautifulSoup(resp.text, "html.parser")
 
         # Attempt to find phone(s) and address (generic selectors)
         phone = None
@@ -37,5 +39,5 @@ def scrape_hospital_2(query):
             "retrieved_at": time.time()
         }
         return candidate
-    except Exception:
-        return None
+    except Exception as e:
+        return {"error": str(e)}
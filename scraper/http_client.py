@@ -0,0 +1,65 @@
+# scraper/http_client.py
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from scraper import scheduler
+
+# -----------------------------------------
+# Outbound HTTP for all scrapers / lookups.
+#
+# HEALTHLENS_NOMINATIM_URL  override the Nominatim search endpoint
+# HEALTHLENS_GEOCODER       "nominatim" (default) or "gazetteer" to answer
+#                           Nominatim searches from the local index
+#                           (verification/gazetteer.py)
+# HEALTHLENS_REPLAY_BASE    rewrite every outbound URL to a local
+#                           stand-in, e.g. http://127.0.0.1:8765
+#                           https://host/path?q -> {base}/host/path?q
+# Requests are paced per host by scraper.scheduler (token buckets,
+# interactive before background before batch traffic).
+# -----------------------------------------
+NOMINATIM_URL = os.environ.get("HEALTHLENS_NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+REPLAY_BASE = os.environ.get("HEALTHLENS_REPLAY_BASE", "").rstrip("/")
+GEOCODER = os.environ.get("HEALTHLENS_GEOCODER", "nominatim").lower()
+
+_session = requests.Session()
+
+
+def resolve_url(url):
+    """Apply the replay rewrite (if configured) to an outbound URL."""
+    if not REPLAY_BASE:
+        return url
+    parts = urlsplit(url)
+    base = urlsplit(REPLAY_BASE)
+    path = f"{base.path}/{parts.netloc}{parts.path or '/'}"
+    return urlunsplit((base.scheme, base.netloc, path, parts.query, ""))
+
+
+def _retry_after(resp):
+    value = (getattr(resp, "headers", None) or {}).get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+def get(url, **kwargs):
+    """
+    requests.get over a shared keep-alive session, honouring the replay
+    rewrite. Waits for the host's scheduler slot first; a 429/503 answer
+    pauses further requests to that host.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    scheduler.acquire(host)
+    resp = _session.get(resolve_url(url), **kwargs)
+    if resp.status_code in (429, 503):
+        scheduler.backoff(host, _retry_after(resp))
+    return resp
+
+
+def nominatim_search(params, headers=None, timeout=10):
+    """Nominatim /search results (list of dicts) from the configured geocoder."""
+    if GEOCODER == "gazetteer":
+        from verification import gazetteer
+        return gazetteer.search(params["q"], limit=int(params.get("limit", 1)))
+    resp = get(NOMINATIM_URL, params=params, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
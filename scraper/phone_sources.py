@@ -1,4 +1,5 @@
 # scraper/phone_sources.py
+import re
 
 # Known verified phone numbers (manual curated)
 # These DO NOT change and guarantee stable results.
@@ -34,10 +35,41 @@ HOSPITAL_PHONE_PAGES = {
     "rainbow": "https://www.rainbowhospitals.in/contact-us"
 }
 
+# Other names a chain is searched by (the key itself always matches)
+CHAIN_ALIASES = {
+    "basavatarakam": ["indo american cancer", "indus cancer"],
+    "aig": ["asian institute of gastroenterology"],
+    "rainbow": ["rainbow children"],
+}
+
+def _phrases(name, max_words=4):
+    """All 1..max_words word n-grams of a name (lowercased, punctuation stripped)."""
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split()
+    for n in range(1, max_words + 1):
+        for i in range(len(words) - n + 1):
+            yield " ".join(words[i:i + n])
+
+def alias_index(chains):
+    """alias phrase -> chain key, for the given chain keys."""
+    index = {}
+    for chain in chains:
+        for alias in [chain] + CHAIN_ALIASES.get(chain, []):
+            index[alias.lower()] = chain
+    return index
+
+def match_chains(name, index):
+    """Chain keys whose name/alias appears as whole words in `name`."""
+    found = []
+    for phrase in _phrases(name):
+        chain = index.get(phrase)
+        if chain and chain not in found:
+            found.append(chain)
+    return found
+
+_KNOWN_INDEX = alias_index(KNOWN_PHONE_NUMBERS)
+
 def match_hospital_key(name):
-    name = name.lower()
-    for key in KNOWN_PHONE_NUMBERS.keys():
-        if key in name:
-            return key
-    return None
+    # whole-word match, so e.g. "Jaigaon Clinic" is not taken for "aig"
+    found = match_chains(name, _KNOWN_INDEX)
+    return found[0] if found else None
 
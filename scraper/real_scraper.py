@@ -1,6 +1,7 @@
 # scraper/real_scraper.py
-import requests
+from scraper import http_client
 from bs4 import BeautifulSoup
+from monitoring.metrics import timed
 
 def scrape_apollo(query):
     """
@@ -11,10 +12,11 @@ def scrape_apollo(query):
     headers = {"User-Agent": "Mozilla/5.0"}
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        with timed("parse"):
+            soup = BeautifulSoup(response.text, "html.parser")
 
         # Extract phone numbers (Apollo uses these classes often)
         phones = soup.select('a[href^="tel:"]')
@@ -1,5 +1,5 @@
 # scraper/registry_scraper.py
-import requests
+from scraper import http_client
 from bs4 import BeautifulSoup
 import time
 
@@ -7,17 +7,14 @@ def scrape_registry(query):
     """
     Demo registry scraper: attempt to find provider via a public registry-like page.
     (Replace registry_url with a real registry endpoint if available.)
-    Returns dict or None.
+    Returns dict, None (no match) or {"error": ...} on failure.
     """
     try:
         # Example public search endpoint - for demo we will use Nominatim as placeholder for registry.
         # In real implementation replace with actual government registry search URL and parsing logic.
-        url = "https://nominatim.openstreetmap.org/search"
         params = {"q": query + " hospital", "format": "json", "limit": 1, "addressdetails": 1}
         headers = {"User-Agent": "HealthLens-Registry-Scraper"}
-        resp = requests.get(url, params=params, headers=headers, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
+        data = http_client.nominatim_search(params, headers=headers, timeout=5)
         if not data:
             return None
         itm = data[0]
@@ -28,8 +25,10 @@ def scrape_registry(query):
             "address": itm.get("display_name"),
             "phone": None,
             "website": None,
+            "lat": itm.get("lat"),
+            "lon": itm.get("lon"),
             "retrieved_at": time.time()
         }
         return candidate
-    except Exception:
-        return None
+    except Exception as e:
+        return {"error": str(e)}
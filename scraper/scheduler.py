@@ -0,0 +1,212 @@
+# scraper/scheduler.py
+import os
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from monitoring import metrics, tracing
+
+# -----------------------------------------
+# Outbound request scheduler: one token bucket per host, shared by every
+# request in the process, with strict priority between traffic classes:
+#   interactive  /verify traffic (the default)
+#   background   re-verification of known providers
+#   batch        bulk jobs (feeds, imports, load tests)
+# A request only takes a token when nothing of a higher class, and
+# nothing earlier of its own class, is waiting for the same host.
+#
+# HEALTHLENS_HOST_RATES  "host=rate:burst,..." in requests/second;
+#                        "default=rate:burst" for other hosts
+# HEALTHLENS_WORKERS     processes sharing these limits (set by
+#                        api.serve); each gets rate / workers
+# HEALTHLENS_SCHEDULER   0 to disable (default: off when replaying,
+#                        HEALTHLENS_REPLAY_BASE set)
+# -----------------------------------------
+PRIORITIES = ("interactive", "background", "batch")
+
+# Nominatim's usage policy: at most 1 request/second
+DEFAULT_RATES = {
+    "nominatim.openstreetmap.org": (1.0, 1),
+    "default": (2.0, 4),
+}
+
+# longest a request waits for a token before failing as a timeout (None = no limit)
+MAX_WAIT = {"interactive": 10.0, "background": 60.0, "batch": None}
+
+# pause applied to a host answering 429/503 without a usable Retry-After
+DEFAULT_BACKOFF = 10.0
+MAX_BACKOFF = 300.0
+
+
+def _parse_rates(spec):
+    rates = dict(DEFAULT_RATES)
+    for item in (spec or "").split(","):
+        host, _, value = item.strip().partition("=")
+        if not host or not value:
+            continue
+        rate, _, burst = value.partition(":")
+        rates[host.strip().lower()] = (float(rate), int(burst or 1))
+    return rates
+
+
+RATES = _parse_rates(os.environ.get("HEALTHLENS_HOST_RATES"))
+WORKERS = max(1, int(os.environ.get("HEALTHLENS_WORKERS", "1") or 1))
+ENABLED = os.environ.get("HEALTHLENS_SCHEDULER",
+                         "0" if os.environ.get("HEALTHLENS_REPLAY_BASE") else "1") != "0"
+
+_priority = ContextVar("healthlens_priority", default="interactive")
+
+
+class SchedulerTimeout(TimeoutError):
+    """No request slot for the host within MAX_WAIT of the request's class."""
+
+
+def current_priority():
+    return _priority.get()
+
+
+def check_priority(priority):
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}")
+    return priority
+
+
+@contextmanager
+def priority(name):
+    """Outbound requests made inside the block use this traffic class."""
+    token = _priority.set(check_priority(name))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def prioritized(iterable, name):
+    """
+    Iterate `iterable` with the traffic class set around every step, for
+    generators resumed from different contexts (e.g. a streamed response).
+    """
+    check_priority(name)
+    it = iter(iterable)
+    while True:
+        token = _priority.set(name)
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        finally:
+            _priority.reset(token)
+        yield item
+
+
+class _Host:
+    def __init__(self, host, rate, burst):
+        self.host = host
+        self.rate = rate / WORKERS
+        self.burst = max(1, round(burst / WORKERS))
+        self.tokens = float(self.burst)
+        self.last = time.monotonic()
+        self.waiting = []                       # heap of [rank, seq]
+        self.depth = dict.fromkeys(PRIORITIES, 0)
+        self.cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def _queued(self, priority, delta):
+        self.depth[priority] += delta
+        metrics.OUTBOUND_QUEUE_DEPTH.set(self.host, priority, value=self.depth[priority])
+
+    def acquire(self, priority):
+        """Block until this request may be sent; returns seconds waited."""
+        limit = MAX_WAIT.get(priority)
+        start = time.monotonic()
+        entry = [PRIORITIES.index(priority), next(self._seq)]
+        with self.cond:
+            heapq.heappush(self.waiting, entry)
+            self._queued(priority, +1)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    head = self.waiting[0] is entry
+                    if head and self.tokens >= 1:
+                        self.tokens -= 1
+                        return now - start
+                    waited = now - start
+                    if limit is not None and waited >= limit:
+                        raise SchedulerTimeout(
+                            f"timed out after {waited:.1f}s waiting for a {self.host} request slot")
+                    # the head sleeps until its token is due; the rest until notified
+                    delay = (1 - self.tokens) / self.rate if head else None
+                    if limit is not None:
+                        delay = limit - waited if delay is None else min(delay, limit - waited)
+                    self.cond.wait(delay)
+            finally:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self._queued(priority, -1)
+                self.cond.notify_all()
+
+    def backoff(self, seconds):
+        """Hold every request to this host for `seconds` (server asked us to slow down)."""
+        with self.cond:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+_hosts = {}
+_hosts_lock = threading.Lock()
+
+
+def _host(host):
+    h = _hosts.get(host)
+    if h is None:
+        with _hosts_lock:
+            h = _hosts.get(host)
+            if h is None:
+                rate, burst = RATES.get(host) or RATES["default"]
+                h = _hosts[host] = _Host(host, rate, burst)
+    return h
+
+
+def acquire(host, priority=None):
+    """Wait for a request slot to `host` in the current (or given) traffic class."""
+    if not ENABLED:
+        return 0.0
+    priority = check_priority(priority or _priority.get())
+    started = time.perf_counter()
+    try:
+        waited = _host(host).acquire(priority)
+    except SchedulerTimeout:
+        metrics.OUTBOUND_REQUESTS.inc(host, priority, "timeout")
+        raise
+    metrics.OUTBOUND_REQUESTS.inc(host, priority, "sent")
+    metrics.OUTBOUND_WAIT_SECONDS.observe(host, priority, value=waited)
+    trace = tracing.current()
+    if trace is not None and waited > 0.001:
+        trace.add("queue:" + host, started, waited, priority=priority)
+    return waited
+
+
+def backoff(host, seconds=None):
+    if ENABLED:
+        _host(host).backoff(min(MAX_BACKOFF, DEFAULT_BACKOFF if seconds is None else seconds))
+
+
+def snapshot():
+    """Per-host limits, tokens and queue depth (for debugging / admin views)."""
+    out = {}
+    with _hosts_lock:
+        hosts = list(_hosts.values())
+    for h in hosts:
+        with h.cond:
+            h._refill(time.monotonic())
+            out[h.host] = {"rate": h.rate, "burst": h.burst, "tokens": round(h.tokens, 3),
+                           "queued": dict(h.depth)}
+    return out
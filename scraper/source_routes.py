@@ -0,0 +1,91 @@
+# scraper/source_routes.py
+import os
+import re
+import json
+from urllib.parse import urlparse
+
+from scraper.phone_sources import HOSPITAL_PHONE_PAGES, alias_index, match_chains
+
+# -----------------------------------------
+# Relevance routing: which sources can cover which providers.
+# A source is either universal (registry / OSM lookups work for any
+# name) or routed by chain, city or website domain. Sources with no
+# route for a provider are never queried for it.
+# -----------------------------------------
+ROUTES_FILE = os.environ.get(
+    "HEALTHLENS_SOURCE_ROUTES",
+    os.path.join(os.path.dirname(__file__), "../data/source_routes.json"),
+)
+
+
+def _domain(url):
+    if not url:
+        return None
+    host = urlparse(url if "//" in url else "//" + url).hostname or ""
+    return host[4:] if host.startswith("www.") else host or None
+
+
+# Website domain of each chain with a curated contact page
+CHAIN_DOMAINS = {_domain(url): chain for chain, url in HOSPITAL_PHONE_PAGES.items()}
+
+DEFAULT_ROUTES = {
+    "registry": {"universal": True},
+    "osm": {"universal": True},
+    # Apollo contact page only says anything about Apollo
+    "apollo": {"chains": ["apollo"]},
+    # placeholder site: only for providers that list it as their website
+    "hospital_2": {"domains": ["example-hospital.org"]},
+    # curated numbers / contact pages
+    "phone": {"chains": sorted(HOSPITAL_PHONE_PAGES)},
+}
+
+
+def load_routes():
+    """DEFAULT_ROUTES, with per-source entries replaced from ROUTES_FILE if present."""
+    routes = {k: dict(v) for k, v in DEFAULT_ROUTES.items()}
+    if os.path.exists(ROUTES_FILE):
+        with open(ROUTES_FILE, "r", encoding="utf-8") as f:
+            routes.update(json.load(f))
+    return routes
+
+
+class RouteIndex:
+    """Inverted index chain / city / domain -> source keys."""
+
+    def __init__(self, routes=None):
+        routes = load_routes() if routes is None else routes
+        self.universal = set()
+        self.by_chain, self.by_city, self.by_domain = {}, {}, {}
+        for source, rule in routes.items():
+            if rule.get("universal"):
+                self.universal.add(source)
+            for chain in rule.get("chains", []):
+                self.by_chain.setdefault(chain.lower(), set()).add(source)
+            for city in rule.get("cities", []):
+                self.by_city.setdefault(city.lower(), set()).add(source)
+            for domain in rule.get("domains", []):
+                self.by_domain.setdefault(_domain(domain), set()).add(source)
+        self._chains = alias_index(self.by_chain)
+        self._city_re = (
+            re.compile(r"\b(" + "|".join(re.escape(c) for c in sorted(self.by_city, key=len, reverse=True)) + r")\b")
+            if self.by_city else None
+        )
+
+    def chains_for(self, name, website=None):
+        chains = match_chains(name, self._chains)
+        chain = CHAIN_DOMAINS.get(_domain(website))
+        if chain and chain not in chains:
+            chains.append(chain)
+        return chains
+
+    def sources_for(self, name, listed=None):
+        """Keys of the sources that can cover this provider."""
+        listed = listed or {}
+        sources = set(self.universal)
+        for chain in self.chains_for(name, listed.get("website")):
+            sources |= self.by_chain.get(chain, set())
+        sources |= self.by_domain.get(_domain(listed.get("website")), set())
+        if self._city_re and listed.get("listed_address"):
+            for city in self._city_re.findall(listed["listed_address"].lower()):
+                sources |= self.by_city[city]
+        return sources
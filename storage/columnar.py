@@ -0,0 +1,253 @@
+# storage/columnar.py
+"""
+Columnar export of drift snapshots and search history for analytics.
+
+    python -m storage.columnar sync                 # append rows added since last sync
+    python -m storage.columnar export               # rewrite everything
+    python -m storage.columnar sync --format parquet
+
+Layout (hive partitioned by UTC day):
+    data/columnar/snapshots/day=YYYY-MM-DD/part-<n>.arrow
+    data/columnar/searches/day=YYYY-MM-DD/part-<n>.arrow
+    data/columnar/_sync_state.json
+
+Arrow IPC files are uncompressed and memory-mappable; slugs, provider
+names, usernames and source names are dictionary encoded. Readers use
+dataset("snapshots") and never touch the live JSON store.
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.fs as pafs
+    import pyarrow.ipc as paipc
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except Exception:
+    ARROW_AVAILABLE = False
+
+COLUMNAR_DIR = os.environ.get(
+    "HEALTHLENS_COLUMNAR_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/columnar"),
+)
+STATE_FILE = "_sync_state.json"
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+FIELDS = ("name", "address", "phone", "website")
+
+
+def _require_arrow():
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for columnar export (pip install pyarrow)")
+
+
+def _day(ts):
+    return datetime.fromtimestamp(int(ts or 0), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _dict_str():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def _schemas():
+    return {
+        "snapshots": pa.schema([
+            ("slug", _dict_str()),
+            ("provider", _dict_str()),
+            ("seq", pa.int32()),                   # position in the provider's history
+            ("ts", pa.timestamp("s", tz="UTC")),
+            ("name", pa.string()),
+            ("address", pa.string()),
+            ("phone", pa.string()),
+            ("website", pa.string()),
+            ("lat", pa.float64()),
+            ("lon", pa.float64()),
+            ("retrieved_at", pa.float64()),
+            ("drift_score", pa.float64()),         # vs previous snapshot (0 for the first)
+            ("changed_fields", pa.list_(_dict_str())),
+        ]),
+        "searches": pa.schema([
+            ("username", _dict_str()),
+            ("provider", _dict_str()),
+            ("ts", pa.timestamp("s", tz="UTC")),
+            ("listed_phone", pa.string()),
+            ("listed_address", pa.string()),
+            ("result_id", pa.string()),
+            ("final_confidence", pa.float64()),
+            ("flag_for_manual_review", pa.bool_()),
+            ("drift_score", pa.float64()),
+            ("changed_fields", pa.list_(_dict_str())),
+            ("sources", pa.list_(_dict_str())),    # sources that voted in the result
+        ]),
+    }
+
+
+def _float(v):
+    try:
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# -----------------------------------------
+# Row extraction (only rows past the sync watermark)
+# -----------------------------------------
+def _snapshot_rows(hist, done):
+    """done: slug -> snapshots already exported. Returns (rows, new watermark)."""
+    from verification.drift import compute_drift_score
+
+    rows, marks = [], dict(done)
+    for slug, rec in hist.items():
+        snaps = rec.get("snapshots", [])
+        start = done.get(slug, 0)
+        for i in range(start, len(snaps)):
+            c = snaps[i].get("candidate", {})
+            if i > 0:
+                drift = compute_drift_score(snaps[i - 1].get("candidate", {}), c)
+            else:
+                drift = {"drift_score": 0.0, "changed_fields": []}
+            rows.append({
+                "slug": slug,
+                "provider": rec.get("name"),
+                "seq": i,
+                "ts": int(snaps[i].get("ts") or 0),
+                **{f: c.get(f) for f in FIELDS},
+                "lat": _float(c.get("lat")),
+                "lon": _float(c.get("lon")),
+                "retrieved_at": _float(c.get("retrieved_at")),
+                "drift_score": drift["drift_score"],
+                "changed_fields": drift["changed_fields"],
+            })
+        marks[slug] = len(snaps)
+    return rows, marks
+
+
+def _search_rows(entries, done):
+    from storage.result_store import get_result
+
+    rows = []
+    for e in entries[done:]:
+        result = e.get("result") or get_result(e.get("result_id")) or {}
+        summary = e.get("summary") or {}
+        drift_info = (result.get("drift") or {}).get("drift_info") or {}
+        votes = result.get("source_votes") or {}
+        sources = sorted({v[0] for field_votes in votes.values() for v in field_votes})
+        rows.append({
+            "username": e.get("username"),
+            "provider": e.get("provider"),
+            "ts": int(e.get("timestamp") or 0),
+            "listed_phone": e.get("listed_phone"),
+            "listed_address": e.get("listed_address"),
+            "result_id": e.get("result_id"),
+            "final_confidence": _float(result.get("final_confidence", summary.get("final_confidence"))),
+            "flag_for_manual_review": result.get("flag_for_manual_review", summary.get("flag_for_manual_review")),
+            "drift_score": _float(drift_info.get("drift_score")),
+            "changed_fields": drift_info.get("changed_fields"),
+            "sources": sources,
+        })
+    return rows, len(entries)
+
+
+# -----------------------------------------
+# Writing
+# -----------------------------------------
+def _write_partitions(table_name, rows, schema, fmt, part):
+    """Write rows grouped by day as part-<part> files. Returns files written."""
+    by_day = {}
+    for r in rows:
+        by_day.setdefault(_day(r["ts"]), []).append(r)
+    written = []
+    for day, day_rows in sorted(by_day.items()):
+        folder = os.path.join(COLUMNAR_DIR, table_name, f"day={day}")
+        os.makedirs(folder, exist_ok=True)
+        table = pa.Table.from_pylist(day_rows, schema=schema)
+        path = os.path.join(folder, f"part-{part:06d}{FORMATS[fmt]}")
+        tmp = path + ".tmp"
+        if fmt == "parquet":
+            pq.write_table(table, tmp, use_dictionary=True)
+        else:
+            with paipc.new_file(tmp, schema) as w:
+                w.write_table(table)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+def _load_state():
+    try:
+        with open(os.path.join(COLUMNAR_DIR, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"part": 0, "format": None, "snapshots": {}, "searches": 0}
+
+
+def _save_state(state):
+    os.makedirs(COLUMNAR_DIR, exist_ok=True)
+    path = os.path.join(COLUMNAR_DIR, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def sync(fmt="arrow", full=False):
+    """
+    Export rows added since the last sync (or everything with full=True).
+    History files are append-only per provider / per list, so the
+    watermark is a snapshot count per slug and an entry count.
+    """
+    _require_arrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    from verification.drift import load_history
+    from storage.search_history import load_search_history
+
+    state = _load_state()
+    if full or (state["format"] and state["format"] != fmt):
+        shutil.rmtree(COLUMNAR_DIR, ignore_errors=True)
+        state = {"part": 0, "format": None, "snapshots": {}, "searches": 0}
+
+    started = time.time()
+    schemas = _schemas()
+    snap_rows, snap_marks = _snapshot_rows(load_history(), state["snapshots"])
+    search_rows, search_mark = _search_rows(load_search_history(), state["searches"])
+
+    part = state["part"] + 1
+    files = _write_partitions("snapshots", snap_rows, schemas["snapshots"], fmt, part)
+    files += _write_partitions("searches", search_rows, schemas["searches"], fmt, part)
+
+    state.update({"part": part, "format": fmt, "snapshots": snap_marks,
+                  "searches": search_mark, "last_sync": int(started)})
+    _save_state(state)
+    return {"snapshots": len(snap_rows), "searches": len(search_rows), "files": len(files),
+            "seconds": round(time.time() - started, 3)}
+
+
+# -----------------------------------------
+# Reading
+# -----------------------------------------
+def dataset(table_name):
+    """pyarrow Dataset over an exported table (memory-mapped, day partition column)."""
+    _require_arrow()
+    fmt = _load_state().get("format") or "arrow"
+    return pads.dataset(
+        os.path.join(COLUMNAR_DIR, table_name),
+        format="ipc" if fmt == "arrow" else "parquet",
+        partitioning="hive",
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=True,
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Columnar export of snapshot and search history.")
+    ap.add_argument("cmd", choices=["sync", "export"])
+    ap.add_argument("--format", choices=list(FORMATS), default="arrow")
+    args = ap.parse_args()
+    out = sync(fmt=args.format, full=args.cmd == "export")
+    print(f"{out['snapshots']} snapshot rows, {out['searches']} search rows, "
+          f"{out['files']} file(s) in {out['seconds']}s -> {os.path.abspath(COLUMNAR_DIR)}")
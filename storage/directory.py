@@ -0,0 +1,197 @@
+# storage/directory.py
+"""
+The verified provider directory as a stream: one row per provider from
+the materialized view (storage/provider_state.py), with the consensus
+values compute_confidence chose, falling back to the latest snapshot
+for fields without one.
+
+    python -m storage.directory --format csv > providers.csv
+    python -m storage.directory --format ndjson --min-confidence 70 \
+        --changed-since 2026-10-01 --region Pune,Maharashtra --out recent.ndjson
+
+Rows are produced one at a time from provider_state.iter_providers()
+and encoded in chunks of EXPORT_CHUNK_ROWS, so memory stays flat however
+many providers there are and the header goes out before the first row
+is built. GET /export serves the same stream.
+"""
+import io
+import csv
+import sys
+import json
+import argparse
+from operator import itemgetter
+
+from storage import provider_state
+
+# orjson is ~5-10x faster than the stdlib encoder; fall back if missing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+EXPORT_CHUNK_ROWS = 500
+
+COLUMNS = (
+    "slug", "provider_name", "name", "address", "phone", "website", "lat", "lon",
+    "final_confidence", "flag_for_manual_review", "drift_score",
+    "snapshot_count", "latest_snapshot_ts", "verified_at", "updated_at",
+)
+
+
+# -----------------------------------------
+# Rows
+# -----------------------------------------
+def provider_row(entry):
+    """Flat directory row for one provider_state entry."""
+    consensus = entry.get("consensus") or {}
+    latest = entry.get("latest_snapshot") or {}
+
+    def pick(field):
+        value = consensus.get(field)
+        return value if value not in (None, "") else latest.get(field)
+
+    # address and its coordinates come from the same place
+    located = consensus if consensus.get("address") else latest
+    return {
+        "slug": entry.get("slug"),
+        "provider_name": entry.get("name"),
+        "name": pick("name") or entry.get("name"),
+        "address": located.get("address"),
+        "phone": pick("phone"),
+        "website": pick("website"),
+        "lat": located.get("lat"),
+        "lon": located.get("lon"),
+        "final_confidence": entry.get("final_confidence"),
+        "flag_for_manual_review": entry.get("flag_for_manual_review"),
+        "drift_score": (entry.get("drift") or {}).get("drift_score"),
+        "snapshot_count": entry.get("snapshot_count"),
+        "latest_snapshot_ts": entry.get("latest_snapshot_ts"),
+        "verified_at": entry.get("verified_at"),
+        "updated_at": entry.get("updated_at"),
+    }
+
+
+def region_matcher(region):
+    """
+    Predicate on an address for a comma separated list of regions: a
+    name matches a whole address component (city, state, locality), a
+    number matches PIN codes starting with it.
+    """
+    names, pins = set(), []
+    for r in (region or "").split(","):
+        r = " ".join(r.split()).casefold()
+        if r.isdigit():
+            pins.append(r)
+        elif r:
+            names.add(r)
+    pins = tuple(pins)
+
+    def match(address):
+        if not address:
+            return False
+        for part in address.split(","):
+            part = " ".join(part.split()).casefold()
+            if part in names or (pins and part.isdigit() and part.startswith(pins)):
+                return True
+        return False
+    return match
+
+
+def iter_rows(min_confidence=None, changed_since=None, region=None, exclude_flagged=False):
+    """Directory rows passing the filters, one provider at a time."""
+    in_region = region_matcher(region) if region else None
+    for entry in provider_state.iter_providers():
+        if min_confidence is not None and (entry.get("final_confidence") is None
+                                           or entry["final_confidence"] < min_confidence):
+            continue
+        if changed_since is not None and (entry.get("updated_at") or 0) < changed_since:
+            continue
+        if exclude_flagged and entry.get("flag_for_manual_review"):
+            continue
+        row = provider_row(entry)
+        if in_region is not None and not in_region(row["address"]):
+            continue
+        yield row
+
+
+# -----------------------------------------
+# Encoders: iterators of bytes chunks
+# -----------------------------------------
+def _drain(buf):
+    data = buf.getvalue().encode("utf-8")
+    buf.seek(0)
+    buf.truncate()
+    return data
+
+
+def iter_csv(rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    yield _drain(buf)
+    values = itemgetter(*COLUMNS)   # cheaper per row than DictWriter's per-key lookups
+    chunk = []
+    for row in rows:
+        chunk.append(values(row))
+        if len(chunk) == chunk_rows:
+            writer.writerows(chunk)
+            chunk = []
+            yield _drain(buf)
+    if chunk:
+        writer.writerows(chunk)
+        yield _drain(buf)
+
+
+def _json_line(row):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(row) + b"\n"
+    return json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def iter_ndjson(rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(_json_line(row))
+        if len(chunk) == chunk_rows:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+# format -> (content type, encoder)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", iter_csv),
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+}
+
+
+def export(fmt="csv", **filters):
+    """(content type, iterator of bytes) for the directory in `fmt`; see iter_rows for filters."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    content_type, encode = FORMATS[fmt]
+    return content_type, encode(iter_rows(**filters))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Stream the verified provider directory.")
+    ap.add_argument("--format", default="csv", choices=sorted(FORMATS))
+    ap.add_argument("--min-confidence", type=float, help="only providers at or above this confidence")
+    ap.add_argument("--changed-since", help="only providers updated since (epoch seconds or ISO-8601)")
+    ap.add_argument("--region", help="city / state names or PIN prefixes, comma separated")
+    ap.add_argument("--exclude-flagged", action="store_true", help="skip providers flagged for review")
+    ap.add_argument("--out", help="output file (default: stdout)")
+    args = ap.parse_args()
+
+    since = provider_state.parse_ts(args.changed_since) if args.changed_since else None
+    _, chunks = export(args.format, min_confidence=args.min_confidence, changed_since=since,
+                       region=args.region, exclude_flagged=args.exclude_flagged)
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
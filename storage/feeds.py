@@ -0,0 +1,286 @@
+# storage/feeds.py
+"""
+Incremental ingestion of provider feeds (our directory, partner files).
+
+Partners re-send their full file every day. Each row is normalized and
+hashed, and the hashes are remembered per feed, so only new or changed
+rows go on to verification and rows missing from today's file are
+reported as deleted.
+
+    python -m storage.feeds ingest data/providers_input.csv --out changed.csv
+    python -m storage.feeds ingest partner.csv --feed acme --verify
+    python -m storage.feeds ingest partner.csv --dry-run
+    python -m storage.feeds status
+
+Rows are grouped into feeds by their `source` column (--feed for files
+without one). A row's key is its `id` column if the file has one, else
+its name (--key to choose); repeated keys get "#2", "#3", ... in file
+order. The hash covers every other column, whitespace/case-folded, with
+phone numbers compared by national digits and column order ignored.
+
+State: data/feeds/<feed>.json ({key: row hash}). It only advances for
+rows that were handed on; with --verify a row whose verification fails
+is retried on the next run.
+"""
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections import Counter
+
+from storage.locking import file_lock, atomic_write_json, read_json
+from verification import phone
+
+FEEDS_DIR = os.environ.get(
+    "HEALTHLENS_FEEDS_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/feeds"),
+)
+FEED_COLUMN = "source"
+DEFAULT_FEED = "default"
+ID_COLUMNS = ("id", "provider_id", "partner_id")
+
+# columns verified from a feed row (see ControllerAgent)
+LISTED_FIELDS = ("name", "listed_phone", "listed_address", "website")
+
+
+# -----------------------------------------
+# Normalization + hashing
+# -----------------------------------------
+def _norm(column, value):
+    value = " ".join(str(value or "").split()).casefold()
+    if value and "phone" in column:
+        return phone.national_key(value)
+    return value
+
+
+def row_key(row, key_column):
+    return " ".join(str(row.get(key_column) or "").split()).casefold()
+
+
+def row_hash(row, skip=(FEED_COLUMN,)):
+    """16 hex chars over the normalized values of every column not in skip."""
+    h = hashlib.blake2b(digest_size=8)
+    for column in sorted(row):
+        if column is None or column in skip:
+            continue                        # None: surplus fields of a ragged CSV row
+        h.update(column.encode("utf-8") + b"\x1f" + _norm(column, row[column]).encode("utf-8") + b"\x1e")
+    return h.hexdigest()
+
+
+def key_column(fieldnames, key=None):
+    if key:
+        if key not in fieldnames:
+            raise ValueError(f"key column {key!r} not in feed columns {fieldnames}")
+        return key
+    for c in ID_COLUMNS:
+        if c in fieldnames:
+            return c
+    return "name"
+
+
+# -----------------------------------------
+# Per-feed state
+# -----------------------------------------
+def _feed_path(feed):
+    safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in feed)
+    return os.path.join(FEEDS_DIR, safe + ".json")
+
+
+def load_state(feed):
+    state = read_json(_feed_path(feed)) or {}
+    return state.get("rows", {}), state
+
+
+def feeds():
+    """Summary of every feed seen so far."""
+    out = {}
+    if not os.path.isdir(FEEDS_DIR):
+        return out
+    for fn in sorted(os.listdir(FEEDS_DIR)):
+        if fn.endswith(".json"):
+            state = read_json(os.path.join(FEEDS_DIR, fn)) or {}
+            out[state.get("feed", fn[:-5])] = {
+                "rows": len(state.get("rows", {})),
+                "key": state.get("key"),
+                "updated_at": state.get("updated_at"),
+                "last_run": state.get("last_run"),
+            }
+    return out
+
+
+class FeedDiff:
+    """Classifies one feed's rows against what was seen on the previous run."""
+
+    def __init__(self, feed, key):
+        self.feed, self.key = feed, key
+        self.previous, _ = load_state(feed)
+        self.rows = dict(self.previous)      # becomes the new state
+        self.seen = set()
+        self.counts = Counter()
+        self.changes = []                    # (status, key, row) for new / changed rows
+
+    def add(self, row):
+        """'new' | 'changed' | 'unchanged' | 'invalid' for one row."""
+        key = row_key(row, self.key)
+        if not key:
+            self.counts["invalid"] += 1
+            return "invalid"
+        if key in self.seen:
+            self.counts["duplicate"] += 1
+            n = 2
+            while f"{key}#{n}" in self.seen:
+                n += 1
+            key = f"{key}#{n}"
+        self.seen.add(key)
+        digest = row_hash(row)
+        old = self.previous.get(key)
+        status = "new" if old is None else "changed" if old != digest else "unchanged"
+        self.counts[status] += 1
+        if status != "unchanged":
+            self.rows[key] = digest
+            self.changes.append((status, key, row))
+        return status
+
+    def deleted(self):
+        return sorted(k for k in self.previous if k not in self.seen)
+
+    def summary(self):
+        deleted = self.deleted()
+        return {
+            "feed": self.feed,
+            "key": self.key,
+            "rows": sum(self.counts[s] for s in ("new", "changed", "unchanged")),
+            "new": self.counts["new"],
+            "changed": self.counts["changed"],
+            "unchanged": self.counts["unchanged"],
+            "duplicate_keys": self.counts["duplicate"],
+            "invalid": self.counts["invalid"],
+            "deleted": len(deleted),
+            "deleted_keys": deleted,
+        }
+
+    def commit(self, failed=()):
+        """Store the new state; keys in `failed` keep their previous hash (retried next run)."""
+        rows = self.rows
+        for key in self.deleted():
+            rows.pop(key, None)
+        for key in failed:
+            if key in self.previous:
+                rows[key] = self.previous[key]
+            else:
+                rows.pop(key, None)
+        path = _feed_path(self.feed)
+        now = int(time.time())
+        with file_lock(path):
+            atomic_write_json(path, {
+                "feed": self.feed,
+                "key": self.key,
+                "updated_at": now,
+                "last_run": {k: v for k, v in self.summary().items() if k != "deleted_keys"},
+                "rows": rows,
+            }, separators=(",", ":"))
+
+
+def scan(path, feed=None, key=None):
+    """
+    Read a feed file once and diff it against the stored state.
+    Returns {feed name: FeedDiff}. Feeds absent from the file are not
+    touched (a missing feed is not a feed whose rows were all deleted).
+    """
+    diffs = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        kc = key_column(fieldnames, key)
+        for row in reader:
+            name = feed or (row.get(FEED_COLUMN) or "").strip() or DEFAULT_FEED
+            diff = diffs.get(name)
+            if diff is None:
+                diff = diffs[name] = FeedDiff(name, kc)
+            diff.add(row)
+    return diffs
+
+
+# -----------------------------------------
+# Hand-off
+# -----------------------------------------
+def write_changes(diffs, out):
+    """Write new / changed rows (with feed, change and key columns) as CSV; returns the row count."""
+    columns = []
+    for diff in diffs.values():
+        for _, _, row in diff.changes:
+            columns.extend(c for c in row if c is not None and c not in columns)
+    n = 0
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["feed", "change", "key"] + columns, extrasaction="ignore")
+        writer.writeheader()
+        for diff in diffs.values():
+            for status, key, row in diff.changes:
+                writer.writerow({**row, "feed": diff.feed, "change": status, "key": key})
+                n += 1
+    return n
+
+
+def verify_changes(diff, limit=None):
+    """
+    Run new / changed rows through the verification pipeline at batch
+    priority (interactive traffic goes first). Returns (summary, failed keys).
+    """
+    from agents.controller_agent import ControllerAgent
+    from scraper import scheduler
+
+    controller = ControllerAgent()
+    counts, failed = Counter(), []
+    changes = diff.changes if limit is None else diff.changes[:limit]
+    with scheduler.priority("batch"):
+        for _, key, row in changes:
+            listed = {f: row.get(f) or None for f in LISTED_FIELDS}
+            try:
+                result = controller.run(listed)
+            except Exception as e:
+                failed.append(key)
+                counts["failed"] += 1
+                print(f"{diff.feed}/{key}: verification failed: {e}", file=sys.stderr)
+                continue
+            counts["verified"] += 1
+            counts["flagged"] += bool(result.get("flag_for_manual_review"))
+    # rows beyond the limit were not handed on either
+    failed.extend(key for _, key, _ in diff.changes[len(changes):])
+    counts["deferred"] = len(diff.changes) - len(changes)
+    return dict(counts), failed
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Change-detecting ingestion of provider feeds.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="diff a feed file against the last run")
+    ing.add_argument("path")
+    ing.add_argument("--feed", help="feed name for every row (default: the source column)")
+    ing.add_argument("--key", help="key column (default: id column if present, else name)")
+    ing.add_argument("--out", help="write new / changed rows to this CSV")
+    ing.add_argument("--verify", action="store_true", help="verify new / changed rows now")
+    ing.add_argument("--limit", type=int, help="verify at most this many rows per feed (rest next run)")
+    ing.add_argument("--dry-run", action="store_true", help="report only; do not update the feed state")
+    sub.add_parser("status", help="feeds seen so far")
+    args = ap.parse_args()
+
+    if args.cmd == "status":
+        print(json.dumps(feeds(), indent=2))
+        sys.exit(0)
+
+    started = time.perf_counter()
+    diffs = scan(args.path, feed=args.feed, key=args.key)
+    report = {"feeds": {}, "scan_seconds": round(time.perf_counter() - started, 3)}
+    if args.out:
+        report["written"] = write_changes(diffs, args.out)
+    for name, diff in diffs.items():
+        entry = report["feeds"][name] = diff.summary()
+        failed = []
+        if args.verify:
+            entry["verification"], failed = verify_changes(diff, args.limit)
+        if not args.dry_run:
+            diff.commit(failed)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,82 @@
+# storage/generations.py
+import os
+
+from storage.locking import file_lock
+
+# -----------------------------------------
+# Generation counters for cross-process cache invalidation.
+# Every write to a shared store bumps its counter; a worker holding
+# an in-memory copy compares the counter it last saw with current()
+# and reloads when another process has written since.
+#   data/generations/<name>   one integer per store
+# -----------------------------------------
+GENERATIONS_DIR = os.path.join(os.path.dirname(__file__), "../data/generations")
+
+
+def _path(name):
+    return os.path.join(GENERATIONS_DIR, name)
+
+
+def current(name):
+    try:
+        with open(_path(name), "r") as f:
+            return int(f.read() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump(name, n=1):
+    """
+    Advance the counter for `name` by n (one per logical write, so a
+    batch of n writes looks like n consecutive generations) and return it.
+    """
+    path = _path(name)
+    with file_lock(path):
+        value = current(name) + n
+        os.makedirs(GENERATIONS_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(value))
+        os.replace(tmp, path)
+    return value
+
+
+class Tracker:
+    """Remembers the generation an in-memory copy of `name` reflects."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seen = None
+
+    def stale(self):
+        return self.seen is None or current(self.name) != self.seen
+
+    def mark(self, generation=None):
+        self.seen = current(self.name) if generation is None else generation
+
+    def advance(self, generation):
+        """
+        After a local write that produced `generation`: True (and fresh)
+        if it directly follows what we had seen. Otherwise stays stale at
+        the old position, so the gap can be caught up incrementally.
+        """
+        if self.seen is not None and self.seen == generation - 1:
+            self.seen = generation
+            return True
+        return False
+
+
+def version(name, path=None):
+    """
+    Validator for the content of store `name` (HTTP ETags): its
+    generation, plus the backing file's mtime/size when given, so a file
+    replaced outside the app (restore, manual edit) counts as a change.
+    """
+    parts = [str(current(name))]
+    if path is not None:
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_mtime_ns:x}{st.st_size:x}")
+        except FileNotFoundError:
+            parts.append("0")
+    return ".".join(parts)
@@ -0,0 +1,58 @@
+# storage/locking.py
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+# fcntl is POSIX only; elsewhere locking degrades to a no-op (single worker)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except Exception:
+    FCNTL_AVAILABLE = False
+
+# -----------------------------------------
+# Cross-process safety for the JSON stores in data/.
+#   file_lock(path)          exclusive advisory lock on "<path>.lock"
+#                            (serializes threads and worker processes;
+#                            do not nest on the same path)
+#   atomic_write_json(path)  temp file + os.replace, so readers never
+#                            see a half-written file
+# -----------------------------------------
+
+
+@contextmanager
+def file_lock(path):
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_json(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
@@ -0,0 +1,382 @@
+# storage/provider_state.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from verification import drift
+from storage import generations
+from storage.locking import read_json
+
+# -----------------------------------------
+# Materialized per-provider state.
+#   view:  slug -> latest snapshot + latest consensus / confidence, one
+#          row per provider in PROVIDER_STATE_DB (SQLite, WAL), so a
+#          change is a single-row upsert and a read is a primary-key
+#          lookup whatever the number of providers
+#   index: slug -> time-ordered snapshot timestamps, in memory, for
+#          point-in-time ("as of") lookups by binary search
+# Both are kept current through drift.on_snapshot and
+# record_verification (called by ControllerAgent). Worker processes
+# share the database directly; the "history" generation counter tells
+# a worker its index is out of date, and the index then catches up
+# from the drift snapshot journal.
+# -----------------------------------------
+PROVIDER_STATE_DB = os.path.join(os.path.dirname(__file__), "../data/provider_state.db")
+# earlier JSON view; imported once when the database is first created
+PROVIDER_STATE_FILE = os.path.join(os.path.dirname(__file__), "../data/provider_state.json")
+
+PAGE_SIZE = 1000              # rows per query while iterating the view
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS providers (
+    slug                   TEXT PRIMARY KEY,
+    name                   TEXT,
+    snapshot_count         INTEGER NOT NULL DEFAULT 0,
+    latest_snapshot        TEXT,
+    latest_snapshot_ts     INTEGER,
+    consensus              TEXT,
+    final_confidence       REAL,
+    flag_for_manual_review INTEGER,
+    drift                  TEXT,
+    verified_at            INTEGER,
+    updated_at             INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS providers_verified ON providers (verified_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_JSON_COLUMNS = ("latest_snapshot", "consensus", "drift")
+
+_SNAPSHOT_KEYS = ("snapshot_count", "latest_snapshot", "latest_snapshot_ts")
+_VERIFY_KEYS = ("consensus", "final_confidence", "flag_for_manual_review", "drift", "verified_at")
+
+# Newest snapshot part and newest verification part win independently,
+# so writes from several workers may land in any order.
+_UPSERT_SNAPSHOT = """
+INSERT INTO providers (slug, name, snapshot_count, latest_snapshot, latest_snapshot_ts, updated_at)
+VALUES (:slug, :name, :snapshot_count, :latest_snapshot, :latest_snapshot_ts, :updated_at)
+ON CONFLICT (slug) DO UPDATE SET
+    snapshot_count = excluded.snapshot_count,
+    latest_snapshot = excluded.latest_snapshot,
+    latest_snapshot_ts = excluded.latest_snapshot_ts,
+    updated_at = MAX(COALESCE(providers.updated_at, 0), excluded.updated_at)
+WHERE excluded.snapshot_count >= providers.snapshot_count
+"""
+
+_UPSERT_VERIFICATION = """
+INSERT INTO providers (slug, name, consensus, final_confidence, flag_for_manual_review,
+                       drift, verified_at, updated_at)
+VALUES (:slug, :name, :consensus, :final_confidence, :flag_for_manual_review,
+        :drift, :verified_at, :updated_at)
+ON CONFLICT (slug) DO UPDATE SET
+    consensus = excluded.consensus,
+    final_confidence = excluded.final_confidence,
+    flag_for_manual_review = excluded.flag_for_manual_review,
+    drift = excluded.drift,
+    verified_at = excluded.verified_at,
+    updated_at = MAX(COALESCE(providers.updated_at, 0), excluded.updated_at)
+WHERE COALESCE(providers.verified_at, 0) <= excluded.verified_at
+"""
+
+_lock = threading.Lock()
+_local = threading.local()
+_index = {}                   # slug -> ([ts...], [snapshot...])
+_index_tracker = generations.Tracker("history")
+_index_journal = drift.JournalReader()
+
+
+def slug(name):
+    return drift._slug(name)
+
+
+# -----------------------------------------
+# Materialized view
+# -----------------------------------------
+def _empty_entry(key, name):
+    return {
+        "slug": key,
+        "name": name,
+        "snapshot_count": 0,
+        "latest_snapshot": None,
+        "latest_snapshot_ts": None,
+        "consensus": None,
+        "final_confidence": None,
+        "flag_for_manual_review": None,
+        "drift": None,
+        "verified_at": None,
+        "updated_at": None,
+    }
+
+
+def _conn():
+    """One connection per thread; a new database is populated on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != PROVIDER_STATE_DB:
+        os.makedirs(os.path.dirname(PROVIDER_STATE_DB), exist_ok=True)
+        # autocommit; writes go through _write()
+        conn = sqlite3.connect(PROVIDER_STATE_DB, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.path = conn, PROVIDER_STATE_DB
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'populated'").fetchone() is None:
+            _populate()
+    return conn
+
+
+@contextmanager
+def _write():
+    """
+    A write transaction, holding the database's write lock from the
+    start; bumps the "provider_state" generation if anything changed.
+    """
+    conn = _conn()
+    before = conn.total_changes
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    if conn.total_changes != before:
+        generations.bump("provider_state")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+
+def _row(entry):
+    """View entry -> named parameters for the upserts."""
+    row = dict(_empty_entry(entry["slug"], entry.get("name")), **entry)
+    for c in _JSON_COLUMNS:
+        row[c] = _dumps(row[c])
+    flag = row["flag_for_manual_review"]
+    row["flag_for_manual_review"] = None if flag is None else int(bool(flag))
+    return row
+
+
+def _entry(row):
+    if row is None:
+        return None
+    entry = dict(row)
+    for c in _JSON_COLUMNS:
+        entry[c] = json.loads(entry[c]) if entry[c] else None
+    flag = entry["flag_for_manual_review"]
+    entry["flag_for_manual_review"] = None if flag is None else bool(flag)
+    return entry
+
+
+def _upsert(conn, entry):
+    row = _row(entry)
+    conn.execute(_UPSERT_SNAPSHOT, row)
+    if row["verified_at"] is not None:
+        conn.execute(_UPSERT_VERIFICATION, row)
+
+
+def _populate():
+    """
+    Fill a new database: from the earlier JSON view if there is one,
+    else from history.json. Runs once, whichever worker gets there first.
+    """
+    with _write() as conn:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'populated'").fetchone():
+            return
+        view = read_json(PROVIDER_STATE_FILE)
+        if view is None:
+            view = _snapshot_view(drift.load_history())
+        for entry in view.values():
+            _upsert(conn, entry)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('populated', ?)", (str(int(time.time())),))
+
+
+def _apply_snapshot(entry, snap, count):
+    entry["snapshot_count"] = count
+    entry["latest_snapshot"] = snap["candidate"]
+    entry["latest_snapshot_ts"] = snap["ts"]
+    entry["updated_at"] = max(entry["updated_at"] or 0, snap["ts"])
+
+
+def _snapshot_view(hist):
+    view = {}
+    for key, rec in hist.items():
+        snaps = rec.get("snapshots", [])
+        entry = view[key] = _empty_entry(key, rec.get("name"))
+        if snaps:
+            _apply_snapshot(entry, snaps[-1], len(snaps))
+    return view
+
+
+def _consensus(result):
+    chosen = result.get("chosen") or {}
+    out = {f: (chosen.get(f) or {}).get("value") for f in ("name", "address", "phone", "website")}
+    addr = chosen.get("address") or {}
+    out["lat"], out["lon"] = addr.get("lat"), addr.get("lon")
+    return out
+
+
+def _apply_verification(entry, result, ts):
+    entry["consensus"] = _consensus(result)
+    entry["final_confidence"] = result.get("final_confidence")
+    entry["flag_for_manual_review"] = result.get("flag_for_manual_review")
+    entry["drift"] = (result.get("drift") or {}).get("drift_info")
+    entry["verified_at"] = ts
+    entry["updated_at"] = max(entry["updated_at"] or 0, ts or 0)
+
+
+def record_verification(provider_name, result, ts=None):
+    """Fold a verification result (with its "drift" block) into the view."""
+    ts = int(ts or time.time())
+    entry = _empty_entry(slug(provider_name), provider_name)
+    _apply_verification(entry, result, ts)
+    with _write() as conn:
+        conn.execute(_UPSERT_VERIFICATION, _row(entry))
+
+
+def version():
+    """Validator (ETag) for the view: bumped by every write that changed a row."""
+    _conn()
+    return str(generations.current("provider_state"))
+
+
+def get_provider(key):
+    """Latest materialized state for a slug (or provider name), or None."""
+    return _entry(_conn().execute("SELECT * FROM providers WHERE slug = ?", (slug(key),)).fetchone())
+
+
+def verified_since(ts):
+    """Entries whose latest verification is at or after ts (epoch seconds)."""
+    rows = _conn().execute("SELECT * FROM providers WHERE verified_at >= ?", (ts,)).fetchall()
+    return [_entry(row) for row in rows]
+
+
+def iter_providers():
+    """
+    Entries of the view in slug order, PAGE_SIZE rows per query (keyset
+    paginated), so memory stays flat however many providers there are
+    and no read transaction is held while the caller consumes rows.
+    """
+    after = ""
+    while True:
+        rows = _conn().execute(
+            "SELECT * FROM providers WHERE slug > ? ORDER BY slug LIMIT ?", (after, PAGE_SIZE)).fetchall()
+        for row in rows:
+            yield _entry(row)
+        if len(rows) < PAGE_SIZE:
+            return
+        after = rows[-1]["slug"]
+
+
+# -----------------------------------------
+# Time-ordered snapshot index (as-of queries)
+# -----------------------------------------
+def _index_add(key, provider_name, snap, generation, count):
+    ts_list, snaps = _index.setdefault(key, ([], []))
+    if len(ts_list) >= count:
+        return      # already read with history.json
+    i = bisect_right(ts_list, snap["ts"])
+    ts_list.insert(i, snap["ts"])
+    snaps.insert(i, snap)
+
+
+def _ensure_index():
+    """
+    Called with _lock held. Snapshots other processes recorded are applied
+    from the drift journal; history.json is only (re)loaded on first use
+    or when the journal no longer reaches back far enough.
+    """
+    if not _index_tracker.stale() or _index_journal.catch_up(_index_tracker, _index_add):
+        return
+    _index_tracker.mark()
+    _index_journal.reset()
+    _index.clear()
+    for key, rec in drift.load_history().items():
+        snaps = sorted(rec.get("snapshots", []), key=lambda s: s["ts"])
+        _index[key] = ([s["ts"] for s in snaps], snaps)
+
+
+def _on_snapshot(key, provider_name, snap, generation, count):
+    with _lock:
+        if _index_tracker.advance(generation):
+            _index_add(key, provider_name, snap, generation, count)
+    entry = _empty_entry(key, provider_name)
+    _apply_snapshot(entry, snap, count)
+    with _write() as conn:
+        conn.execute(_UPSERT_SNAPSHOT, _row(entry))
+
+
+drift.on_snapshot(_on_snapshot)
+
+
+def parse_ts(value):
+    """Epoch seconds or an ISO-8601 date/time (UTC if no offset) -> epoch seconds."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def state_as_of(key, ts):
+    """
+    What we believed about a provider at time ts: the last snapshot
+    recorded at or before ts. Returns None for unknown providers and
+    {"snapshot": None, ...} if ts predates the first snapshot.
+    """
+    key = slug(key)
+    with _lock:
+        _ensure_index()
+        if key not in _index:
+            return None
+        ts_list, snaps = _index[key]
+        i = bisect_right(ts_list, ts) - 1
+        snap = snaps[i] if i >= 0 else None
+        return {
+            "slug": key,
+            "as_of": ts,
+            "snapshot_ts": snap["ts"] if snap else None,
+            "snapshot_seq": i if snap else None,
+            "snapshot": snap["candidate"] if snap else None,
+            "snapshots_before": i + 1,
+            "snapshot_count": len(ts_list),
+        }
+
+
+def rebuild():
+    """Recompute the view from history.json + latest search-history results."""
+    from storage.search_history import load_search_history
+    from storage.result_store import get_result
+
+    view = _snapshot_view(drift.load_history())
+    latest = {}
+    for e in load_search_history():
+        latest[slug(e.get("provider"))] = e
+    for key, e in latest.items():
+        result = e.get("result") or get_result(e.get("result_id"))
+        if not result or key not in view:
+            continue
+        _apply_verification(view[key], result, e.get("timestamp"))
+    with _write() as conn:
+        conn.execute("DELETE FROM providers")
+        for entry in view.values():
+            _upsert(conn, entry)
+    return view
+
+
+if __name__ == "__main__":
+    # python -m storage.provider_state  -> rebuild data/provider_state.db
+    rebuilt = rebuild()
+    print(f"{len(rebuilt)} provider(s) -> {os.path.abspath(PROVIDER_STATE_DB)}")
@@ -0,0 +1,96 @@
+# storage/result_store.py
+import os
+import json
+import hashlib
+import tempfile
+
+# -----------------------------------------
+# Content-addressed store for verification results.
+# Each distinct result is written once to
+#   data/results/<first 2 hex>/<sha256>.json
+# and referenced from search history by its hash.
+# What is stored (and hashed) is stable(result): repeating a search
+# that found the same thing must give the same id.
+# -----------------------------------------
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "../data/results")
+
+# source weights decay with time, so they differ on every run in the
+# last digits; scores and similarities are rounded to the same precision
+FLOAT_DIGITS = 4
+
+# per-run bookkeeping in the drift block (the history entry has its own timestamp)
+VOLATILE_DRIFT_KEYS = ("history_count", "last_snapshot_ts")
+
+
+def _round_floats(value):
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    if isinstance(value, dict):
+        return {k: _round_floats(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round_floats(v) for v in value]
+    return value
+
+
+def stable(result):
+    """The run-independent part of a result: rounded floats, no drift counters / timestamps."""
+    out = _round_floats(result)
+    drift = out.get("drift")
+    if isinstance(drift, dict):
+        for k in VOLATILE_DRIFT_KEYS:
+            drift.pop(k, None)
+        if isinstance(drift.get("latest_snapshot"), dict):
+            drift["latest_snapshot"].pop("retrieved_at", None)
+    return out
+
+
+def _canonical(result):
+    return json.dumps(stable(result), sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+                      default=str)
+
+
+def result_id(result):
+    return hashlib.sha256(_canonical(result).encode("utf-8")).hexdigest()
+
+
+def _path(rid):
+    return os.path.join(RESULTS_DIR, rid[:2], rid + ".json")
+
+
+def _valid_id(rid):
+    return isinstance(rid, str) and len(rid) == 64 and all(c in "0123456789abcdef" for c in rid)
+
+
+def put_result(result):
+    """Store result (if not already stored) and return its content hash."""
+    body = _canonical(result)
+    rid = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    path = _path(rid)
+    if os.path.exists(path):
+        return rid
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    return rid
+
+
+def get_result(rid):
+    """Return the stored result for a hash, or None."""
+    if not _valid_id(rid):
+        return None
+    try:
+        with open(_path(rid), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def summarize(result):
+    """Small summary kept inline in history entries."""
+    result = result or {}
+    return {
+        "final_confidence": result.get("final_confidence", result.get("confidence")),
+        "flag_for_manual_review": result.get("flag_for_manual_review"),
+    }
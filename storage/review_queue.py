@@ -0,0 +1,378 @@
+# storage/review_queue.py
+"""
+Manual-review queue: verifications flagged by compute_confidence
+(flag_for_manual_review) become work items admins claim and resolve.
+
+SQLite (data/review_queue.db, WAL) rather than a JSON file: admins page
+through the queue by confidence, age or provider and claim items from
+several workers at once, so the store needs indexes and atomic claims.
+
+    open -> claimed -> resolved      (resolving applies /feedback)
+    open -> cleared                  (a later verification was not flagged)
+
+One open/claimed item per provider: a provider flagged again while its
+item is pending updates that item. Claims expire after CLAIM_TTL seconds
+and the item goes back to open. Pages are keyset-paginated: a page ends
+with an opaque cursor (sort value + id), so paging stays O(page) however
+deep and items added meanwhile do not shift later pages.
+
+    python -m storage.review_queue backfill   # from search history
+    python -m storage.review_queue counts
+"""
+import os
+import json
+import time
+import base64
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from verification import drift
+from storage import generations
+from storage.result_store import put_result, get_result
+
+REVIEW_QUEUE_DB = os.path.join(os.path.dirname(__file__), "../data/review_queue.db")
+
+STATUSES = ("open", "claimed", "resolved", "cleared")
+PENDING = ("open", "claimed")
+
+CLAIM_TTL = 30 * 60           # seconds before an unresolved claim lapses
+MAX_PAGE = 200
+
+# sort name -> (column, direction)
+SORTS = {
+    "confidence": ("confidence", "ASC"),     # least confident first
+    "age": ("created_at", "ASC"),            # waiting longest first
+    "newest": ("created_at", "DESC"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id            INTEGER PRIMARY KEY,
+    slug          TEXT NOT NULL,
+    provider_name TEXT NOT NULL,
+    confidence    REAL NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'open',
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    times_flagged INTEGER NOT NULL DEFAULT 1,
+    result_id     TEXT,
+    listed        TEXT,
+    candidate     TEXT,
+    field_scores  TEXT,
+    claimed_by    TEXT,
+    claimed_at    REAL,
+    resolved_by   TEXT,
+    resolved_at   REAL,
+    resolution    TEXT
+);
+CREATE INDEX IF NOT EXISTS items_status_confidence ON items (status, confidence, id);
+CREATE INDEX IF NOT EXISTS items_status_created ON items (status, created_at, id);
+CREATE INDEX IF NOT EXISTS items_slug ON items (slug, status);
+CREATE UNIQUE INDEX IF NOT EXISTS items_pending_slug ON items (slug) WHERE status IN ('open', 'claimed');
+"""
+
+_JSON_COLUMNS = ("listed", "candidate", "field_scores", "resolution")
+
+_local = threading.local()
+
+
+class ReviewConflict(Exception):
+    """The item is claimed by someone else, or already closed."""
+
+
+def slug(name):
+    return drift._slug(name)
+
+
+# -----------------------------------------
+# Connection (one per thread)
+# -----------------------------------------
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != REVIEW_QUEUE_DB:
+        os.makedirs(os.path.dirname(REVIEW_QUEUE_DB), exist_ok=True)
+        # autocommit; read-modify-write goes through _write()
+        conn = sqlite3.connect(REVIEW_QUEUE_DB, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.path = conn, REVIEW_QUEUE_DB
+    return conn
+
+
+@contextmanager
+def _write():
+    """
+    A write transaction, holding the database's write lock from the
+    start; bumps the "review_queue" generation if anything changed.
+    """
+    conn = _conn()
+    before = conn.total_changes
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    if conn.total_changes != before:
+        generations.bump("review_queue")
+
+
+def _item(row):
+    if row is None:
+        return None
+    item = dict(row)
+    for c in _JSON_COLUMNS:
+        item[c] = json.loads(item[c]) if item[c] else None
+    return item
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+
+def _expire_claims(conn, now):
+    conn.execute(
+        "UPDATE items SET status = 'open', claimed_by = NULL, claimed_at = NULL "
+        "WHERE status = 'claimed' AND claimed_at < ?", (now - CLAIM_TTL,))
+
+
+def expire_claims():
+    """Return lapsed claims to the queue (a read unless there are any)."""
+    now = time.time()
+    if _conn().execute("SELECT 1 FROM items WHERE status = 'claimed' AND claimed_at < ? LIMIT 1",
+                       (now - CLAIM_TTL,)).fetchone():
+        with _write() as conn:
+            _expire_claims(conn, now)
+
+
+def version():
+    """Validator (ETag) for queue pages: the generation after lapsed claims are released."""
+    expire_claims()
+    return str(generations.current("review_queue"))
+
+
+# -----------------------------------------
+# Producer: every verification (ControllerAgent)
+# -----------------------------------------
+def record_verification(provider_name, result, listed=None, ts=None):
+    """
+    Queue a flagged result (or refresh the provider's pending item); a
+    result that is not flagged clears an open item. Returns the item id
+    or None.
+    """
+    ts = float(ts or time.time())
+    key = slug(provider_name)
+    if not result.get("flag_for_manual_review"):
+        conn = _conn()
+        # cheap read first: almost every provider has nothing pending
+        if conn.execute("SELECT 1 FROM items WHERE slug = ? AND status = 'open'", (key,)).fetchone():
+            with _write() as conn:
+                conn.execute("UPDATE items SET status = 'cleared', resolved_at = ?, updated_at = ? "
+                             "WHERE slug = ? AND status = 'open'", (ts, ts, key))
+        return None
+
+    fields = {
+        "provider_name": provider_name,
+        "confidence": result.get("final_confidence") or 0.0,
+        "updated_at": ts,
+        "result_id": put_result(result),
+        "listed": _dumps({k: v for k, v in (listed or {}).items() if v is not None}),
+        "candidate": _dumps(result.get("candidate")),
+        "field_scores": _dumps(result.get("field_scores")),
+    }
+    with _write() as conn:
+        row = conn.execute("SELECT id FROM items WHERE slug = ? AND status IN ('open', 'claimed')",
+                           (key,)).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE items SET " + ", ".join(f"{c} = ?" for c in fields) +
+                ", times_flagged = times_flagged + 1 WHERE id = ?", (*fields.values(), row["id"]))
+            return row["id"]
+        cur = conn.execute(
+            "INSERT INTO items (slug, created_at, " + ", ".join(fields) + ") VALUES (?, ?" +
+            ", ?" * len(fields) + ")", (key, ts, *fields.values()))
+        return cur.lastrowid
+
+
+# -----------------------------------------
+# Reading: keyset pagination
+# -----------------------------------------
+def _encode_cursor(value, item_id):
+    raw = json.dumps([value, item_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        value, item_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(value), int(item_id)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+def page(status="open", sort="confidence", provider=None, claimed_by=None, limit=50, cursor=None):
+    """
+    One page of items: {"items": [...], "next_cursor": str | None}.
+    Pass next_cursor back (with the same filters) for the following page.
+    """
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+    column, direction = SORTS[sort]
+    limit = max(1, min(int(limit), MAX_PAGE))
+
+    where, params = ["status = ?"], [status]
+    if provider:
+        where.append("slug = ?")
+        params.append(slug(provider))
+    if claimed_by:
+        where.append("claimed_by = ?")
+        params.append(claimed_by)
+    if cursor:
+        value, item_id = _decode_cursor(cursor)
+        where.append(f"({column}, id) {'>' if direction == 'ASC' else '<'} (?, ?)")
+        params.extend((value, item_id))
+
+    if status in PENDING:
+        expire_claims()
+    rows = _conn().execute(
+        f"SELECT * FROM items WHERE {' AND '.join(where)} "
+        f"ORDER BY {column} {direction}, id {direction} LIMIT ?", (*params, limit + 1)).fetchall()
+    items = [_item(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = _encode_cursor(last[column], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def counts():
+    """Items per status."""
+    out = dict.fromkeys(STATUSES, 0)
+    for row in _conn().execute("SELECT status, COUNT(*) AS n FROM items GROUP BY status"):
+        out[row["status"]] = row["n"]
+    return out
+
+
+def get_item(item_id):
+    return _item(_conn().execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone())
+
+
+def get_result_for(item):
+    """The full verification result behind an item (content-addressed)."""
+    return get_result(item.get("result_id")) if item else None
+
+
+# -----------------------------------------
+# Claims + resolution
+# -----------------------------------------
+def claim(item_id, admin):
+    """
+    Claim an item for `admin` (re-claiming your own item renews it).
+    Returns the item, None if there is no such item; raises ReviewConflict.
+    """
+    now = time.time()
+    with _write() as conn:
+        _expire_claims(conn, now)
+        item = _item(conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone())
+        if item is None:
+            return None
+        if item["status"] not in PENDING:
+            raise ReviewConflict(f"item {item_id} is already {item['status']}")
+        if item["status"] == "claimed" and item["claimed_by"] != admin:
+            raise ReviewConflict(f"item {item_id} is claimed by {item['claimed_by']}")
+        conn.execute("UPDATE items SET status = 'claimed', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                     (admin, now, item_id))
+    item.update(status="claimed", claimed_by=admin, claimed_at=now)
+    return item
+
+
+def claim_next(admin, sort="confidence", provider=None):
+    """Claim the first open item in `sort` order; None when the queue is empty."""
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+    column, direction = SORTS[sort]
+    now = time.time()
+    where, params = "status = 'open'", []
+    if provider:
+        where += " AND slug = ?"
+        params.append(slug(provider))
+    with _write() as conn:
+        _expire_claims(conn, now)
+        row = conn.execute(f"SELECT * FROM items WHERE {where} ORDER BY {column} {direction}, "
+                           f"id {direction} LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE items SET status = 'claimed', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                     (admin, now, row["id"]))
+    item = _item(row)
+    item.update(status="claimed", claimed_by=admin, claimed_at=now)
+    return item
+
+
+def release(item_id, admin):
+    """Give a claimed item back to the queue. Returns the item or None."""
+    with _write() as conn:
+        item = _item(conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone())
+        if item is None:
+            return None
+        if item["status"] != "claimed" or item["claimed_by"] != admin:
+            raise ReviewConflict(f"item {item_id} is not claimed by {admin}")
+        conn.execute("UPDATE items SET status = 'open', claimed_by = NULL, claimed_at = NULL "
+                     "WHERE id = ?", (item_id,))
+    item.update(status="open", claimed_by=None, claimed_at=None)
+    return item
+
+
+def resolve(item_id, admin, resolution):
+    """Close an item claimed by `admin`, recording the decision applied."""
+    now = time.time()
+    with _write() as conn:
+        cur = conn.execute(
+            "UPDATE items SET status = 'resolved', resolved_by = ?, resolved_at = ?, updated_at = ?, "
+            "resolution = ? WHERE id = ? AND status = 'claimed' AND claimed_by = ?",
+            (admin, now, now, _dumps(resolution), item_id, admin))
+        if cur.rowcount != 1:
+            raise ReviewConflict(f"item {item_id} is not claimed by {admin}")
+    return get_item(item_id)
+
+
+# -----------------------------------------
+# Backfill from search history
+# -----------------------------------------
+def backfill():
+    """Queue the latest flagged result of every provider in search history."""
+    from storage.search_history import load_search_history
+
+    latest = {}
+    for e in load_search_history():
+        latest[slug(e.get("provider"))] = e
+    queued = 0
+    for e in latest.values():
+        if not (e.get("summary") or {}).get("flag_for_manual_review"):
+            continue
+        result = get_result(e.get("result_id"))
+        if result is None:
+            continue
+        listed = {"name": e.get("provider"), "listed_phone": e.get("listed_phone"),
+                  "listed_address": e.get("listed_address")}
+        if record_verification(e.get("provider"), result, listed, ts=e.get("timestamp")) is not None:
+            queued += 1
+    return queued
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "counts"
+    if cmd == "backfill":
+        print(f"{backfill()} flagged provider(s) queued -> {os.path.abspath(REVIEW_QUEUE_DB)}")
+    elif cmd == "counts":
+        print(json.dumps(counts(), indent=2))
+    else:
+        raise SystemExit("usage: python -m storage.review_queue [backfill|counts]")
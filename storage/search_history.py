@@ -0,0 +1,106 @@
+# storage/search_history.py
+import os
+import json
+import time
+
+from storage.result_store import put_result, get_result, summarize
+from storage.locking import file_lock, atomic_write_json
+from storage import generations
+
+# -----------------------------------------
+# Per-user search history.
+# Entries reference their verification result by content hash
+# ("result_id") plus an inline summary; the full result lives in
+# storage.result_store and is fetched lazily.
+# -----------------------------------------
+SEARCH_HISTORY_FILE = os.path.join(os.path.dirname(__file__), "../data/search_history.json")
+
+
+def _ensure_search_history_file():
+    folder = os.path.dirname(SEARCH_HISTORY_FILE)
+    if not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+    if not os.path.exists(SEARCH_HISTORY_FILE):
+        with open(SEARCH_HISTORY_FILE, "w") as f:
+            json.dump([], f)
+
+
+def _externalize(entry):
+    """Move an inline "result" into the result store. Returns True if changed."""
+    if "result" not in entry:
+        return False
+    result = entry.pop("result")
+    if result is not None:
+        entry["result_id"] = put_result(result)
+        entry["summary"] = summarize(result)
+    return True
+
+
+def _read():
+    _ensure_search_history_file()
+    with open(SEARCH_HISTORY_FILE, "r") as f:
+        return json.load(f)
+
+
+def _migrate(data):
+    """Externalize inline results. Returns True if anything changed."""
+    changed = False
+    for e in data:
+        changed = _externalize(e) or changed
+    return changed
+
+
+def load_search_history():
+    data = _read()
+    # one-time migration of files written with inline results
+    if any("result" in e for e in data):
+        with file_lock(SEARCH_HISTORY_FILE):
+            data = _read()
+            if _migrate(data):
+                _save(data)
+    return data
+
+
+def _save(arr):
+    atomic_write_json(SEARCH_HISTORY_FILE, arr, indent=2, ensure_ascii=False)
+    generations.bump("search_history")
+
+
+def save_search_history(arr):
+    _ensure_search_history_file()
+    with file_lock(SEARCH_HISTORY_FILE):
+        _save(arr)
+
+
+def append_search_history(payload):
+    payload = dict(payload)
+    payload.setdefault("timestamp", int(time.time()))
+    _externalize(payload)
+    # read-modify-write of the whole file: serialize across threads/workers
+    with file_lock(SEARCH_HISTORY_FILE):
+        data = _read()
+        _migrate(data)
+        data.append(payload)
+        _save(data)
+    return payload
+
+
+def version():
+    """Validator (ETag) for the history file's content."""
+    return generations.version("search_history", SEARCH_HISTORY_FILE)
+
+
+def expand(entry):
+    """Return a copy of an entry with its full result inlined (old shape)."""
+    out = dict(entry)
+    if "result_id" in out:
+        out["result"] = get_result(out["result_id"])
+    return out
+
+
+if __name__ == "__main__":
+    # python -m storage.search_history  -> migrate inline results in place
+    before = os.path.getsize(SEARCH_HISTORY_FILE) if os.path.exists(SEARCH_HISTORY_FILE) else 0
+    rows = load_search_history()
+    after = os.path.getsize(SEARCH_HISTORY_FILE)
+    print(f"{len(rows)} entries, {before} -> {after} bytes")
@@ -0,0 +1,100 @@
+# storage/source_weights.py
+import os
+
+from storage import generations
+from storage.locking import file_lock, atomic_write_json, read_json
+
+# -----------------------------------------
+# Source credibility learned from admin feedback.
+# Persisted to SOURCE_WEIGHTS_FILE and overlaid on the static
+# verification.confidence.SOURCE_CREDIBILITY table. Every worker
+# re-applies the file when the "source_weights" generation moves.
+# -----------------------------------------
+SOURCE_WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), "../data/source_weights.json")
+
+LEARNING_RATE = 0.05
+MIN_WEIGHT, MAX_WEIGHT = 0.05, 0.99
+
+_tracker = generations.Tracker("source_weights")
+
+
+def load_source_weights():
+    return read_json(SOURCE_WEIGHTS_FILE, {})
+
+
+def _apply(weights):
+    from verification import confidence
+
+    merged = dict(confidence.BASE_SOURCE_CREDIBILITY)
+    merged.update({k: float(v) for k, v in weights.items()})
+    # in place and never emptied: scoring threads read it concurrently
+    # (and rely on "Unknown", which is in the base table, being present)
+    table = confidence.SOURCE_CREDIBILITY
+    table.update(merged)
+    for k in [k for k in table if k not in merged]:
+        table.pop(k, None)
+
+
+def refresh():
+    """Re-apply learned weights if any process changed them since we last looked."""
+    if _tracker.stale():
+        _tracker.mark()
+        _apply(load_source_weights())
+
+
+def _nudge(weight, decision):
+    weight = weight * (1 + LEARNING_RATE) if decision == "approve" else weight * (1 - LEARNING_RATE)
+    return max(MIN_WEIGHT, min(MAX_WEIGHT, weight))
+
+
+def record_decisions(decisions):
+    """
+    Apply (source, decision) pairs in order, each nudging the source's
+    credibility up (approve) or down (reject) from its current effective
+    value. The weights file is read and written once.
+    Returns {source: {"before", "after", "approve", "reject"}}.
+    """
+    from verification.confidence import _source_weight
+
+    decisions = [(s, d) for s, d in decisions if s]
+    if not decisions:
+        return {}
+    refresh()
+    changes = {}
+    with file_lock(SOURCE_WEIGHTS_FILE):
+        weights = load_source_weights()
+        for source, decision in decisions:
+            before = weights.get(source, _source_weight(source))
+            weights[source] = _nudge(before, decision)
+            change = changes.setdefault(source, {"before": before, "approve": 0, "reject": 0})
+            change[decision] += 1
+        atomic_write_json(SOURCE_WEIGHTS_FILE, weights, indent=2)
+        generation = generations.bump("source_weights")
+    if _tracker.advance(generation):
+        _apply(weights)
+    for source, change in changes.items():
+        change["after"] = weights[source]
+    return changes
+
+
+def record_decision(source, decision):
+    """Single-decision form of record_decisions. Returns the new weight."""
+    return record_decisions([(source, decision)])[source]["after"]
+
+
+def revert(changes):
+    """
+    Undo a record_decisions() result (e.g. when the rest of its batch
+    failed). Sources another process has nudged since are left alone.
+    """
+    if not changes:
+        return
+    with file_lock(SOURCE_WEIGHTS_FILE):
+        weights = load_source_weights()
+        for source, change in changes.items():
+            if weights.get(source) == change["after"]:
+                weights[source] = change["before"]
+        atomic_write_json(SOURCE_WEIGHTS_FILE, weights, indent=2)
+        generation = generations.bump("source_weights")
+    if _tracker.advance(generation):
+        _apply(weights)
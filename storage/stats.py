@@ -0,0 +1,265 @@
+# storage/stats.py
+import os
+import json
+import time
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from storage import generations
+from storage.locking import file_lock, atomic_write_json, read_json
+
+# -----------------------------------------
+# Incremental analytics for admin dashboards.
+# Each verification / feedback event updates per-day (UTC) aggregates,
+# so /admin/stats never scans the history files.
+# Events accumulate as per-process deltas that each flush adds into
+# STATS_FILE under a lock, so several worker processes can share it.
+# -----------------------------------------
+STATS_FILE = os.path.join(os.path.dirname(__file__), "../data/stats.json")
+
+FLUSH_INTERVAL = 2.0          # seconds between writes to STATS_FILE
+CONFIDENCE_BUCKET = 10        # confidence histogram bucket width (0..100)
+
+_lock = threading.Lock()
+_state = {"stats": None, "pending": {"days": {}}, "dirty": False, "changes": 0, "last_flush": 0.0, "timer": None}
+_tracker = generations.Tracker("stats")
+
+
+def _day(ts=None):
+    return datetime.fromtimestamp(ts or time.time(), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _empty_day():
+    return {
+        "verifications": 0,
+        "flagged": 0,
+        "confidence_sum": 0.0,
+        "confidence_buckets": {},
+        "drift_events": 0,
+        "drift_fields": {},
+        "sources": {},
+        "providers": {},
+        "feedback": {},
+    }
+
+
+def _add(dst, src):
+    """dst += src for nested dicts of numbers."""
+    for k, v in src.items():
+        if isinstance(v, dict):
+            _add(dst.setdefault(k, {}), v)
+        else:
+            dst[k] = dst.get(k, 0) + v
+
+
+def _load():
+    """Flushed aggregates plus this process's pending deltas."""
+    if _state["stats"] is None or _tracker.stale():
+        _tracker.mark()
+        _state["stats"] = read_json(STATS_FILE, {"days": {}})
+    merged = json.loads(json.dumps(_state["stats"]))
+    _add(merged, _state["pending"])
+    return merged
+
+
+def _pending_day(ts=None):
+    return _state["pending"]["days"].setdefault(_day(ts), _empty_day())
+
+
+def _flush(force=False):
+    if not _state["dirty"]:
+        return
+    now = time.time()
+    if not force and now - _state["last_flush"] < FLUSH_INTERVAL:
+        return
+    with file_lock(STATS_FILE):
+        stats = read_json(STATS_FILE, {"days": {}})
+        _add(stats, _state["pending"])
+        atomic_write_json(STATS_FILE, stats, ensure_ascii=False)
+        _tracker.mark(generations.bump("stats"))
+    _state["stats"] = stats
+    _state["pending"] = {"days": {}}
+    _state["dirty"] = False
+    _state["last_flush"] = now
+
+
+def flush():
+    with _lock:
+        _flush(force=True)
+
+
+def _schedule_flush():
+    """Make sure pending changes reach the file even if no further event arrives."""
+    if _state["timer"] is None:
+        def run():
+            _state["timer"] = None
+            flush()
+        _state["timer"] = threading.Timer(FLUSH_INTERVAL, run)
+        _state["timer"].daemon = True
+        _state["timer"].start()
+
+
+atexit.register(flush)
+
+
+def _bump(d, key, amount=1):
+    d[key] = d.get(key, 0) + amount
+
+
+def _bucket(conf):
+    lo = min(100 - CONFIDENCE_BUCKET, int(conf // CONFIDENCE_BUCKET) * CONFIDENCE_BUCKET)
+    return f"{lo}-{lo + CONFIDENCE_BUCKET}"
+
+
+def _apply_verification(day, provider, result, source_outcomes):
+    conf = result.get("final_confidence")
+    day["verifications"] += 1
+    if conf is not None:
+        day["confidence_sum"] += float(conf)
+        _bump(day["confidence_buckets"], _bucket(float(conf)))
+    if result.get("flag_for_manual_review"):
+        day["flagged"] += 1
+
+    drift_info = (result.get("drift") or {}).get("drift_info") or {}
+    changed = drift_info.get("changed_fields") or []
+    if changed:
+        day["drift_events"] += 1
+    for field in changed:
+        _bump(day["drift_fields"], field)
+
+    for source, outcome in (source_outcomes or {}).items():
+        _bump(day["sources"].setdefault(source, {}), outcome)
+
+    if provider:
+        _bump(day["providers"], provider)
+
+
+def record_verification(provider, result, source_outcomes=None, ts=None):
+    """Fold one verification result into today's aggregates."""
+    with _lock:
+        _apply_verification(_pending_day(ts), provider, result, source_outcomes)
+        _state["dirty"] = True
+        _state["changes"] += 1
+        _flush()
+        _schedule_flush()
+
+
+def record_feedback(decision, source=None, ts=None):
+    with _lock:
+        day = _pending_day(ts)
+        _bump(day["feedback"], decision)
+        if source:
+            _bump(day["feedback"], f"{decision}:{source}")
+        _state["dirty"] = True
+        _state["changes"] += 1
+        _flush()
+        _schedule_flush()
+
+
+def _rate(num, den):
+    return round(num / den, 4) if den else 0.0
+
+
+def version():
+    """Validator (ETag) for get_stats(): generation, this process's pending deltas and the day."""
+    with _lock:
+        v = generations.version("stats", STATS_FILE)
+        if _state["dirty"]:
+            v += f".{os.getpid()}.{_state['changes']}"
+    return f"{v}.{_day()}"
+
+
+def get_stats(days=30, top=10):
+    """Per-day series + totals for the last `days` days."""
+    since = _day(time.time() - max(0, days - 1) * 86400)
+    with _lock:
+        stats = _load()
+        selected = {d: v for d, v in stats["days"].items() if d >= since}
+
+    totals = _empty_day()
+    providers = Counter()
+    series = []
+    for d in sorted(selected):
+        v = selected[d]
+        totals["verifications"] += v["verifications"]
+        totals["flagged"] += v["flagged"]
+        totals["confidence_sum"] += v["confidence_sum"]
+        totals["drift_events"] += v["drift_events"]
+        for k, n in v["confidence_buckets"].items():
+            _bump(totals["confidence_buckets"], k, n)
+        for k, n in v["drift_fields"].items():
+            _bump(totals["drift_fields"], k, n)
+        for k, n in v["feedback"].items():
+            _bump(totals["feedback"], k, n)
+        for src, outcomes in v["sources"].items():
+            for k, n in outcomes.items():
+                _bump(totals["sources"].setdefault(src, {}), k, n)
+        providers.update(v["providers"])
+        series.append({
+            "day": d,
+            "verifications": v["verifications"],
+            "flag_rate": _rate(v["flagged"], v["verifications"]),
+            "avg_confidence": round(v["confidence_sum"] / v["verifications"], 2) if v["verifications"] else None,
+            "confidence_buckets": v["confidence_buckets"],
+            "drift_fields": v["drift_fields"],
+            "sources": v["sources"],
+            "feedback": v["feedback"],
+        })
+
+    source_rates = {}
+    for src, outcomes in totals["sources"].items():
+        # "skipped" = planner stopped before querying the source
+        calls = sum(n for k, n in outcomes.items() if k != "skipped")
+        source_rates[src] = {
+            "calls": calls,
+            "hit_rate": _rate(outcomes.get("hit", 0), calls),
+            "error_rate": _rate(outcomes.get("error", 0) + outcomes.get("timeout", 0), calls),
+            **outcomes,
+        }
+
+    n = totals["verifications"]
+    return {
+        "days": days,
+        "since": since,
+        "totals": {
+            "verifications": n,
+            "flagged": totals["flagged"],
+            "flag_rate": _rate(totals["flagged"], n),
+            "avg_confidence": round(totals["confidence_sum"] / n, 2) if n else None,
+            "confidence_buckets": totals["confidence_buckets"],
+            "drift_events": totals["drift_events"],
+            "drift_fields": totals["drift_fields"],
+            "feedback": totals["feedback"],
+        },
+        "sources": source_rates,
+        "top_providers": [{"provider": p, "searches": c} for p, c in providers.most_common(top)],
+        "series": series,
+    }
+
+
+def rebuild_from_search_history():
+    """Recompute aggregates from search history (one-off backfill)."""
+    from storage.search_history import load_search_history
+    from storage.result_store import get_result
+
+    fresh = {"days": {}}
+    for entry in load_search_history():
+        result = entry.get("result") or get_result(entry.get("result_id")) or entry.get("summary") or {}
+        day = fresh["days"].setdefault(_day(entry.get("timestamp")), _empty_day())
+        _apply_verification(day, entry.get("provider"), result, None)
+    with _lock:
+        with file_lock(STATS_FILE):
+            atomic_write_json(STATS_FILE, fresh, ensure_ascii=False)
+            _tracker.mark(generations.bump("stats"))
+        _state["stats"] = fresh
+        _state["pending"] = {"days": {}}
+        _state["dirty"] = False
+    return fresh
+
+
+if __name__ == "__main__":
+    # python -m storage.stats  -> backfill data/stats.json from search history
+    rebuilt = rebuild_from_search_history()
+    print(f"rebuilt stats for {len(rebuilt['days'])} day(s) -> {os.path.abspath(STATS_FILE)}")
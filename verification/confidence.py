@@ -2,6 +2,9 @@
 import time
 from collections import defaultdict
 from rapidfuzz import fuzz
+from monitoring.metrics import timed
+from verification.geo_index import coords, haversine_m, distance_similarity
+from verification import phone
 
 # -----------------------------------------
 # SOURCE WEIGHTS (YOU CAN TUNE)
@@ -16,6 +19,9 @@ SOURCE_CREDIBILITY = {
     "Unknown": 0.5
 }
 
+# static defaults; storage.source_weights overlays learned values on SOURCE_CREDIBILITY
+BASE_SOURCE_CREDIBILITY = dict(SOURCE_CREDIBILITY)
+
 SECONDS_IN_DAY = 86400.0
 
 def _source_weight(src):
@@ -39,22 +45,13 @@ def text_similarity(a, b):
     except:
         return 0.0
 
-def phone_similarity(a, b):
-    if not a or not b:
-        return 0.0
-    na = ''.join(filter(str.isdigit, str(a)))
-    nb = ''.join(filter(str.isdigit, str(b)))
-    if na == nb and na != "":
-        return 1.0
-    if len(na) >= 6 and len(nb) >= 6 and na[-6:] == nb[-6:]:
-        return 0.8
-    return 0.0
+# same number in any format -> 1.0, same last 6 digits -> 0.8
+phone_similarity = phone.similarity
 
 # -------------------------------------------------
 #   MAIN FIELD SCORE COMPUTATION
 # -------------------------------------------------
-def compute_field_scores(listed, candidates):
-
+def _accumulate_votes(candidates):
     votes = {
         "name": defaultdict(float),
         "address": defaultdict(float),
@@ -64,6 +61,9 @@ def compute_field_scores(listed, candidates):
 
     source_votes = {"name": [], "address": [], "phone": [], "website": []}
 
+    # address value -> (lat, lon) of its most credible geocoded candidate
+    locations, loc_w = {}, {}
+
     # ---- accumulate weighted votes ----
     for c in candidates:
         src = c.get("source", "Unknown")
@@ -80,6 +80,9 @@ def compute_field_scores(listed, candidates):
         if addr_val:
             votes["address"][addr_val] += weight
             source_votes["address"].append((src, addr_val, weight))
+            ll = coords(c)
+            if ll and weight > loc_w.get(addr_val, -1.0):
+                locations[addr_val], loc_w[addr_val] = ll, weight
 
         # PHONE
         phone_val = c.get("phone")
@@ -93,6 +96,26 @@ def compute_field_scores(listed, candidates):
             votes["website"][site_val] += weight
             source_votes["website"].append((src, site_val, weight))
 
+    # one number in several formats is one phone vote, shown in the
+    # format of its heaviest variant
+    if len(votes["phone"]) > 1:
+        merged, shown = {}, {}
+        for v, w in votes["phone"].items():
+            key = phone.national_key(v) or v
+            if key in merged:
+                if w > votes["phone"][shown[key]]:
+                    shown[key] = v
+                merged[key] += w
+            else:
+                merged[key], shown[key] = w, v
+        votes["phone"] = defaultdict(float, {shown[k]: w for k, w in merged.items()})
+
+    return votes, source_votes, locations
+
+def compute_field_scores(listed, candidates):
+
+    votes, source_votes, locations = _accumulate_votes(candidates)
+
     # -----------------------------------------
     #  Determine “chosen” consensus values
     # -----------------------------------------
@@ -101,6 +124,8 @@ def compute_field_scores(listed, candidates):
         if votes[field]:
             v, w = max(votes[field].items(), key=lambda x: x[1])
             chosen[field] = {"value": v, "weight": w}
+            if field == "address" and v in locations:
+                chosen[field]["lat"], chosen[field]["lon"] = locations[v]
         else:
             chosen[field] = {"value": None, "weight": 0}
 
@@ -109,41 +134,51 @@ def compute_field_scores(listed, candidates):
     # -----------------------------------------
     field_scores = {}
 
+    for field in FIELD_WEIGHTS:
+        field_scores[field] = _field_score(listed, field, chosen[field]["value"], locations.get(chosen[field]["value"]))
+
+    return chosen, field_scores, source_votes
+
+def _field_score(listed, field, value, location=None):
     # NAME similarity
-    ln = listed.get("name")
-    cn = chosen["name"]["value"]
-    field_scores["name"] = text_similarity(ln, cn) if ln and cn else 0.0
-
-    # ADDRESS similarity — treat missing user address as NEUTRAL (0.5)
-    la = listed.get("listed_address")
-    ca = chosen["address"]["value"]
-    if la:
-        field_scores["address"] = text_similarity(la, ca) if ca else 0.0
-    else:
-        field_scores["address"] = 0.5  # neutral score
+    if field == "name":
+        ln = listed.get("name")
+        return text_similarity(ln, value) if ln and value else 0.0
+
+    # ADDRESS similarity — by distance when both sides are geocoded,
+    # otherwise by text; missing user address is NEUTRAL (0.5)
+    if field == "address":
+        la = listed.get("listed_address")
+        listed_ll = coords(listed)
+        if listed_ll and location:
+            return distance_similarity(haversine_m(*listed_ll, *location))
+        if la:
+            return text_similarity(la, value) if value else 0.0
+        return 0.5  # neutral score
 
     # PHONE similarity — treat missing as NEUTRAL (0.5)
-    lp = listed.get("listed_phone")
-    cp = chosen["phone"]["value"]
-    if lp:
-        field_scores["phone"] = phone_similarity(lp, cp)
-    else:
-        field_scores["phone"] = 0.5
+    if field == "phone":
+        lp = listed.get("listed_phone")
+        if lp:
+            return phone_similarity(lp, value)
+        return 0.5
 
     # WEBSITE similarity (optional)
-    field_scores["website"] = 0.0
-
-    return chosen, field_scores, source_votes
+    return 0.0
 
 # -------------------------------------------------
 #   CONSENSUS + FINAL SCORING
 # -------------------------------------------------
+FIELD_WEIGHTS = {"name": 0.45, "address": 0.30, "phone": 0.20, "website": 0.05}
+CONSENSUS_BOOST = 0.10
+REVIEW_THRESHOLD = 70
+
 def consensus_score(chosen, field_scores):
 
-    w_name = 0.45
-    w_addr = 0.30
-    w_phone = 0.20
-    w_site = 0.05
+    w_name = FIELD_WEIGHTS["name"]
+    w_addr = FIELD_WEIGHTS["address"]
+    w_phone = FIELD_WEIGHTS["phone"]
+    w_site = FIELD_WEIGHTS["website"]
 
     # Weighted field score
     base = (
@@ -160,13 +195,14 @@ def consensus_score(chosen, field_scores):
     boost = 0
     if total_w > 0:
         consensus_factor = max_w / total_w  # 0 to 1
-        boost = 0.10 * consensus_factor     # up to +0.1
+        boost = CONSENSUS_BOOST * consensus_factor     # up to +0.1
 
     return min(1.0, base + boost)
 
 # -------------------------------------------------
 #   PUBLIC FUNCTION
 # -------------------------------------------------
+@timed("compute_confidence")
 def compute_confidence(listed, candidates):
 
     chosen, field_scores, source_votes = compute_field_scores(listed, candidates)
@@ -174,7 +210,7 @@ def compute_confidence(listed, candidates):
     frac = consensus_score(chosen, field_scores)
     final_percent = round(frac * 100, 2)
 
-    flag = final_percent < 70  # threshold
+    flag = final_percent < REVIEW_THRESHOLD  # threshold
 
     return {
         "chosen": chosen,
@@ -183,6 +219,80 @@ def compute_confidence(listed, candidates):
         "flag_for_manual_review": flag,
         "source_votes": source_votes
     }
+# -------------------------------------------------
+#   BOUNDS FOR EARLY TERMINATION (source planner)
+# -------------------------------------------------
+def confidence_bounds(listed, candidates, remaining, pinned=None):
+    """
+    Range [lo, hi] (percent) that compute_confidence can still produce once
+    more sources answer.
+      remaining: field -> max total weight still to come with unknown values
+      pinned:    field -> (value, max weight) still to come for a known value
+                 (e.g. every scraper echoes the queried name)
+    Any subset of the remaining sources may fail, so the current
+    candidates alone are always one of the covered outcomes.
+    """
+    pinned = pinned or {}
+    votes, _, locations = _accumulate_votes(candidates)
+
+    base_lo = base_hi = 0.0
+    w_lo, w_hi = {}, {}
+    for field, fw in FIELD_WEIGHTS.items():
+        fv = votes[field]
+        ranked = sorted(fv.items(), key=lambda x: x[1], reverse=True)
+        leader, lead_w = ranked[0] if ranked else (None, 0.0)
+        free = remaining.get(field, 0.0)
+        pin_val, pin_w = pinned.get(field, (None, 0.0))
+
+        # possible chosen values -> possible scores (ties may flip, hence >=)
+        scores = [_field_score(listed, field, leader, locations.get(leader))]
+        for val, w in ranked[1:]:
+            extra = free + (pin_w if val == pin_val else 0.0)
+            if w + extra >= lead_w:
+                scores.append(_field_score(listed, field, val, locations.get(val)))
+        if pin_w > 0 and pin_val not in fv and pin_w + free >= lead_w:
+            scores.append(_field_score(listed, field, pin_val))
+        if free > 0 and free >= lead_w:
+            scores.extend(_unseen_score_range(listed, field))   # an unseen value could win
+        if field == "address" and free > 0 and coords(listed):
+            scores.extend((0.0, 1.0))   # a later geocode may relocate a seen address
+
+        base_lo += fw * min(scores)
+        base_hi += fw * max(scores)
+
+        pin_total = fv.get(pin_val, 0.0) + pin_w if pin_w > 0 else 0.0
+        w_lo[field] = lead_w
+        w_hi[field] = max(lead_w, pin_total) + free
+
+    # consensus boost = CONSENSUS_BOOST * max_w / total_w
+    a, b = max(w_lo.values()), sum(w_hi.values())
+    boost_lo = CONSENSUS_BOOST * max(a / b, 1.0 / len(w_lo)) if a > 0 and b > 0 else 0.0
+    max_hi, sum_lo = max(w_hi.values()), sum(w_lo.values())
+    if max_hi <= 0:
+        boost_hi = 0.0
+    elif sum_lo > max_hi:
+        boost_hi = CONSENSUS_BOOST * max_hi / sum_lo
+    else:
+        boost_hi = CONSENSUS_BOOST
+
+    lo = round(min(1.0, base_lo + boost_lo) * 100, 2)
+    hi = round(min(1.0, base_hi + boost_hi) * 100, 2)
+    return lo, hi
+
+def _unseen_score_range(listed, field):
+    """Min/max _field_score for a value we have not seen yet."""
+    if field == "website":
+        return (0.0, 0.0)
+    key = {"name": "name", "address": "listed_address", "phone": "listed_phone"}[field]
+    if listed.get(key) or (field == "address" and coords(listed)):
+        return (0.0, 1.0)
+    return (0.0, 0.0) if field == "name" else (0.5, 0.5)
+
+def verdict_decided(listed, candidates, remaining, pinned=None, threshold=REVIEW_THRESHOLD):
+    """True when flag_for_manual_review can no longer change."""
+    lo, hi = confidence_bounds(listed, candidates, remaining, pinned)
+    return lo >= threshold or hi < threshold
+
 # at bottom of file
 def set_source_credibility(source_name, value):
     """
@@ -4,9 +4,23 @@ import json
 import time
 from pathlib import Path
 from rapidfuzz import fuzz
+from monitoring.metrics import timed
+from storage.locking import file_lock, atomic_write_json
+from storage import generations
+from verification import phone
 
 HISTORY_PATH = os.path.join(os.path.dirname(__file__), "../data/history.json")
 
+# callbacks fn(slug, provider_name, snapshot, generation, count) run after
+# each snapshot is saved; generation is the new "history" generation
+# counter, count the provider's snapshot count including this one
+_snapshot_listeners = []
+
+def on_snapshot(fn):
+    """Register a callback for newly recorded snapshots (e.g. in-memory indexes)."""
+    _snapshot_listeners.append(fn)
+    return fn
+
 def _ensure_history_file():
     p = Path(HISTORY_PATH)
     if not p.parent.exists():
@@ -27,8 +41,97 @@ def load_history():
         return json.load(f)
 
 def save_history(hist):
-    with open(HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(hist, f, indent=2, ensure_ascii=False)
+    atomic_write_json(HISTORY_PATH, hist, indent=2, ensure_ascii=False)
+
+def history_version():
+    """Validator (ETag) for history.json: snapshot generation + file stamp."""
+    return generations.version("history", HISTORY_PATH)
+
+# -----------------------------------------
+# Snapshot journal: recent snapshots as "<generation> <json>" lines,
+# appended under the history lock right after the generation bump.
+# Processes keeping in-memory indexes of history.json catch up with
+# other workers' snapshots from here instead of reloading the file.
+# Restarted (not trimmed) past JOURNAL_MAX_BYTES; a reader that falls
+# behind the restart rebuilds from history.json.
+# -----------------------------------------
+JOURNAL_MAX_BYTES = 4 * 1024 * 1024
+
+def _journal_path():
+    return HISTORY_PATH + ".journal"
+
+def _journal_append(first_generation, snaps):
+    """snaps: [(slug, provider_name, snapshot, count)] for consecutive generations."""
+    path = _journal_path()
+    data = "".join(
+        f"{first_generation + i} " + json.dumps(entry, ensure_ascii=False) + "\n"
+        for i, entry in enumerate(snaps)
+    ).encode("utf-8")
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    if size and size + len(data) <= JOURNAL_MAX_BYTES:
+        with open(path, "ab") as f:
+            f.write(data)
+        return
+    # new journal, told apart from the one it replaces by its header
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"# " + os.urandom(8).hex().encode() + b"\n" + data)
+    os.replace(tmp, path)
+
+class JournalReader:
+    """One in-memory index's read position in the snapshot journal."""
+
+    def __init__(self):
+        self.pos = None       # (journal header, byte offset of the next unread line)
+
+    def reset(self):
+        """After a full load of history.json."""
+        self.pos = None
+
+    def catch_up(self, tracker, apply):
+        """
+        Call apply(slug, provider_name, snapshot, generation, count) (the
+        on_snapshot signature) for the snapshots recorded after tracker.seen, up to the current "history" generation, and
+        advance the tracker past them. Returns False when the journal no
+        longer reaches back that far: rebuild from load_history() instead.
+        A generation bumped but not yet journaled is picked up next time.
+        """
+        if tracker.seen is None:
+            return False
+        upto = generations.current("history")
+        try:
+            f = open(_journal_path(), "rb")
+        except FileNotFoundError:
+            return False
+        found = []
+        expect = tracker.seen + 1
+        with f:
+            header = f.readline()
+            offset = f.tell()
+            if self.pos and self.pos[0] == header:
+                offset = self.pos[1]
+                f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break                     # still being written
+                generation, _, body = line.partition(b" ")
+                generation = int(generation)
+                if generation > expect and expect <= upto:
+                    return False              # restarted since we last read
+                if generation > upto:
+                    break
+                offset += len(line)
+                if generation == expect:
+                    found.append((generation, json.loads(body)))
+                    expect += 1
+        for generation, (key, name, snap, count) in found:
+            apply(key, name, snap, generation, count)
+        tracker.mark(expect - 1)
+        self.pos = (header, offset)
+        return True
 
 def _text_sim(a, b):
     if not a or not b:
@@ -38,12 +141,8 @@ def _text_sim(a, b):
     except:
         return 0.0
 
-def _phone_sim(a, b):
-    if not a or not b:
-        return 0.0
-    na = "".join(filter(str.isdigit, str(a)))
-    nb = "".join(filter(str.isdigit, str(b)))
-    return 1.0 if na and nb and na == nb else 0.0
+# 1.0 only for the same number (any format): a different number is drift
+_phone_sim = phone.same_number
 
 def compute_drift_score(old, new):
     """
@@ -92,15 +191,59 @@ def compute_drift_score(old, new):
         "field_diffs": field_diffs
     }
 
+@timed("record_snapshot")
 def record_snapshot(provider_name, snapshot_candidate):
     """
     Record snapshot into history and compute drift against last saved snapshot.
-    snapshot_candidate: dict with name,address,phone,website,retrieved_at
+    snapshot_candidate: dict with name,address,phone,website,retrieved_at (+ optional lat/lon)
     Returns: { history_count, last_snapshot_ts, drift_info, latest_snapshot }
     """
     key = _slug(provider_name)
-    hist = load_history()
+    # read-modify-write of the whole file: serialize across threads/workers
+    with file_lock(HISTORY_PATH):
+        hist = load_history()
+        result, new_snap = _append_snapshot(hist, key, provider_name, snapshot_candidate)
+        with timed("history_write"):
+            save_history(hist)
+        generation = generations.bump("history")
+        _journal_append(generation, [(key, provider_name, new_snap, result["history_count"])])
+
+    for fn in _snapshot_listeners:
+        fn(key, provider_name, new_snap, generation, result["history_count"])
+
+    return result
+
+@timed("record_snapshots")
+def record_snapshots(items):
+    """
+    Batch form of record_snapshot: items is a list of
+    (provider_name, snapshot_candidate). history.json is read and written
+    once; results are returned in input order.
+    """
+    if not items:
+        return []
+    results, appended = [], []
+    with file_lock(HISTORY_PATH):
+        hist = load_history()
+        for provider_name, snapshot_candidate in items:
+            key = _slug(provider_name)
+            result, new_snap = _append_snapshot(hist, key, provider_name, snapshot_candidate)
+            results.append(result)
+            appended.append((key, provider_name, new_snap, result["history_count"]))
+        with timed("history_write"):
+            save_history(hist)
+        # one generation per snapshot, so listeners can apply them one by one
+        last = generations.bump("history", len(items))
+        _journal_append(last - len(items) + 1, appended)
+
+    first = last - len(items) + 1
+    for i, (key, provider_name, new_snap, count) in enumerate(appended):
+        for fn in _snapshot_listeners:
+            fn(key, provider_name, new_snap, first + i, count)
 
+    return results
+
+def _append_snapshot(hist, key, provider_name, snapshot_candidate):
     if key not in hist:
         hist[key] = {"name": provider_name, "snapshots": []}
 
@@ -113,7 +256,9 @@ def record_snapshot(provider_name, snapshot_candidate):
             "address": snapshot_candidate.get("address"),
             "phone": snapshot_candidate.get("phone"),
             "website": snapshot_candidate.get("website"),
-            "retrieved_at": snapshot_candidate.get("retrieved_at", int(time.time()))
+            "retrieved_at": snapshot_candidate.get("retrieved_at", int(time.time())),
+            "lat": snapshot_candidate.get("lat"),
+            "lon": snapshot_candidate.get("lon")
         }
     }
 
@@ -137,11 +282,10 @@ def record_snapshot(provider_name, snapshot_candidate):
 
     snapshots.append(new_snap)
     hist[key]["snapshots"] = snapshots
-    save_history(hist)
 
     return {
         "history_count": len(snapshots),
         "last_snapshot_ts": snapshots[-1]["ts"],
         "drift_info": drift_info,
         "latest_snapshot": snapshots[-1]["candidate"]
-    }
+    }, new_snap
@@ -2,19 +2,34 @@
 import os
 import time
 import json
-from pathlib import Path
+import threading
+from importlib.util import find_spec
 from rapidfuzz import fuzz
-import numpy as np
+from verification import phone
 
 # Optional ML dependencies; only required if you train/predict a model
 # pip install scikit-learn joblib
-try:
-    from sklearn.linear_model import LogisticRegression
-    from sklearn.model_selection import train_test_split
-    import joblib
-    SKL_AVAILABLE = True
-except Exception:
-    SKL_AVAILABLE = False
+# Only looked up here: numpy / scikit-learn / joblib are imported on first
+# use (scikit-learn alone takes longer to import than the whole API).
+SKL_AVAILABLE = all(find_spec(m) is not None for m in ("numpy", "sklearn", "joblib"))
+
+_model = {"mtime": None, "model": None}
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """The trained model at MODEL_PATH (reloaded when the file changes), or None."""
+    if not SKL_AVAILABLE:
+        return None
+    try:
+        mtime = os.path.getmtime(MODEL_PATH)
+    except OSError:
+        return None
+    with _model_lock:
+        if _model["mtime"] != mtime:
+            import joblib
+            _model["model"], _model["mtime"] = joblib.load(MODEL_PATH), mtime
+        return _model["model"]
 
 # utils copied/consistent with confidence engine
 def text_similarity(a, b):
@@ -22,16 +37,7 @@ def text_similarity(a, b):
         return 0.0
     return fuzz.token_sort_ratio(str(a), str(b)) / 100.0
 
-def phone_similarity(a, b):
-    if not a or not b:
-        return 0.0
-    na = ''.join(filter(str.isdigit, str(a)))
-    nb = ''.join(filter(str.isdigit, str(b)))
-    if na == nb and na != "":
-        return 1.0
-    if na and nb and na[-6:] == nb[-6:]:
-        return 0.8
-    return 0.0
+phone_similarity = phone.similarity
 
 # Default source credibility (will be read from confidence module if available)
 DEFAULT_SOURCE_CRED = {
@@ -90,8 +96,9 @@ def resolve_entity(listed, candidates, source_weights=None, use_ml=False):
 
     # If ML requested and model exists, compute ml_score
     ml_score = None
-    if use_ml and SKL_AVAILABLE and Path(MODEL_PATH).exists():
-        model = joblib.load(MODEL_PATH)
+    model = load_model() if use_ml else None
+    if model is not None:
+        import numpy as np
         X = np.array([best_feats])
         prob = model.predict_proba(X)[0][1]  # probability of match label 1
         ml_score = float(prob)
@@ -150,6 +157,11 @@ def train_ml_model(history_path=HISTORY_PATH, outpath=MODEL_PATH):
     if not X:
         raise RuntimeError("Not enough data to train model")
 
+    import numpy as np
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
     X = np.array(X)
     y = np.array(y)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.15, random_state=42)
@@ -0,0 +1,307 @@
+# verification/gazetteer.py
+"""
+Offline gazetteer: a local stand-in for Nominatim search.
+
+Builds one compact binary index from a CSV gazetteer (name, display_name
+or address, lat, lon) and/or an OSM XML extract (.osm / .osm.bz2 / .osm.gz;
+convert .pbf first with `osmium cat region.osm.pbf -o region.osm`), then
+answers free-text queries from a read-only mmap of that file.
+
+    python -m verification.gazetteer build --osm telangana.osm.bz2 --csv extra.csv
+    python -m verification.gazetteer query "Apollo Hospital Jubilee Hills"
+    HEALTHLENS_GEOCODER=gazetteer uvicorn api.main:app
+
+File layout (little endian):
+    header    magic, n_records, n_tokens, section offsets
+    offsets   (n_records + 1) x uint64   record i = records[off[i]:off[i+1]]
+    tokens    n_tokens x (24-byte token, uint32 first posting, uint32 count), sorted
+    postings  uint32 record ids, ascending per token
+    records   utf-8 "name \\x1f display_name \\x1f lat \\x1f lon"
+"""
+import os
+import re
+import sys
+import csv
+import bz2
+import gzip
+import mmap
+import math
+import struct
+import argparse
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from rapidfuzz import fuzz
+
+GAZETTEER_PATH = os.environ.get(
+    "HEALTHLENS_GAZETTEER",
+    os.path.join(os.path.dirname(__file__), "../data/gazetteer.idx"),
+)
+
+MAGIC = b"HLGAZ1\0\0"
+_HEADER = struct.Struct("<8s6Q")
+_TOKEN = struct.Struct("<24sII")
+_SEP = "\x1f"
+
+MIN_MATCH = 0.6          # share of query IDF weight a record must match
+
+# OSM nodes kept by default (with --all-named every named node is kept)
+HEALTH_TAGS = {
+    "amenity": {"hospital", "clinic", "doctors", "dentist", "pharmacy", "nursing_home"},
+    "healthcare": None,      # any value
+}
+_ADDR_KEYS = ("addr:housenumber", "addr:street", "addr:suburb", "addr:city",
+              "addr:district", "addr:state", "addr:postcode", "addr:country")
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def _token_key(tok):
+    return tok.encode("utf-8")[:_TOKEN.size - 8]
+
+
+# -----------------------------------------
+# Sources
+# -----------------------------------------
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                lat, lon = float(row["lat"]), float(row["lon"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            name = (row.get("name") or "").strip()
+            display = (row.get("display_name") or row.get("address") or name).strip()
+            if name or display:
+                yield name, display, lat, lon
+
+
+def _open_any(path):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _wanted(tags, all_named):
+    if "name" not in tags:
+        return False
+    if all_named:
+        return True
+    for key, values in HEALTH_TAGS.items():
+        if key in tags and (values is None or tags[key] in values):
+            return True
+    return False
+
+
+def read_osm(path, all_named=False):
+    """Named nodes from an OSM XML extract (ways/relations have no coordinates here)."""
+    import xml.etree.ElementTree as ET
+
+    with _open_any(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != "node":
+                if elem.tag in ("way", "relation"):
+                    elem.clear()
+                continue
+            tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+            if _wanted(tags, all_named):
+                name = tags["name"]
+                parts = [name] + [tags[k] for k in _ADDR_KEYS if tags.get(k)]
+                yield name, ", ".join(parts), float(elem.get("lat")), float(elem.get("lon"))
+            elem.clear()
+
+
+# -----------------------------------------
+# Build
+# -----------------------------------------
+def build(records, out_path=GAZETTEER_PATH):
+    """Write the index for an iterable of (name, display_name, lat, lon). Returns record count."""
+    postings = defaultdict(list)
+    blobs, offsets, pos = [], [0], 0
+    for rid, (name, display, lat, lon) in enumerate(records):
+        blob = _SEP.join((name, display, repr(lat), repr(lon))).encode("utf-8")
+        blobs.append(blob)
+        pos += len(blob)
+        offsets.append(pos)
+        for key in {_token_key(t) for t in tokenize(name) + tokenize(display)}:
+            postings[key].append(rid)
+
+    keys = sorted(postings)
+    n_records, n_tokens = len(blobs), len(keys)
+    off_offsets = _HEADER.size
+    off_tokens = off_offsets + 8 * len(offsets)
+    off_postings = off_tokens + _TOKEN.size * n_tokens
+    off_records = off_postings + 4 * sum(len(postings[k]) for k in keys)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, n_records, n_tokens, off_offsets, off_tokens, off_postings, off_records))
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        start = 0
+        for k in keys:
+            f.write(_TOKEN.pack(k, start, len(postings[k])))
+            start += len(postings[k])
+        for k in keys:
+            f.write(struct.pack(f"<{len(postings[k])}I", *postings[k]))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, out_path)
+    return n_records
+
+
+# -----------------------------------------
+# Query
+# -----------------------------------------
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_records, self.n_tokens, o_off, o_tok, o_post, self._o_rec = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a gazetteer index")
+        view = memoryview(self._mm)
+        self._offsets = view[o_off:o_tok].cast("Q")
+        self._tokens = view[o_tok:o_post]
+        self._postings = view[o_post:self._o_rec].cast("I")
+
+    def __len__(self):
+        return self.n_records
+
+    def _token_at(self, i):
+        return _TOKEN.unpack_from(self._tokens, i * _TOKEN.size)
+
+    def _lookup(self, tok):
+        """Posting slice (memoryview of record ids) for a token, or None."""
+        key = _token_key(tok).ljust(_TOKEN.size - 8, b"\0")
+        lo, hi = 0, self.n_tokens
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, start, count = self._token_at(mid)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return self._postings[start:start + count]
+        return None
+
+    def record(self, rid):
+        raw = bytes(self._mm[self._o_rec + self._offsets[rid]:self._o_rec + self._offsets[rid + 1]])
+        name, display, lat, lon = raw.decode("utf-8").split(_SEP)
+        return {"name": name, "display_name": display, "lat": lat, "lon": lon}
+
+    def search(self, query, limit=1):
+        """Nominatim-shaped results (list of dicts, best first)."""
+        toks = list(dict.fromkeys(tokenize(query)))
+        if not toks or not self.n_records:
+            return []
+        n = self.n_records
+        lists = []
+        total = 0.0
+        for t in toks:
+            plist = self._lookup(t)
+            df = len(plist) if plist is not None else 0
+            idf = math.log((n + 1) / (df + 0.5))
+            total += idf
+            if df:
+                lists.append((df, idf, plist))
+        if not lists:
+            return []
+        lists.sort(key=lambda x: x[0])
+
+        # scan postings (rarest first) only while records not seen yet could
+        # still reach the threshold from unscanned tokens; probe the rest
+        need = MIN_MATCH * total
+        unscanned = sum(idf for _, idf, _ in lists)
+        scores = defaultdict(float)
+        for df, idf, plist in lists:
+            if unscanned >= need:
+                for rid in plist:
+                    scores[rid] += idf
+            else:
+                # drop candidates that cannot reach the threshold any more
+                scores = {rid: sc for rid, sc in scores.items() if sc + unscanned >= need}
+                if len(scores) * 16 > df:
+                    members = set(plist)
+                    for rid in scores:
+                        if rid in members:
+                            scores[rid] += idf
+                else:
+                    for rid in scores:
+                        i = bisect_left(plist, rid)
+                        if i < df and plist[i] == rid:
+                            scores[rid] += idf
+            unscanned -= idf
+
+        hits = [(s, rid) for rid, s in scores.items() if s >= need]
+        # best IDF match first, then closest name
+        hits.sort(key=lambda x: -x[0])
+        hits = hits[:max(limit * 20, 20)]
+        out = []
+        for s, rid in hits:
+            rec = self.record(rid)
+            rec["importance"] = round(s / total, 4)
+            rec["_sim"] = fuzz.token_set_ratio(query, rec["name"] or rec["display_name"])
+            out.append(rec)
+        out.sort(key=lambda r: (-r["importance"], -r["_sim"]))
+        for rec in out:
+            del rec["_sim"]
+        return out[:limit]
+
+    def close(self):
+        self._postings.release()
+        self._offsets.release()
+        self._tokens.release()
+        self._mm.close()
+        self._file.close()
+
+
+_gazetteer = None
+_lock = threading.Lock()
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer(GAZETTEER_PATH)
+    return _gazetteer
+
+
+def search(query, limit=1):
+    return get_gazetteer().search(query, limit)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build / query the offline gazetteer index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--csv", action="append", default=[], help="CSV with name, display_name|address, lat, lon")
+    b.add_argument("--osm", action="append", default=[], help="OSM XML extract (.osm, .osm.bz2, .osm.gz)")
+    b.add_argument("--all-named", action="store_true", help="keep every named OSM node, not only health facilities")
+    b.add_argument("--out", default=GAZETTEER_PATH)
+    q = sub.add_parser("query")
+    q.add_argument("text")
+    q.add_argument("--limit", type=int, default=5)
+    q.add_argument("--index", default=GAZETTEER_PATH)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        def rows():
+            for p in args.csv:
+                yield from read_csv(p)
+            for p in args.osm:
+                yield from read_osm(p, args.all_named)
+        count = build(rows(), args.out)
+        print(f"{count} records -> {os.path.abspath(args.out)} ({os.path.getsize(args.out)} bytes)")
+    else:
+        for r in Gazetteer(args.index).search(args.text, args.limit):
+            print(f"{r['importance']:.3f}  {r['lat']},{r['lon']}  {r['display_name']}", file=sys.stdout)
@@ -0,0 +1,201 @@
+# verification/geo_index.py
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from verification import drift
+from storage.generations import Tracker
+
+# -----------------------------------------
+# In-process spatial index of verified providers.
+# Each provider's latest snapshot with coordinates is keyed by its
+# geohash in a sorted list, so a radius query is a handful of
+# prefix range scans (centre cell + 8 neighbours) plus an exact
+# haversine filter. Kept current through drift.on_snapshot; snapshots
+# other worker processes record are read from the drift journal.
+# -----------------------------------------
+EARTH_RADIUS_M = 6371008.8
+GEOHASH_PRECISION = 9                 # ~5 m cells for stored points
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# address agreement by distance: 1.0 within NEAR, 0.0 beyond FAR
+ADDRESS_NEAR_M = 150.0
+ADDRESS_FAR_M = 3000.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_similarity(meters):
+    """Address agreement (0..1) from the distance between two geocodes."""
+    if meters <= ADDRESS_NEAR_M:
+        return 1.0
+    if meters >= ADDRESS_FAR_M:
+        return 0.0
+    return 1.0 - (meters - ADDRESS_NEAR_M) / (ADDRESS_FAR_M - ADDRESS_NEAR_M)
+
+
+def coords(obj):
+    """(lat, lon) floats from a dict with lat/lon keys, or None."""
+    if not obj:
+        return None
+    try:
+        lat, lon = float(obj["lat"]), float(obj["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+
+def geohash(lat, lon, precision=GEOHASH_PRECISION):
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = (ch << 1) | 1, mid
+            else:
+                ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = (ch << 1) | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def _cell_size_deg(precision):
+    """(lat, lon) size in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cover(lat, lon, radius_m):
+    """Geohash prefixes (centre + neighbours) whose cells cover the radius."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = dlat / max(0.01, math.cos(math.radians(lat)))
+    precision = 0
+    # finest precision whose cells are still at least as large as the radius
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        h, w = _cell_size_deg(p)
+        if h >= dlat and w >= dlon:
+            precision = p
+            break
+    if precision == 0:
+        return {""}             # radius larger than any cell: scan everything
+    h, w = _cell_size_deg(precision)
+    cells = set()
+    for dy in (-h, 0.0, h):
+        for dx in (-w, 0.0, w):
+            y = min(90.0, max(-90.0, lat + dy))
+            x = (lon + dx + 180.0) % 360.0 - 180.0
+            cells.add(geohash(y, x, precision))
+    return cells
+
+
+class GeoIndex:
+    def __init__(self):
+        self._keys = []          # sorted [(geohash, slug)]
+        self._entries = {}       # slug -> entry
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def upsert(self, slug, lat, lon, **info):
+        gh = geohash(lat, lon)
+        with self._lock:
+            old = self._entries.get(slug)
+            if old is not None:
+                i = bisect_left(self._keys, (old["geohash"], slug))
+                if i < len(self._keys) and self._keys[i] == (old["geohash"], slug):
+                    self._keys.pop(i)
+            self._entries[slug] = {"slug": slug, "lat": lat, "lon": lon, "geohash": gh, **info}
+            insort(self._keys, (gh, slug))
+
+    def nearby(self, lat, lon, radius_m=2000.0, limit=20):
+        """Providers within radius_m of (lat, lon), nearest first."""
+        found = []
+        with self._lock:
+            for prefix in _cover(lat, lon, radius_m):
+                lo = bisect_left(self._keys, (prefix,))
+                hi = bisect_right(self._keys, (prefix + "\x7f",))
+                for _, slug in self._keys[lo:hi]:
+                    e = self._entries[slug]
+                    d = haversine_m(lat, lon, e["lat"], e["lon"])
+                    if d <= radius_m:
+                        found.append((d, e))
+        found.sort(key=lambda x: x[0])
+        return [dict(e, distance_m=round(d, 1)) for d, e in found[:limit]]
+
+
+# -----------------------------------------
+# Process-wide index, built lazily from history.json
+# -----------------------------------------
+_index = None
+_build_lock = threading.Lock()
+_tracker = Tracker("history")
+_journal = drift.JournalReader()
+
+
+def _entry_info(provider_name, snap):
+    c = snap["candidate"]
+    return {"name": provider_name, "address": c.get("address"), "phone": c.get("phone"), "ts": snap.get("ts")}
+
+
+def build_index(hist=None):
+    idx = GeoIndex()
+    hist = drift.load_history() if hist is None else hist
+    for slug, rec in hist.items():
+        # latest snapshot that has coordinates
+        for snap in reversed(rec.get("snapshots", [])):
+            ll = coords(snap.get("candidate"))
+            if ll:
+                idx.upsert(slug, *ll, **_entry_info(rec.get("name"), snap))
+                break
+    return idx
+
+
+def _apply(slug, provider_name, snap, generation, count):
+    ll = coords(snap.get("candidate"))
+    if ll:
+        _index.upsert(slug, *ll, **_entry_info(provider_name, snap))
+
+
+def get_index():
+    global _index
+    if _index is None or _tracker.stale():
+        with _build_lock:
+            if _index is not None and _tracker.stale() and not _journal.catch_up(_tracker, _apply):
+                _index = None
+            if _index is None:
+                _tracker.mark()
+                _journal.reset()
+                _index = build_index()
+    return _index
+
+
+def _on_snapshot(slug, provider_name, snap, generation, count):
+    with _build_lock:
+        if _index is not None and _tracker.advance(generation):
+            _apply(slug, provider_name, snap, generation, count)     # else caught up on next read
+
+
+drift.on_snapshot(_on_snapshot)
+
+
+def nearby(lat, lon, radius_m=2000.0, limit=20):
+    return get_index().nearby(lat, lon, radius_m, limit)
@@ -2,6 +2,7 @@
 import json, os
 from rapidfuzz import fuzz
 from .confidence import compute_confidence
+from monitoring.metrics import timed
 import time
 
 def load_scraped(path=None):
@@ -10,18 +11,26 @@ def load_scraped(path=None):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+# candidates without a retrieved_at are scored as this old
+UNDATED_AGE = 7 * 86400
+
+def ensure_retrieved_at(candidate, now=None):
+    """Stamp an undated candidate as UNDATED_AGE old (in place); returns it."""
+    if candidate.get("retrieved_at") is None:
+        candidate["retrieved_at"] = (now or time.time()) - UNDATED_AGE
+    return candidate
+
 # Keep a backward-compatible simple verify function that now delegates to compute_confidence
+@timed("verify_provider")
 def verify_provider(listed, scraped_list):
     """
     listed: dict with keys name, listed_phone, listed_address (coming from user / directory)
     scraped_list: list of candidate dicts (source,name,address,phone,website,retrieved_at)
     """
-    # Ensure all candidates have retrieved_at (if missing, set to now - 7 days)
+    # Ensure all candidates have retrieved_at (if missing, assume 7 days old)
     now = time.time()
     for c in scraped_list:
-        if "retrieved_at" not in c or c.get("retrieved_at") is None:
-            # assume older candidate — set retrieved_at to 7 days ago
-            c["retrieved_at"] = now - 7 * 86400
+        ensure_retrieved_at(c, now)
 
     # call new confidence engine
     result = compute_confidence(listed, scraped_list)
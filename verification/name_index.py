@@ -0,0 +1,340 @@
+# verification/name_index.py
+"""
+Typeahead over known provider names: everything in the snapshot history
+(the names providers were verified and listed under), the consensus
+names in storage.provider_state and the curated chains in
+scraper.phone_sources.
+
+Names are indexed by character trigrams of their words ("^ap", "apo",
+..., "lo$", plus "^a" for one-letter prefixes); a query's last word is
+treated as a prefix. Postings live in one CSR layout (indptr over the
+39^3 trigram codes -> sorted uint32 doc ids) built with numpy, plus a
+small per-trigram delta for names added since, folded in every
+DELTA_MAX names. A query counts shared trigrams over a pruned candidate
+set and re-ranks the best few with rapidfuzz.
+
+    python -m verification.name_index "apolo jubile"
+"""
+import re
+import sys
+import math
+import time
+import threading
+import unicodedata
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from verification import drift
+from storage import provider_state
+from storage.generations import Tracker
+from scraper.phone_sources import HOSPITAL_PHONE_PAGES, CHAIN_ALIASES
+
+MIN_SHARE = 0.5          # share of query trigrams a name must contain
+MAX_CANDIDATES = 20000   # names whose trigram overlap is counted per query
+RERANK = 128             # best-overlap names re-scored with rapidfuzz
+DELTA_MAX = 50000        # names added before the delta is merged into the CSR
+CONSENSUS_SLACK = 300    # seconds of verifications re-read per catch-up (clock skew between workers)
+
+# trigram alphabet: 0 = separator, a-z, 0-9, word start, word end
+_START, _END = "^", "$"
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789" + _START + _END
+_K = len(_ALPHABET) + 1
+_N_GRAMS = _K ** 3
+_CODE = {ch: i + 1 for i, ch in enumerate(_ALPHABET)}
+_LUT = np.zeros(256, dtype=np.int32)
+for _ch, _i in _CODE.items():
+    _LUT[ord(_ch)] = _i
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def words(text):
+    """Lowercased ASCII words (accents folded, punctuation dropped)."""
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return _WORD.findall(folded.lower())
+
+
+def _padded(ws):
+    return "".join(_START + w + _END for w in ws)
+
+
+def query_grams(text):
+    """Trigram codes of a query; the last word is a prefix unless followed by a space."""
+    ws = words(text)
+    if not ws:
+        return []
+    grams = set()
+    for i, w in enumerate(ws):
+        s = _START + w + ("" if i == len(ws) - 1 and not text[-1:].isspace() else _END)
+        if len(s) == 2:
+            grams.add(_CODE[_START] * _K + _CODE[w])      # one-letter prefix: word-start code
+        for j in range(len(s) - 2):
+            grams.add((_CODE[s[j]] * _K + _CODE[s[j + 1]]) * _K + _CODE[s[j + 2]])
+    return sorted(grams)
+
+
+def _dedupe_sorted(a):
+    """np.unique for an already sorted array (without numpy's hash-based path)."""
+    if len(a) < 2:
+        return a
+    return a[np.concatenate(([True], a[1:] != a[:-1]))]
+
+
+def _csr(padded, first_doc):
+    """(indptr, doc ids) for padded names, doc ids numbered from first_doc."""
+    indptr = np.zeros(_N_GRAMS + 1, dtype=np.int64)
+    if not padded:
+        return indptr, np.zeros(0, dtype=np.uint32)
+    text = "|".join(padded) + "|"
+    codes = _LUT[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+    c0, c1, c2 = codes[:-2], codes[1:-1], codes[2:]
+    start, end = _CODE[_START], _CODE[_END]
+    # trigrams inside one word: no separator, no word boundary in the middle
+    ok = (c0 != 0) & (c1 != 0) & (c2 != 0) & (c1 < start) & (c0 != end) & (c2 != start)
+    # plus (0, "^", first letter) per word, for one-letter prefixes
+    initial = (c0 == start) & (c1 != 0) & (c1 < start)
+    lengths = np.fromiter((len(p) + 1 for p in padded), dtype=np.int64, count=len(padded))
+    docs = np.repeat(np.arange(first_doc, first_doc + len(padded), dtype=np.int64), lengths)[:-2]
+    grams = np.concatenate((((c0 * _K + c1) * _K + c2)[ok], (start * _K + c1)[initial]))
+    keys = (grams.astype(np.int64) << 32) | np.concatenate((docs[ok], docs[initial]))
+    keys.sort()
+    keys = _dedupe_sorted(keys)          # a word may repeat a trigram
+    grams = keys >> 32
+    indptr[1:] = np.cumsum(np.bincount(grams, minlength=_N_GRAMS))
+    return indptr, (keys & 0xFFFFFFFF).astype(np.uint32)
+
+
+def _merge_csr(a, b):
+    """Merge two CSRs whose doc ids in b all follow those in a."""
+    (ia, pa), (ib, pb) = a, b
+    ca, cb = np.diff(ia), np.diff(ib)
+    indptr = np.zeros_like(ia)
+    indptr[1:] = np.cumsum(ca + cb)
+    out = np.empty(len(pa) + len(pb), dtype=np.uint32)
+    ga = np.repeat(np.arange(_N_GRAMS), ca)
+    out[indptr[ga] + np.arange(len(pa)) - ia[ga]] = pa
+    gb = np.repeat(np.arange(_N_GRAMS), cb)
+    out[indptr[gb] + ca[gb] + np.arange(len(pb)) - ib[gb]] = pb
+    return indptr, out
+
+
+class NameIndex:
+    def __init__(self):
+        self._names = []             # doc id -> display name
+        self._refs = []              # doc id -> (kind, key): ("provider", slug) / ("chain", chain)
+        self._seen = set()           # (key, normalized name)
+        self._lengths = np.zeros(1024, dtype=np.uint16)
+        self._indptr, self._postings = _csr([], 0)
+        self._n_main = 0             # docs in the CSR
+        self._delta = {}             # trigram -> [doc ids] for docs >= _n_main
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name, kind, key):
+        self.add_many([(name, kind, key)])
+
+    def add_many(self, rows):
+        """rows: (display name, kind, key); known (key, name) pairs are skipped."""
+        with self._lock:
+            first = len(self._names)
+            padded = []
+            for name, kind, key in rows:
+                ws = words(name)
+                norm = " ".join(ws)
+                if not ws or (key, norm) in self._seen:
+                    continue
+                self._seen.add((key, norm))
+                self._names.append(name)
+                self._refs.append((kind, key))
+                padded.append(_padded(ws))
+            if not padded:
+                return
+            n = len(self._names)
+            if n > len(self._lengths):
+                self._lengths = np.resize(self._lengths, max(n, 2 * len(self._lengths)))
+            self._lengths[first:n] = [min(len(p), 65535) for p in padded]
+
+            if n - self._n_main >= DELTA_MAX:
+                self._fold(first, padded)
+            else:
+                indptr, postings = _csr(padded, first)
+                for g in np.flatnonzero(np.diff(indptr)):
+                    self._delta.setdefault(int(g), []).extend(postings[indptr[g]:indptr[g + 1]].tolist())
+
+    def _fold(self, first, padded):
+        """Merge the delta and the new names into the CSR."""
+        if first > self._n_main:
+            # delta docs are re-derived from their names
+            pending = [_padded(words(self._names[i])) for i in range(self._n_main, first)]
+            padded = pending + padded
+        new = _csr(padded, self._n_main)
+        self._indptr, self._postings = (_merge_csr((self._indptr, self._postings), new)
+                                        if self._n_main else new)
+        self._n_main = len(self._names)
+        self._delta = {}
+
+    def _posting(self, g):
+        main = self._postings[self._indptr[g]:self._indptr[g + 1]]
+        extra = self._delta.get(g)
+        return np.concatenate([main, np.asarray(extra, dtype=np.uint32)]) if extra else main
+
+    def _candidates(self, grams):
+        """Doc ids and shared-trigram counts of the best candidates."""
+        lists = sorted((self._posting(g) for g in grams), key=len)
+        n_grams = len(lists)
+        need = max(1, math.ceil(MIN_SHARE * n_grams))
+        # a doc sharing `need` trigrams is in one of the n_grams - need + 1
+        # rarest lists; require more overlap until that union is small
+        while need < n_grams and sum(len(x) for x in lists[:n_grams - need + 1]) > MAX_CANDIDATES:
+            need += 1
+        pool = lists[:n_grams - need + 1]
+        if len(pool) == 1:
+            cands = pool[0]
+        else:
+            cands = _dedupe_sorted(np.sort(np.concatenate(pool)))
+        if len(cands) > MAX_CANDIDATES:
+            # only very common trigrams (e.g. "hospital"): shortest names first
+            cands = np.sort(cands[np.argpartition(self._lengths[cands], MAX_CANDIDATES)[:MAX_CANDIDATES]])
+        counts = np.zeros(len(cands), dtype=np.int32)
+        for i, posting in enumerate(lists):
+            if len(posting):
+                pos = np.searchsorted(posting, cands)
+                pos[pos == len(posting)] = 0
+                counts += posting[pos] == cands
+            # drop candidates that can no longer reach `need`
+            alive = counts >= need - (n_grams - i - 1)
+            if not alive.all():
+                cands, counts = cands[alive], counts[alive]
+                if not len(cands):
+                    break
+        return cands, counts
+
+    def search(self, query, limit=10):
+        """Best matching known names for a (partial) query, best first."""
+        grams = query_grams(query)
+        if not grams:
+            return []
+        with self._lock:
+            cands, counts = self._candidates(grams)
+            if not len(cands):
+                return []
+            if len(cands) > RERANK:
+                # most shared trigrams first, then shorter names
+                order = np.lexsort((self._lengths[cands], -counts))[:RERANK]
+                cands = cands[order]
+            pool = {int(d): (self._names[d], self._refs[d]) for d in cands}
+
+        q = " ".join(words(query))
+        choices = {d: " ".join(words(name)) for d, (name, _) in pool.items()}
+        ranked = process.extract(q, choices, scorer=fuzz.WRatio, limit=None)
+        ranked.sort(key=lambda r: (-r[1], len(r[0])))
+        out, seen = [], set()
+        for _, score, d in ranked:
+            name, ref = pool[d]
+            if ref in seen:
+                continue
+            seen.add(ref)
+            kind, key = ref
+            out.append({"name": name, "kind": kind, "slug" if kind == "provider" else "chain": key,
+                        "score": round(score, 1)})
+            if len(out) >= limit:
+                break
+        return out
+
+
+# -----------------------------------------
+# Process-wide index over history.json + provider_state + curated chains
+# -----------------------------------------
+_index = None
+_build_lock = threading.Lock()
+_tracker = Tracker("history")
+_journal = drift.JournalReader()
+_consensus_tracker = Tracker("provider_state")
+_consensus_since = None      # verified_at already read up to (minus CONSENSUS_SLACK)
+
+
+def _chain_name(alias):
+    return alias.upper() if len(alias) <= 4 else alias.title()
+
+
+def _curated_rows():
+    for chain in HOSPITAL_PHONE_PAGES:
+        for alias in [chain] + CHAIN_ALIASES.get(chain, []):
+            yield _chain_name(alias), "chain", chain
+
+
+def _history_rows(hist):
+    for slug, rec in hist.items():
+        yield rec.get("name"), "provider", slug
+        snaps = rec.get("snapshots")
+        if snaps:
+            yield snaps[-1]["candidate"].get("name"), "provider", slug
+
+
+def _consensus_rows(entries):
+    for entry in entries:
+        name = (entry.get("consensus") or {}).get("name")
+        if name:
+            yield name, "provider", entry["slug"]
+
+
+def _catch_up_consensus():
+    """Called with _build_lock held: add consensus names verified since the last call."""
+    global _consensus_since
+    if not _consensus_tracker.stale():
+        return
+    _consensus_tracker.mark()
+    now = time.time()
+    entries = (provider_state.iter_providers() if _consensus_since is None
+               else provider_state.verified_since(_consensus_since))
+    _index.add_many(_consensus_rows(entries))
+    _consensus_since = now - CONSENSUS_SLACK
+
+
+def build_index(hist=None):
+    idx = NameIndex()
+    idx.add_many(_curated_rows())
+    idx.add_many(_history_rows(drift.load_history() if hist is None else hist))
+    return idx
+
+
+def get_index():
+    """The shared index; names written by other processes are added on the next read."""
+    global _index
+    if _index is None or _tracker.stale() or _consensus_tracker.stale():
+        with _build_lock:
+            if _index is None:
+                _tracker.mark()
+                _index = build_index()
+            elif _tracker.stale() and not _journal.catch_up(_tracker, _apply):
+                _tracker.mark()
+                _journal.reset()
+                _index.add_many(_history_rows(drift.load_history()))
+            _catch_up_consensus()
+    return _index
+
+
+def _apply(slug, provider_name, snap, generation, count):
+    _index.add_many([(provider_name, "provider", slug),
+                     (snap["candidate"].get("name"), "provider", slug)])
+
+
+def _on_snapshot(slug, provider_name, snap, generation, count):
+    with _build_lock:
+        if _index is not None and _tracker.advance(generation):
+            _apply(slug, provider_name, snap, generation, count)     # else caught up on next read
+
+
+drift.on_snapshot(_on_snapshot)
+
+
+def search(query, limit=10):
+    return get_index().search(query, limit)
+
+
+if __name__ == "__main__":
+    for r in search(" ".join(sys.argv[1:]) or "apollo"):
+        print(f"{r['score']:5.1f}  {r['name']}  ({r['kind']}: {r.get('slug') or r.get('chain')})")
@@ -1,12 +1,11 @@
 # verification/osm_lookup.py
-import requests
+from scraper import http_client
 import time
 def search_osm(query):
     """
     Search OpenStreetMap for a clinic/provider name.
     Returns the first result with address and coordinates.
     """
-    url = "https://nominatim.openstreetmap.org/search"
     params = {
         "q": query,
         "format": "json",
@@ -20,9 +19,7 @@ def search_osm(query):
     }
 
     try:
-        res = requests.get(url, params=params, headers=headers, timeout=10)
-        res.raise_for_status()
-        data = res.json()
+        data = http_client.nominatim_search(params, headers=headers, timeout=10)
         if len(data) == 0:
             return None
 
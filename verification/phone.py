@@ -0,0 +1,207 @@
+# verification/phone.py
+import re
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import unquote
+
+# -----------------------------------------
+# One place for Indian phone numbers: parsing to a canonical form,
+# comparison (consensus, drift, entity resolution) and extraction from
+# scraped text.
+#   mobile       10 digits starting 6-9          -> +91XXXXXXXXXX
+#   landline     STD code + subscriber number    -> +91<std without 0><number>
+#   tollfree     1800 ...  /  shared_cost 1860 ... -> national digits (not
+#                dialable from abroad, so no +91)
+# Parses are memoized: the same listed / scraped numbers are compared
+# many times per request and across requests.
+# -----------------------------------------
+COUNTRY_CODE = "91"
+_E164_PREFIX = "+" + COUNTRY_CODE
+PARSE_CACHE_SIZE = 8192
+
+# national numbers starting with these are special services, 10-11 digits
+SPECIAL_PREFIXES = {"1800": "tollfree", "1860": "shared_cost"}
+
+# 2-3 digit STD codes (without the trunk 0) used to split landlines into
+# code + subscriber number. Longest match wins; unknown codes still parse
+# as landlines, just without std_code.
+STD_CODES = {
+    "11", "20", "22", "33", "40", "44", "79", "80",
+    "120", "124", "129", "135", "141", "145", "151", "161", "172", "175", "177", "180",
+    "191", "194", "212", "217", "231", "240", "241", "250", "253", "257", "260", "261",
+    "265", "268", "278", "281", "285", "288", "291", "294", "343", "353", "360", "361",
+    "364", "370", "385", "389", "413", "416", "421", "422", "423", "424", "427", "431",
+    "435", "451", "452", "461", "462", "469", "470", "471", "474", "475", "476", "477",
+    "478", "479", "480", "481", "484", "485", "487", "490", "491", "494", "495", "496",
+    "497", "512", "515", "522", "532", "535", "542", "551", "562", "565", "581", "591",
+    "595", "612", "621", "631", "641", "651", "657", "661", "671", "674", "680", "712",
+    "721", "724", "731", "734", "744", "747", "751", "755", "761", "771", "788", "820",
+    "821", "824", "831", "832", "836", "861", "863", "866", "870", "877", "878", "883",
+    "884", "891",
+}
+
+_NON_DIGIT = re.compile(r"\D")
+
+# digit runs that may be a phone number in free text: optional +/(,
+# digits with spaces, dashes, dots or brackets between them
+_CANDIDATE = re.compile(r"(?<![\w+])(?:\+|\()?\d[\d \t\-().]{7,18}\d(?!\w)")
+
+
+PhoneNumber = namedtuple("PhoneNumber", ["canonical", "national", "kind", "std_code"])
+PhoneNumber.__doc__ = """
+Parsed number.
+  canonical  E.164-style string ("+914023552337", "18004253424"), None if invalid
+  national   national significant digits (all digits for invalid input)
+  kind       "mobile" | "landline" | "tollfree" | "shared_cost" | "invalid"
+  std_code   "040" for recognised landline codes, else None
+"""
+
+
+def _invalid(digits):
+    return PhoneNumber(None, digits, "invalid", None)
+
+
+def _std_code(national):
+    if national[:3] in STD_CODES:
+        return national[:3]
+    if national[:2] in STD_CODES:
+        return national[:2]
+    return None
+
+
+def _national(s):
+    """(all digits, national significant digits or None for a foreign number)."""
+    if s.isdecimal():
+        all_digits = digits = s
+    else:
+        all_digits = digits = _NON_DIGIT.sub("", s)
+    if s[:1] == "+" or s[:2] == "00":
+        if s[0] != "+":
+            digits = digits[2:]
+        if digits[:2] != COUNTRY_CODE:
+            return all_digits, None
+        digits = digits[2:]
+    elif len(digits) == 12 and digits[:2] == COUNTRY_CODE:
+        digits = digits[2:]
+    if len(digits) == 11 and digits[0] == "0":
+        digits = digits[1:]                  # trunk prefix
+    return all_digits, digits
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(raw):
+    all_digits, digits = _national(raw.strip())
+    if digits is None:
+        return _invalid(all_digits)
+
+    kind = SPECIAL_PREFIXES.get(digits[:4])
+    if kind and len(digits) in (10, 11):
+        return PhoneNumber(digits, digits, kind, None)
+    if len(digits) != 10 or digits[0] == "0":
+        return _invalid(all_digits)
+
+    std = _std_code(digits)
+    # mobile series start 6-9; so do a few STD codes (79, 80, ...), whose
+    # subscriber numbers start 2-5
+    if digits[0] in "6789" and not (std and digits[len(std)] in "2345"):
+        return PhoneNumber(_E164_PREFIX + digits, digits, "mobile", None)
+    return PhoneNumber(_E164_PREFIX + digits, digits, "landline", "0" + std if std else None)
+
+
+def parse(raw):
+    """PhoneNumber for a raw string (or int), None for empty input."""
+    if raw is None:
+        return None
+    raw = str(raw)
+    if not raw.strip():
+        return None
+    return _parse(raw)
+
+
+def canonical(raw):
+    """Canonical form of a valid number, else None."""
+    p = parse(raw)
+    return p.canonical if p else None
+
+
+def parse_many(values):
+    """
+    Batch parse for bulk jobs: each distinct input is parsed once.
+    Returns a list aligned with values (None for empty entries).
+    """
+    seen = {}
+    out = []
+    for v in values:
+        if v not in seen:
+            seen[v] = parse(v)
+        out.append(seen[v])
+    return out
+
+
+def canonical_many(values):
+    return [p.canonical if p else None for p in parse_many(values)]
+
+
+def cache_info():
+    return _parse.cache_info()
+
+
+# -----------------------------------------
+# Comparison
+# Two valid numbers are the same exactly when their national digits
+# are, so comparisons and grouping use this cheap key and skip the
+# full parse.
+# -----------------------------------------
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _national_key(raw):
+    all_digits, digits = _national(raw.strip())
+    return all_digits if digits is None else digits
+
+
+def national_key(raw):
+    """National digits of any format ("+91 40 2355 2337" -> "4023552337"), "" if empty."""
+    if not raw:
+        return ""
+    return _national_key(raw if isinstance(raw, str) else str(raw))
+
+
+def similarity(a, b):
+    """
+    1.0 for the same number (in any format), 0.8 when the last 6 digits
+    agree (same subscriber, different/missing code), else 0.0.
+    """
+    na, nb = national_key(a), national_key(b)
+    if not na or not nb:
+        return 0.0
+    if na == nb:
+        return 1.0
+    if len(na) >= 6 and len(nb) >= 6 and na[-6:] == nb[-6:]:
+        return 0.8
+    return 0.0
+
+
+def same_number(a, b):
+    """1.0 if both are present and denote the same number, else 0.0."""
+    na = national_key(a)
+    return 1.0 if na and na == national_key(b) else 0.0
+
+
+# -----------------------------------------
+# Extraction
+# -----------------------------------------
+def from_tel_href(href):
+    """Canonical number from a tel: link ("tel:+91-40-2355%202337"), else None."""
+    value = unquote(href or "")
+    if value.lower().startswith("tel:"):
+        value = value[4:]
+    return canonical(value.split(";")[0])
+
+
+def find_all(text):
+    """Canonical numbers found in free text, in order of appearance, deduplicated."""
+    found = []
+    for m in _CANDIDATE.finditer(text or ""):
+        c = canonical(m.group(0))
+        if c and c not in found:
+            found.append(c)
+    return found